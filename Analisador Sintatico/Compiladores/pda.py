@@ -9,7 +9,16 @@ class AP:
         self._F = F
         self.qA = q0
 
-    def run(self, entrada):
+    def run(self, entrada, verbose=True):
+        # verbose=False só reconhece, sem imprimir FITA e TS (ver reconhecer)
+        resultado = self.reconhecer(entrada)
+        if verbose:
+            self.imprimir(resultado)
+        return resultado["aceito"]
+
+    def reconhecer(self, entrada):
+        # Devolve {"fita": caminhos, "ts": [(linha, estado_final, palavra)],
+        #          "linhas": linhas processadas, "aceito": bool}
         # Inicializar estruturas
         FITA = []
         TS = []  # Tabela de símbolos: (linha, label, estado_final)
@@ -109,16 +118,18 @@ class AP:
             #print(f"\n--- Fim da LINHA {linha_atual} ---")
             #print(f"Palavras processadas na linha {linha_atual}: {len([p for p in palavras if p.strip()])}")
         
+        # Aceita se todos os caminhos terminam em estados válidos (não X)
+        aceito = all(not caminho.endswith('X') for caminho in FITA)
+        return {"fita": FITA, "ts": TS, "linhas": linha_atual, "aceito": aceito}
+
+    def imprimir(self, resultado):
         # Imprimir resultados finais
+        FITA, TS = resultado["fita"], resultado["ts"]
         print(f"{'='*50}")
         print("FITA (Caminhos Completos):", FITA)
         print("\nTabela de Simbolos (TS):")
         for i, (linha, caminho, palavra) in enumerate(TS):
             print(f"  {i+1}. Linha {linha}: '{palavra}' -> {caminho}")
         
-        print(f"\nTotal de linhas processadas: {linha_atual}")
-        print(f"Total de palavras processadas: {len(FITA)}")
-        
-        # Retorna True se todos os caminhos terminam em estados válidos (não X)
-        resultado = all(not caminho.endswith('X') for caminho in FITA)
-        return resultado   
\ No newline at end of file
+        print(f"\nTotal de linhas processadas: {resultado['linhas']}")
+        print(f"Total de palavras processadas: {len(FITA)}")   
\ No newline at end of file
@@ -0,0 +1,290 @@
+"""
+Árvore Sintática Abstrata (AST) da Linguagem Fantasy
+Nós com __slots__ construídos pelas ações semânticas do parser SLR(1)
+
+Cada redução cria um número constante de nós, então uma expressão com N
+operandos é construída em tempo O(N). O texto de uma expressão só é gerado
+sob demanda (render / str) para relatórios e modo verbose.
+"""
+
+from collections import deque
+
+
+class Node:
+    """Classe base de todos os nós da AST"""
+    __slots__ = ("line",)
+
+    def __init__(self, line=0):
+        self.line = line              # Linha no código fonte
+
+    def __str__(self):
+        return render(self)
+
+    def __repr__(self):
+        return f"{type(self).__name__}({render(self)!r}, L{self.line})"
+
+
+# ============================================================================
+# EXPRESSÕES
+# ============================================================================
+
+class Num(Node):
+    """Literal numérico (FACTOR -> num)"""
+    __slots__ = ("value",)
+
+    def __init__(self, value, line=0):
+        super().__init__(line)
+        self.value = value
+
+
+class Var(Node):
+    """Uso de variável (FACTOR -> id)"""
+    __slots__ = ("name",)
+
+    def __init__(self, name, line=0):
+        super().__init__(line)
+        self.name = name
+
+
+class Member(Node):
+    """Acesso a membro (FACTOR -> HIM . id)"""
+    __slots__ = ("name",)
+
+    def __init__(self, name, line=0):
+        super().__init__(line)
+        self.name = name
+
+
+class Not(Node):
+    """Negação lógica (UNARY -> NUST TERM)"""
+    __slots__ = ("operand",)
+
+    def __init__(self, operand, line=0):
+        super().__init__(line)
+        self.operand = operand
+
+
+class BinOp(Node):
+    """Operação binária (EXPR -> TERM EXPR')"""
+    __slots__ = ("op", "left", "right")
+
+    def __init__(self, op, left, right, line=0):
+        super().__init__(line)
+        self.op = op                  # Lexema do operador (+, -, ANRK, AAN, KO)
+        self.left = left
+        self.right = right
+
+
+# ============================================================================
+# COMANDOS (variantes de CMD)
+# ============================================================================
+
+class Declaration(Node):
+    """CMD -> FUS id := EXPR"""
+    __slots__ = ("name", "value")
+
+    def __init__(self, name, value, line=0):
+        super().__init__(line)
+        self.name = name
+        self.value = value
+
+
+class Assignment(Node):
+    """CMD -> LHS := EXPR"""
+    __slots__ = ("name", "value")
+
+    def __init__(self, name, value, line=0):
+        super().__init__(line)
+        self.name = name              # Nome do alvo ('x' ou 'HIM.x')
+        self.value = value
+
+
+class Module(Node):
+    """CMD -> KEL id CMD"""
+    __slots__ = ("name", "body")
+
+    def __init__(self, name, body, line=0):
+        super().__init__(line)
+        self.name = name
+        self.body = body
+
+
+class IOCommand(Node):
+    """CMD -> IO id (HON = entrada, print = saída)"""
+    __slots__ = ("op", "name")
+
+    def __init__(self, op, name, line=0):
+        super().__init__(line)
+        self.op = op
+        self.name = name
+
+
+class Return(Node):
+    """CMD -> JUN EXPR"""
+    __slots__ = ("value",)
+
+    def __init__(self, value, line=0):
+        super().__init__(line)
+        self.value = value
+
+
+class If(Node):
+    """CMD -> LOS EXPR CMD"""
+    __slots__ = ("cond", "body")
+
+    def __init__(self, cond, body, line=0):
+        super().__init__(line)
+        self.cond = cond
+        self.body = body
+
+
+class Loop(Node):
+    """CMD -> FOD CMD FAH EXPR | FAH CMD FAH EXPR"""
+    __slots__ = ("keyword", "body", "cond")
+
+    def __init__(self, keyword, body, cond, line=0):
+        super().__init__(line)
+        self.keyword = keyword        # 'FOD' (while) ou 'FAH' (for)
+        self.body = body
+        self.cond = cond
+
+
+class Invalid(Node):
+    """Comando descartado pela recuperação de erros sintáticos (modo pânico)"""
+    __slots__ = ()
+
+
+class Program(Node):
+    """S -> CMD ; S | CMD - sequência de comandos"""
+    __slots__ = ("statements",)
+
+    def __init__(self, statements=None, line=0):
+        super().__init__(line)
+        # deque: S é recursiva à direita, os comandos chegam do último
+        # para o primeiro e são inseridos no início em O(1)
+        self.statements = deque(statements or ())
+
+
+# ============================================================================
+# REGISTROS DE ATRIBUTOS INTERMEDIÁRIOS (não fazem parte da AST final)
+# ============================================================================
+
+class Target:
+    """Atributo de LHS: alvo de uma atribuição (assign id | HIM . id)"""
+    __slots__ = ("name", "line", "scoped")
+
+    def __init__(self, name, line=0, scoped=False):
+        self.name = name
+        self.line = line
+        self.scoped = scoped          # True para HIM . id
+
+    def __repr__(self):
+        return f"Target({self.name!r}, L{self.line})"
+
+
+class ExprTail:
+    """Atributo de EXPR': operador pendente e operando direito já construído"""
+    __slots__ = ("op", "right")
+
+    def __init__(self, op, right):
+        self.op = op
+        self.right = right
+
+    def __repr__(self):
+        return f"ExprTail({self.op!r}, {render(self.right)!r})"
+
+
+# ============================================================================
+# PERCURSO
+# ============================================================================
+
+# Atributos que apontam para nós filhos, por classe
+CHILDREN = {
+    Not: ("operand",),
+    BinOp: ("left", "right"),
+    Declaration: ("value",),
+    Assignment: ("value",),
+    Module: ("body",),
+    Return: ("value",),
+    If: ("cond", "body"),
+    Loop: ("body", "cond"),
+}
+
+
+def shift_lines(node, delta):
+    """
+    Soma 'delta' à linha de um nó e de todos os seus descendentes
+    
+    Usado pela compilação incremental para reaproveitar comandos que só
+    mudaram de linha (linhas inseridas/removidas antes deles).
+    """
+    pending = [node]
+    while pending:
+        item = pending.pop()
+        item.line += delta
+        if isinstance(item, Program):
+            pending.extend(item.statements)
+            continue
+        for field in CHILDREN.get(type(item), ()):
+            child = getattr(item, field)
+            if isinstance(child, Node):
+                pending.append(child)
+
+
+# ============================================================================
+# RENDERIZAÇÃO SOB DEMANDA
+# ============================================================================
+
+def render(node):
+    """
+    Gera o texto de um nó da AST
+
+    Iterativo (pilha explícita) para suportar expressões muito longas,
+    cuja árvore tem profundidade proporcional ao número de operandos.
+    """
+    parts = []
+    pending = [node]
+
+    while pending:
+        item = pending.pop()
+
+        if isinstance(item, str):
+            parts.append(item)
+        elif isinstance(item, Num):
+            parts.append(str(item.value))
+        elif isinstance(item, Var):
+            parts.append(item.name)
+        elif isinstance(item, Member):
+            parts.append(f"HIM.{item.name}")
+        elif isinstance(item, BinOp):
+            pending.extend((")", item.right, f" {item.op} ", item.left, "("))
+        elif isinstance(item, Not):
+            pending.extend((")", item.operand, "(NOT "))
+        elif isinstance(item, Declaration):
+            pending.extend((item.value, f"FUS {item.name} := "))
+        elif isinstance(item, Assignment):
+            pending.extend((item.value, f"{item.name} := "))
+        elif isinstance(item, Module):
+            pending.extend((item.body, f"KEL {item.name} "))
+        elif isinstance(item, IOCommand):
+            parts.append(f"{item.op} {item.name}")
+        elif isinstance(item, Return):
+            pending.extend((item.value, "JUN "))
+        elif isinstance(item, If):
+            pending.extend((item.body, " ", item.cond, "LOS "))
+        elif isinstance(item, Loop):
+            pending.extend((item.cond, " FAH ", item.body, f"{item.keyword} "))
+        elif isinstance(item, Program):
+            statements = list(item.statements)
+            for i in range(len(statements) - 1, -1, -1):
+                pending.append(statements[i])
+                if i > 0:
+                    pending.append(" ; ")
+        elif isinstance(item, Invalid):
+            parts.append("<erro>")
+        elif item is None:
+            parts.append("?")
+        else:
+            parts.append(str(item))
+
+    return "".join(parts)
@@ -0,0 +1,194 @@
+"""
+Pipeline Assíncrono de Compilação (asyncio)
+Sobrepõe leitura de arquivos, análise léxica e análise sintática/semântica
+
+    itens -> [leitura] -> fila -> [léxico] -> fila -> [sintático] -> resultados
+
+Cada estágio tem seu número de tarefas (limite de concorrência) e as filas
+entre eles são limitadas: um estágio lento segura os anteriores em vez de
+acumular códigos e tokens na memória. A leitura usa o executor padrão do loop
+(threads de E/S); léxico e parser rodam no executor dado (padrão: um
+ThreadPoolExecutor próprio, possível porque GRAMMAR é imutável e cada
+compilação tem o seu parser).
+
+Com muitos arquivos pequenos todos os estágios ficam ocupados ao mesmo tempo
+e, como as filas são FIFO e curtas, um arquivo não espera atrás de uma fila
+longa: total_time de cada BatchResult é a latência desde o início da leitura.
+
+Uso:
+    async for result in compile_async(caminhos, readers=16, lexers=2, parsers=2):
+        print(result.name, result.success)
+
+    python async_pipeline.py arquivo1.fan arquivo2.fan ...
+"""
+
+import asyncio
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from batch import build_result, iter_jobs, read_error, read_source
+from lexer import Lexer
+from parser_integrated import GRAMMAR
+
+# Limites padrão de concorrência por estágio e tamanho das filas. Filas
+# curtas já mantêm os estágios ocupados; filas longas só aumentam a
+# latência (cada item espera todos os que estão à sua frente)
+READERS = 4
+LEXERS = 2
+PARSERS = 2
+QUEUE_SIZE = 4
+
+_DONE = object()                      # Marca de fim de uma fila
+
+
+def _lex(source_code):
+    """Estágio léxico (no executor): tokens, erros e tempo gasto"""
+    start = time.perf_counter()
+    lexer = Lexer(source_code)
+    tokens = lexer.tokenize()
+    return tokens, lexer.errors, time.perf_counter() - start
+
+
+def _parse(index, name, tokens, lexical_errors, lex_time, started):
+    """Estágio sintático + semântico (no executor): BatchResult"""
+    start = time.perf_counter()
+    parser = GRAMMAR.parser()
+    parser.parse(tokens)
+    end = time.perf_counter()
+    return build_result(index, name, lexical_errors, parser,
+                        lex_time, end - start, end - started)
+
+
+async def _stage(work, inbox, outbox, tasks, next_tasks):
+    """
+    Executa 'tasks' tarefas que consomem inbox até _DONE
+
+    work(item) devolve o item do próximo estágio (ou None para descartar).
+    Ao final, envia um _DONE para cada tarefa do próximo estágio.
+    """
+    async def worker():
+        while (item := await inbox.get()) is not _DONE:
+            produced = await work(item)
+            if produced is not None:
+                await outbox.put(produced)
+
+    await asyncio.gather(*(worker() for _ in range(tasks)))
+    for _ in range(next_tasks):
+        await outbox.put(_DONE)
+
+
+async def compile_async(items, readers=READERS, lexers=LEXERS, parsers=PARSERS,
+                        queue_size=QUEUE_SIZE, executor=None):
+    """
+    Compila vários arquivos/códigos num pipeline assíncrono
+
+    Args:
+        items: Iterável de caminhos (str/PathLike) ou pares (nome, código)
+        readers: Leituras de arquivo simultâneas
+        lexers: Análises léxicas simultâneas
+        parsers: Análises sintáticas/semânticas simultâneas
+        queue_size: Capacidade de cada fila entre estágios
+        executor: Executor dos estágios de CPU (padrão: threads próprias)
+
+    Yields:
+        BatchResult na ordem de conclusão
+    """
+    loop = asyncio.get_running_loop()
+    own_executor = executor is None
+    if own_executor:
+        executor = ThreadPoolExecutor(max_workers=lexers + parsers)
+
+    pending = asyncio.Queue(queue_size)
+    sources = asyncio.Queue(queue_size)
+    lexed = asyncio.Queue(queue_size)
+    results = asyncio.Queue(queue_size)
+
+    async def feed():
+        for job in iter_jobs(items):
+            await pending.put(job)
+        for _ in range(readers):
+            await pending.put(_DONE)
+
+    async def read(job):
+        started = time.perf_counter()
+        if len(job) == 3:
+            return job + (started,)
+        index, path = job
+        try:
+            source_code = await loop.run_in_executor(None, read_source, path)
+        except (OSError, UnicodeDecodeError) as e:
+            await results.put(read_error(index, path, e))
+            return None
+        return index, path, source_code, started
+
+    async def lex(item):
+        index, name, source_code, started = item
+        tokens, errors, lex_time = await loop.run_in_executor(executor, _lex, source_code)
+        return index, name, tokens, errors, lex_time, started
+
+    async def parse(item):
+        return await loop.run_in_executor(executor, _parse, *item)
+
+    async def run():
+        try:
+            await asyncio.gather(
+                feed(),
+                _stage(read, pending, sources, readers, lexers),
+                _stage(lex, sources, lexed, lexers, parsers),
+                _stage(parse, lexed, results, parsers, 1),
+            )
+        except Exception as e:
+            await results.put(e)      # Repassa o erro ao consumidor
+
+    stages = asyncio.ensure_future(run())
+    try:
+        while (result := await results.get()) is not _DONE:
+            if isinstance(result, Exception):
+                raise result
+            yield result
+    finally:
+        # Consumidor parou antes do fim (ou erro): cancela os estágios
+        stages.cancel()
+        try:
+            await stages
+        except asyncio.CancelledError:
+            pass
+        if own_executor:
+            executor.shutdown(cancel_futures=True)
+
+
+def percentile(values, fraction):
+    """Valor no percentil 'fraction' (0..1) de uma lista ordenada"""
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+async def _main(paths):
+    failed = 0
+    latencies = []
+    start = time.perf_counter()
+    async for result in compile_async(paths):
+        latencies.append(result.total_time)
+        if not result.success:
+            failed += 1
+            print(f"{result.name}:")
+            for error in result.errors:
+                print(f"  - {error}")
+
+    elapsed = time.perf_counter() - start
+    print(f"{len(paths) - failed}/{len(paths)} arquivo(s) compilado(s) em {elapsed:.2f}s")
+    if latencies:
+        latencies.sort()
+        print("Latência (ms): " + ", ".join(
+            f"p{int(q * 100)} {percentile(latencies, q) * 1000:.2f}" for q in (0.5, 0.95, 0.99)
+        ))
+    return 1 if failed else 0
+
+
+def main(paths):
+    """Compila os arquivos e imprime resumo e latências; código 1 se algum falhar"""
+    return asyncio.run(_main(paths))
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
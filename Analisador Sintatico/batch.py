@@ -0,0 +1,322 @@
+"""
+Compilação em Lote da Linguagem Fantasy
+Distribui muitos arquivos/códigos entre processos (ProcessPoolExecutor)
+
+Cada worker importa o lexer e as tabelas do parser (GRAMMAR) uma única vez,
+no initializer, e depois só recebe lotes (chunks) de trabalhos. Para arquivos
+só o caminho é enviado: o worker lê o arquivo, então o processo principal não
+serializa o conteúdo. Os resultados voltam na ordem em que os lotes terminam.
+
+Com um cache (cache.py), códigos já compilados com a mesma gramática não
+passam pelo lexer nem pelo parser: o worker carrega o resultado do disco.
+
+O lexer é o de lexer.py ("fantasy", padrão) ou o PDALexerAdapter de main.py
+("pda"), criado uma vez por worker.
+
+Com stats=True cada BatchResult traz um CompileStats (stats.py) com tempos
+por fase e contadores; CompileStats.aggregate soma os do lote.
+
+Uso:
+    with BatchCompiler(workers=8, cache=".fantasy-cache") as batch:
+        for result in batch.compile_many(caminhos, chunksize=32):
+            print(result.name, result.success, result.errors)
+
+    python batch.py arquivo1.fan arquivo2.fan ...
+"""
+
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+from cache import CompileCache
+from lexer import Lexer
+from parser_integrated import GRAMMAR
+from result import collect_diagnostics
+from stats import CompileStats
+
+# Lotes por worker usados para calcular o chunksize padrão (mais lotes que
+# workers equilibram arquivos de tamanhos diferentes)
+CHUNKS_PER_WORKER = 8
+MAX_CHUNKSIZE = 64
+
+# Lotes em andamento por worker (limita a memória com entradas muito grandes)
+PENDING_PER_WORKER = 4
+
+LEXERS = ("fantasy", "pda")
+
+_worker_cache = None                  # CompileCache do worker (initializer)
+_worker_lexer = "fantasy"
+_worker_stats = False
+_pda_lexer = None                     # PDALexerAdapter (criado sob demanda)
+
+
+class BatchResult:
+    """Resultado da compilação de um arquivo/código do lote"""
+    __slots__ = ("index", "name", "success", "errors", "warnings",
+                 "lex_time", "parse_time", "total_time", "cached", "stats")
+
+    def __init__(self, index, name, success, errors, warnings,
+                 lex_time=0.0, parse_time=0.0, total_time=0.0, cached=False, stats=None):
+        self.index = index            # Posição na entrada de compile_many
+        self.name = name              # Caminho do arquivo ou nome dado ao código
+        self.success = success
+        self.errors = errors          # Erros léxicos, sintáticos e semânticos
+        self.warnings = warnings
+        self.lex_time = lex_time      # Segundos (medidos no worker)
+        self.parse_time = parse_time
+        self.total_time = total_time  # Inclui a leitura do arquivo
+        self.cached = cached          # Resultado carregado do cache
+        self.stats = stats            # CompileStats (só com stats=True)
+
+    def to_dict(self):
+        """Dict para JSON (mesmos campos das respostas do compile_server)"""
+        return {
+            "index": self.index,
+            "name": self.name,
+            "success": self.success,
+            "cached": self.cached,
+            "errors": self.errors,
+            "warnings": self.warnings,
+            "timings": {
+                "lex_ms": self.lex_time * 1000,
+                "parse_ms": self.parse_time * 1000,
+                "total_ms": self.total_time * 1000,
+            },
+        }
+
+    def __repr__(self):
+        status = "OK" if self.success else f"{len(self.errors)} erro(s)"
+        return f"BatchResult({self.name!r}, {status}, {self.total_time * 1000:.1f} ms)"
+
+
+def compile_source(index, name, source_code, cache=None, lexer="fantasy", stats=False):
+    """
+    Compila um código (léxico + sintático + semântico) sem imprimir nada
+
+    Args:
+        cache: CompileCache consultado antes de compilar (e atualizado depois)
+        lexer: "fantasy" (lexer.py) ou "pda" (PDALexerAdapter)
+        stats: True para medir fases e contadores (result.stats)
+
+    Returns:
+        BatchResult
+    """
+    start = time.perf_counter()
+    measured = CompileStats() if stats else None
+    if cache is not None:
+        key = cache.key(source_code, lexer)
+        entry = cache.get(key)
+        if entry is not None:
+            parser = GRAMMAR.parser()
+            entry.restore(parser, symbols=False)
+            result = build_result(index, name, entry.lexical_errors, parser,
+                                  0.0, 0.0, time.perf_counter() - start)
+            result.cached = True
+            if measured is not None:
+                measured.compilations = measured.cached = 1
+                result.stats = measured
+            return result
+
+    tokens, lexical_errors = _tokenize(source_code, lexer, measured)
+    lexed = time.perf_counter()
+
+    parser = GRAMMAR.parser(stats=measured)
+    if measured is None:
+        parser.parse(tokens)
+    else:
+        measured.parse(parser, tokens)
+    parsed = time.perf_counter()
+
+    if cache is not None:
+        cache.put(key, tokens, lexical_errors, parser)
+    result = build_result(index, name, lexical_errors, parser,
+                          lexed - start, parsed - lexed, parsed - start)
+    result.stats = measured
+    return result
+
+
+def _tokenize(source_code, lexer, stats=None):
+    """(tokens, erros léxicos) com o lexer escolhido"""
+    errors = []
+    if lexer == "pda":
+        global _pda_lexer
+        if _pda_lexer is None:
+            from main import PDALexerAdapter      # main importa este módulo
+            _pda_lexer = PDALexerAdapter()
+        tokenize, args = _pda_lexer.tokenize, (source_code, False)
+    elif lexer == "fantasy":
+        scanner = Lexer(source_code)
+        tokenize, args = scanner.tokenize, ()
+    else:
+        raise ValueError(f"lexer desconhecido: {lexer!r}")
+
+    tokens = tokenize(*args) if stats is None else stats.lex(tokenize, *args)
+    if lexer == "fantasy":
+        errors = scanner.errors       # tokenize() cria a lista de erros
+    return tokens, errors
+
+
+def build_result(index, name, lexical_errors, parser, lex_time, parse_time, total_time):
+    """Monta o BatchResult de um parser que já recebeu o '$'"""
+    errors, warnings = collect_diagnostics(parser, lexical_errors)
+    return BatchResult(index, name, parser.accepted and not errors, errors, warnings,
+                       lex_time, parse_time, total_time)
+
+
+def compile_file(index, path, cache=None, lexer="fantasy", stats=False):
+    """Lê (UTF-8) e compila um arquivo; erro de leitura vira diagnóstico"""
+    start = time.perf_counter()
+    try:
+        source_code = read_source(path)
+    except (OSError, UnicodeDecodeError) as e:
+        return read_error(index, path, e)
+
+    result = compile_source(index, path, source_code, cache, lexer, stats)
+    result.total_time = time.perf_counter() - start
+    return result
+
+
+def read_source(path):
+    """Conteúdo de um arquivo de código (UTF-8)"""
+    with open(path, encoding="utf-8") as f:
+        return f.read()
+
+
+def read_error(index, path, error):
+    """BatchResult de um arquivo que não pôde ser lido"""
+    return BatchResult(index, path, False, [f"ERRO DE LEITURA: {error}"], [])
+
+
+def _warm_worker(cache=None, lexer="fantasy", stats=False):
+    """Initializer: lexer e tabelas já importados; uma compilação aquece o resto"""
+    global _worker_cache, _worker_lexer, _worker_stats
+    _worker_cache = cache
+    _worker_lexer = lexer
+    _worker_stats = stats
+    compile_source(-1, "<aquecimento>", "FUS x := 1 ; print x", lexer=lexer)
+
+
+def _compile_chunk(chunk):
+    """Compila um lote no worker: itens (índice, caminho) ou (índice, nome, código)"""
+    return [
+        compile_file(*item, _worker_cache, _worker_lexer, _worker_stats) if len(item) == 2
+        else compile_source(*item, _worker_cache, _worker_lexer, _worker_stats)
+        for item in chunk
+    ]
+
+
+def iter_jobs(items):
+    """Normaliza a entrada: caminhos (str/PathLike) ou pares (nome, código)"""
+    for index, item in enumerate(items):
+        if isinstance(item, (str, os.PathLike)):
+            yield (index, os.fspath(item))
+        else:
+            name, source_code = item
+            yield (index, name, source_code)
+
+
+class BatchCompiler:
+    """
+    Pool de processos reutilizável para compilação em lote
+
+    Os workers são criados uma vez e ficam aquecidos entre chamadas de
+    compile_many(); use close() (ou 'with') para encerrá-los.
+    """
+
+    def __init__(self, workers=None, chunksize=None, cache=None, lexer="fantasy", stats=False):
+        if lexer not in LEXERS:
+            raise ValueError(f"lexer desconhecido: {lexer!r}")
+        self.workers = workers or os.cpu_count() or 1
+        self.chunksize = chunksize    # None = calculado pelo tamanho da entrada
+        self.lexer = lexer
+        self.stats = stats            # BatchResult.stats em cada resultado
+        # CompileCache ou diretório do cache (None = sem cache)
+        if cache is not None and not isinstance(cache, CompileCache):
+            cache = CompileCache(cache)
+        self.cache = cache
+        self.executor = None          # Criado no primeiro compile_many
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        """Encerra os workers"""
+        if self.executor is not None:
+            self.executor.shutdown(cancel_futures=True)
+            self.executor = None
+
+    def compile_many(self, items, chunksize=None):
+        """
+        Compila vários arquivos/códigos em paralelo
+
+        Args:
+            items: Iterável de caminhos (str/PathLike) ou pares (nome, código)
+            chunksize: Itens por lote enviado a um worker (padrão: self.chunksize
+                       ou calculado a partir de len(items))
+
+        Yields:
+            BatchResult na ordem de conclusão (result.index = posição na entrada)
+        """
+        chunksize = chunksize or self.chunksize or self._default_chunksize(items)
+        if self.executor is None:
+            self.executor = ProcessPoolExecutor(self.workers, initializer=_warm_worker,
+                                                initargs=(self.cache, self.lexer, self.stats))
+
+        jobs = iter_jobs(items)
+        pending = set()
+        max_pending = self.workers * PENDING_PER_WORKER
+        exhausted = False
+
+        while True:
+            # Mantém no máximo max_pending lotes submetidos
+            while not exhausted and len(pending) < max_pending:
+                chunk = [job for _, job in zip(range(chunksize), jobs)]
+                if not chunk:
+                    exhausted = True
+                    break
+                pending.add(self.executor.submit(_compile_chunk, chunk))
+
+            if not pending:
+                return
+
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield from future.result()
+
+    def _default_chunksize(self, items):
+        """Lotes suficientes para equilibrar a carga, sem exceder MAX_CHUNKSIZE"""
+        try:
+            count = len(items)
+        except TypeError:
+            return 16
+        return max(1, min(MAX_CHUNKSIZE, count // (self.workers * CHUNKS_PER_WORKER)))
+
+
+def compile_many(items, workers=None, chunksize=None, cache=None):
+    """Atalho: compila um lote com um pool temporário (ver BatchCompiler)"""
+    with BatchCompiler(workers, chunksize, cache) as batch:
+        yield from batch.compile_many(items)
+
+
+def main(paths):
+    """Compila os arquivos e imprime um resumo; código de saída 1 se algum falhar"""
+    failed = 0
+    start = time.perf_counter()
+    for result in compile_many(paths):
+        if not result.success:
+            failed += 1
+            print(f"{result.name}:")
+            for error in result.errors:
+                print(f"  - {error}")
+
+    elapsed = time.perf_counter() - start
+    print(f"{len(paths) - failed}/{len(paths)} arquivo(s) compilado(s) em {elapsed:.2f}s")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
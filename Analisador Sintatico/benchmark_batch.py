@@ -0,0 +1,71 @@
+"""
+Benchmark da Compilação em Lote (batch.py)
+Vazão (arquivos/s) de compile_many com 1, 2, 4, ... processos
+
+Os programas são gerados como em benchmark_threads.py e gravados num
+diretório temporário, para medir o caminho real (workers leem os arquivos).
+Cada pool é aquecido antes da medição.
+
+Uso:
+    python benchmark_batch.py [arquivos] [comandos_por_arquivo] [chunksize]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+from batch import BatchCompiler, compile_file
+from benchmark_threads import generate_program
+
+
+def worker_counts():
+    """1, 2, 4, ... até o número de CPUs (inclusive)"""
+    cpus = os.cpu_count() or 1
+    counts = [1]
+    while counts[-1] * 2 <= cpus:
+        counts.append(counts[-1] * 2)
+    if counts[-1] != cpus:
+        counts.append(cpus)
+    return counts
+
+
+def main(argv):
+    count = int(argv[0]) if len(argv) > 0 else 2000
+    statements = int(argv[1]) if len(argv) > 1 else 50
+    chunksize = int(argv[2]) if len(argv) > 2 else None
+
+    with tempfile.TemporaryDirectory() as directory:
+        paths = []
+        for i in range(count):
+            path = os.path.join(directory, f"programa{i}.fan")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(generate_program(i, statements))
+            paths.append(path)
+
+        print(f"{count} arquivos x {statements} comandos, {os.cpu_count()} CPU(s)\n")
+
+        start = time.perf_counter()
+        expected = [compile_file(i, path).success for i, path in enumerate(paths)]
+        sequential = time.perf_counter() - start
+        print(f"{'sequencial':>10} {sequential:>10.3f}s {count / sequential:>10.1f} arquivos/s")
+
+        for workers in worker_counts():
+            with BatchCompiler(workers, chunksize) as batch:
+                list(batch.compile_many(paths[:workers]))   # aquece o pool
+
+                start = time.perf_counter()
+                results = list(batch.compile_many(paths))
+                elapsed = time.perf_counter() - start
+
+            if sorted((r.index, r.success) for r in results) != list(enumerate(expected)):
+                print(f"[X] Resultado divergente com {workers} processo(s)")
+                return 1
+            print(f"{workers:>10} {elapsed:>10.3f}s {count / elapsed:>10.1f} arquivos/s "
+                  f"{sequential / elapsed:>6.2f}x")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
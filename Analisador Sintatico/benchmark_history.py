@@ -0,0 +1,318 @@
+"""
+Histórico de Benchmarks e Comparação entre Revisões
+
+Guarda os resultados de benchmark_suite.py num arquivo JSON Lines (uma
+execução por linha, com commit, máquina e Python) e compara duas revisões
+caso a caso, apontando só as diferenças estatisticamente significativas.
+
+Revisão = commit + "sujo" (alterações não commitadas). Todas as execuções
+de uma revisão na mesma máquina são somadas: cada execução traz os tempos
+de --repeat rodadas por caso, então gravar mais execuções estreita os
+intervalos.
+
+Comparação, por caso (alvo, formato, tamanho): diferença das médias do
+log do tempo (teste t de Welch), com intervalo de confiança convertido em
+variação de vazão. Um caso é LENTO se o intervalo inteiro fica abaixo de
+zero e a variação passa de --threshold (padrão 2%); RÁPIDO, o simétrico.
+Código de saída 1 se algum caso ficou LENTO (serve de gate de CI).
+
+Seletores de revisão:
+    latest       revisão da execução mais recente
+    #12          só a execução 12
+    3f2a9c1      execuções limpas do commit (prefixo)
+    3f2a9c1+     execuções com alterações não commitadas sobre o commit
+
+Uso:
+    python benchmark_history.py run --max-exp 4          # executa e grava
+    (altera parser_integrated.py)
+    python benchmark_history.py run --max-exp 4
+    python benchmark_history.py compare                  # HEAD+ x HEAD
+    python benchmark_history.py record resultados.json
+    python benchmark_history.py list
+    python benchmark_history.py compare 3f2a9c1 latest --targets parser semantic
+"""
+
+import argparse
+import datetime
+import json
+import math
+import os
+import statistics
+import sys
+
+STORE = os.path.join(".benchmarks", "history.jsonl")
+THRESHOLD = 0.02
+CONFIDENCE = 0.95
+
+FASTER = "RÁPIDO"
+SLOWER = "LENTO"
+SAME = "="
+UNKNOWN = "?"
+
+
+# --- Armazenamento -----------------------------------------------------------
+
+class HistoryStore:
+    """Execuções de benchmark_suite.py em JSON Lines (só acrescenta)"""
+
+    def __init__(self, path=STORE):
+        self.path = path
+
+    def runs(self):
+        """Execuções gravadas, da mais antiga à mais recente"""
+        if not os.path.exists(self.path):
+            return []
+        runs = []
+        with open(self.path, encoding="utf-8") as file:
+            for line in file:
+                if line.strip():
+                    runs.append(json.loads(line))
+        return runs
+
+    def record(self, results):
+        """Acrescenta um documento de resultados; devolve o id da execução"""
+        runs = self.runs()
+        run_id = runs[-1]["id"] + 1 if runs else 1
+        entry = {"id": run_id,
+                 "recorded": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds")}
+        entry.update(results)
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as file:
+            file.write(json.dumps(entry) + "\n")
+        return run_id
+
+
+def revision(run):
+    """'commit' ou 'commit+' (sujo); '?' fora de um repositório git"""
+    environment = run.get("environment", {})
+    commit = (environment.get("commit") or "?")[:10]
+    return commit + ("+" if environment.get("dirty") else "")
+
+
+def select(runs, selector, machine=None):
+    """Execuções de uma revisão (ver seletores no topo do módulo)"""
+    if machine is not None:
+        runs = [run for run in runs if run["environment"].get("machine") == machine]
+    if not runs:
+        raise ValueError("nenhuma execução gravada" + (f" na máquina {machine}" if machine else ""))
+    if selector == "latest":
+        wanted = revision(runs[-1])
+        return [run for run in runs if revision(run) == wanted]
+    if selector.startswith("#"):
+        chosen = [run for run in runs if str(run["id"]) == selector[1:]]
+    else:
+        dirty = selector.endswith("+")
+        prefix = selector.rstrip("+")
+        chosen = [run for run in runs
+                  if (run["environment"].get("commit") or "").startswith(prefix)
+                  and bool(run["environment"].get("dirty")) == dirty]
+    if not chosen:
+        raise ValueError(f"nenhuma execução corresponde a '{selector}'")
+    return chosen
+
+
+def previous(runs, newer):
+    """Execuções da revisão anterior (mais recente diferente de 'newer')"""
+    wanted = revision(newer[0])
+    machine = newer[0]["environment"].get("machine")
+    for run in reversed(runs):
+        if revision(run) != wanted and run["environment"].get("machine") == machine:
+            return [other for other in runs if revision(other) == revision(run)
+                    and other["environment"].get("machine") == machine]
+    raise ValueError(f"não há outra revisão gravada na máquina {machine} para comparar")
+
+
+# --- Estatística -------------------------------------------------------------
+
+def t_quantile(probability, df):
+    """
+    Quantil da distribuição t de Student
+
+    Exato para 1 e 2 graus de liberdade; expansão de Cornish-Fisher a
+    partir de 3 (erro < 1% para intervalos de 95%); interpolação entre eles.
+    """
+    df = max(df, 1.0)
+    if df >= 3:
+        z = statistics.NormalDist().inv_cdf(probability)
+        return (z + (z ** 3 + z) / (4 * df)
+                + (5 * z ** 5 + 16 * z ** 3 + 3 * z) / (96 * df ** 2)
+                + (3 * z ** 7 + 19 * z ** 5 + 17 * z ** 3 - 15 * z) / (384 * df ** 3))
+    one = math.tan(math.pi * (probability - 0.5))
+    two = (2 * probability - 1) / math.sqrt(2 * probability * (1 - probability))
+    if df <= 2:
+        return one + (two - one) * (df - 1)
+    return two + (t_quantile(probability, 3) - two) * (df - 2)
+
+
+def compare_samples(base, new, confidence=CONFIDENCE):
+    """
+    Tempos de duas revisões -> (variação da vazão, IC inferior, IC superior)
+
+    Variação = tempo_base / tempo_novo - 1 (média geométrica); +5% = mais
+    rápido. IC None com menos de duas amostras de cada lado.
+    """
+    x = [math.log(value) for value in base if value > 0]
+    y = [math.log(value) for value in new if value > 0]
+    difference = statistics.fmean(y) - statistics.fmean(x)
+    change = math.exp(-difference) - 1
+    if len(x) < 2 or len(y) < 2:
+        return change, None, None
+
+    vx, vy = statistics.variance(x) / len(x), statistics.variance(y) / len(y)
+    error = math.sqrt(vx + vy)
+    if error == 0:
+        return change, change, change
+    df = (vx + vy) ** 2 / (vx ** 2 / (len(x) - 1) + vy ** 2 / (len(y) - 1))
+    margin = t_quantile(1 - (1 - confidence) / 2, df) * error
+    return change, math.exp(-(difference + margin)) - 1, math.exp(-(difference - margin)) - 1
+
+
+def _case_samples(runs):
+    """(alvo, formato, tamanho) -> tempos de todas as execuções"""
+    samples = {}
+    for run in runs:
+        for case in run.get("cases", ()):
+            if case.get("runs"):
+                key = (case["target"], case["shape"], case["size"])
+                samples.setdefault(key, []).extend(case["runs"])
+    return samples
+
+
+def compare_runs(base_runs, new_runs, threshold=THRESHOLD, confidence=CONFIDENCE, targets=None):
+    """Linhas de comparação: (chave, amostras base, amostras novo, variação, IC, status)"""
+    base, new = _case_samples(base_runs), _case_samples(new_runs)
+    rows = []
+    for key in sorted(base.keys() & new.keys()):
+        if targets and key[0] not in targets:
+            continue
+        change, low, high = compare_samples(base[key], new[key], confidence)
+        if low is None:
+            status = UNKNOWN
+        elif high < 0 and change <= -threshold:
+            status = SLOWER
+        elif low > 0 and change >= threshold:
+            status = FASTER
+        else:
+            status = SAME
+        rows.append((key, len(base[key]), len(new[key]), change, low, high, status))
+    return rows
+
+
+# --- Linha de comando --------------------------------------------------------
+
+def _describe(runs):
+    environment = runs[0]["environment"]
+    count = len(runs)
+    return (f"{revision(runs[0])} ({count} {'execuções' if count > 1 else 'execução'}, "
+            f"{environment.get('machine')}, Python {environment.get('python')})")
+
+
+def _percent(value):
+    return f"{value * 100:+6.1f}%" if value is not None else "     ?"
+
+
+def print_comparison(base_runs, new_runs, rows, confidence, out=None):
+    out = out or sys.stdout
+    print(f"base: {_describe(base_runs)}", file=out)
+    print(f"novo: {_describe(new_runs)}", file=out)
+    if base_runs[0]["environment"].get("machine") != new_runs[0]["environment"].get("machine"):
+        print("[!] máquinas diferentes: os tempos não são comparáveis diretamente", file=out)
+    print(f"\n{'alvo':<13} {'formato':<12} {'tamanho':>9} {'n':>7} {'vazão':>8} "
+          f"{f'IC {confidence:.0%}':>17}  status", file=out)
+    by_target = {}
+    for (target, shape, size), nb, nn, change, low, high, status in rows:
+        interval = f"[{_percent(low)}, {_percent(high)}]" if low is not None else "sem amostras"
+        print(f"{target:<13} {shape:<12} {size:>9} {nb:>3}/{nn:<3} {_percent(change)} "
+              f"{interval:>17}  {status}", file=out)
+        by_target.setdefault(target, []).append(math.log1p(change))
+    if by_target:
+        print("\nVariação média por alvo (geométrica):", file=out)
+        for target, logs in by_target.items():
+            print(f"  {target:<13} {_percent(math.expm1(statistics.fmean(logs)))}", file=out)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Histórico e comparação de benchmarks")
+    parser.add_argument("--store", default=STORE, help=f"arquivo JSON Lines (padrão: {STORE})")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    record = commands.add_parser("record", help="grava resultados de benchmark_suite.py -o")
+    record.add_argument("results", nargs="+", metavar="JSON")
+
+    commands.add_parser("run", help="executa benchmark_suite.py e grava; os demais "
+                        "argumentos vão para a suíte (ex.: --max-exp 4 --targets parser)")
+
+    listing = commands.add_parser("list", help="lista as execuções gravadas")
+    listing.add_argument("--machine")
+
+    compare = commands.add_parser("compare", help="compara duas revisões")
+    compare.add_argument("base", nargs="?", help="revisão base (padrão: a anterior à nova)")
+    compare.add_argument("new", nargs="?", default="latest", help="revisão nova (padrão: latest)")
+    compare.add_argument("--machine", help="só execuções desta máquina (padrão: a da nova)")
+    compare.add_argument("--targets", nargs="+")
+    compare.add_argument("--threshold", type=float, default=THRESHOLD,
+                         help="variação mínima para apontar (padrão: 0.02 = 2%%)")
+    compare.add_argument("--confidence", type=float, default=CONFIDENCE)
+    args, suite_args = parser.parse_known_args(argv)
+    if suite_args and args.command != "run":
+        parser.error(f"argumentos não reconhecidos: {' '.join(suite_args)}")
+
+    store = HistoryStore(args.store)
+
+    if args.command == "record":
+        for path in args.results:
+            with open(path, encoding="utf-8") as file:
+                run_id = store.record(json.load(file))
+            print(f"#{run_id} <- {path}")
+        return 0
+
+    if args.command == "run":
+        from benchmark_suite import main as suite_main
+        import tempfile
+
+        handle, path = tempfile.mkstemp(suffix=".json")
+        os.close(handle)
+        try:
+            suite_main(suite_args + ["-o", path])
+            with open(path, encoding="utf-8") as file:
+                run_id = store.record(json.load(file))
+        finally:
+            os.unlink(path)
+        print(f"Gravado como #{run_id} em {args.store}")
+        return 0
+
+    runs = store.runs()
+    if args.command == "list":
+        for run in runs:
+            environment = run["environment"]
+            if args.machine and environment.get("machine") != args.machine:
+                continue
+            print(f"#{run['id']:<4} {run['recorded']}  {revision(run):<11} "
+                  f"{environment.get('machine')}  Python {environment.get('python')}  "
+                  f"{len(run.get('cases', ()))} casos")
+        return 0
+
+    try:
+        new_runs = select(runs, args.new, args.machine)
+        machine = args.machine or new_runs[0]["environment"].get("machine")
+        if args.base is None:
+            base_runs = previous(runs, new_runs)
+        else:
+            base_runs = select(runs, args.base, machine)
+    except ValueError as e:
+        parser.error(str(e))
+    rows = compare_runs(base_runs, new_runs, args.threshold, args.confidence, args.targets)
+    if not rows:
+        parser.error("as revisões não têm casos em comum")
+    print_comparison(base_runs, new_runs, rows, args.confidence)
+    slower = sum(1 for row in rows if row[-1] == SLOWER)
+    if slower:
+        print(f"\n[X] {slower} caso(s) significativamente mais lento(s)")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
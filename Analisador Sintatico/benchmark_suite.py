@@ -0,0 +1,332 @@
+"""
+Suíte de Benchmarks: Lexer, PDA, Parser e Tabela de Símbolos em Escala
+
+Gera programas Fantasy de 10^2 a 10^7 tokens em quatro formatos e mede,
+para cada alvo, vazão, latência (p50/p95/p99 das execuções) e pico de
+memória (tracemalloc, numa execução separada das cronometradas).
+
+Formatos (--shapes):
+    statements   lista longa de comandos (declarações, atribuições, LOS, FOD)
+    nesting      uma cadeia KEL m0 KEL m1 ... (pilha do parser tão funda
+                 quanto a entrada)
+    expression   uma única expressão longa (cauda EXPR' recursiva à direita)
+    identifiers  muitos nomes distintos e longos, declarados e usados
+    random       derivações aleatórias da gramática (program_generator.py)
+
+Alvos (--targets):
+    lexer         Lexer(codigo).tokenize()
+    pda           PDALexerAdapter.tokenize(codigo, verbose=False)
+    parser        GRAMMAR.parser().parse(tokens), tokens já prontos
+    semantic      o mesmo parse com CompileStats; conta só o tempo dos
+                  handlers semânticos e da verificação final (stats.py)
+    symbol_table  declare/lookup/update_value numa SymbolTable, n operações
+                  (latências por operação, em vez de por execução)
+
+Cada caso roda --repeat vezes, parando antes se passar de --budget segundos
+(ao menos uma execução). Os resultados vão para um JSON (--output) com
+máquina, Python e commit, em chaves estáveis (alvo, formato, tamanho) para
+comparar execuções (benchmark_history.py guarda e compara).
+
+Uso:
+    python benchmark_suite.py                          # 10^2 .. 10^5 tokens
+    python benchmark_suite.py --max-exp 7 -o full.json # até 10^7 (minutos, GBs)
+    python benchmark_suite.py --targets parser --shapes nesting expression
+"""
+
+import argparse
+import datetime
+import gc
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+
+from async_pipeline import percentile
+from lexer import Lexer
+from main import PDALexerAdapter
+from parser_integrated import GRAMMAR
+from program_generator import ProgramGenerator
+from stats import CompileStats
+from symbol_table import SymbolTable
+
+RESULTS_FORMAT = 1
+TARGETS = ("lexer", "pda", "parser", "semantic", "symbol_table")
+REPEAT = 5
+BUDGET = 10.0                         # Segundos por caso (além da 1ª execução)
+
+
+# --- Geradores ---------------------------------------------------------------
+
+def _statements(tokens):
+    lines = []
+    count = 0
+    i = 0
+    while count < tokens:
+        kind = i % 4
+        if kind == 0 or i < 4:
+            lines.append(f"FUS v{i} := {i} + 1 - {i % 7}")      # 8 tokens
+            count += 8
+        elif kind == 1:
+            a = f"v{i - i % 4}"
+            lines.append(f"assign {a} := {a} + 1")              # 7 tokens
+            count += 7
+        elif kind == 2:
+            lines.append(f"LOS v{i - 2} print v{i - 2}")        # 5 tokens
+            count += 5
+        else:
+            lines.append(f"FOD assign v{i - 3} := v{i - 3} - 1 FAH v{i - 3}")   # 10 tokens
+            count += 10
+        i += 1
+    return " ;\n".join(lines)
+
+
+def _nesting(tokens):
+    depth = max(1, (tokens - 6) // 2)
+    return " ".join(f"KEL m{i}" for i in range(depth)) + " FUS x := 1 ; print x"
+
+
+def _expression(tokens):
+    terms = max(1, (tokens - 7) // 2)
+    operators = ("+", "-", "ANRK", "AAN", "KO")
+    parts = ["1"]
+    for i in range(1, terms):
+        parts.append(operators[i % len(operators)])
+        parts.append(str(i))
+    return f"FUS x := {' '.join(parts)} ; print x"
+
+
+def _identifiers(tokens):
+    names = max(2, tokens // 40)
+    lines = [f"FUS identificador_longo_{i} := {i}" for i in range(names)]
+    count = 5 * names
+    i = 0
+    while count < tokens:
+        a = f"identificador_longo_{i % names}"
+        b = f"identificador_longo_{(i * 7 + 3) % names}"
+        c = f"identificador_longo_{(i * 13 + 5) % names}"
+        lines.append(f"assign {a} := {b} + {c} - {a}")          # 10 tokens
+        count += 10
+        i += 1
+    return " ;\n".join(lines)
+
+
+def _random(tokens):
+    return ProgramGenerator(seed=tokens, max_tokens=tokens).text()
+
+
+SHAPES = {
+    "statements": _statements,
+    "nesting": _nesting,
+    "expression": _expression,
+    "identifiers": _identifiers,
+    "random": _random,
+}
+
+
+def generate(shape, tokens):
+    """Programa do formato 'shape' com aproximadamente 'tokens' tokens"""
+    return SHAPES[shape](tokens)
+
+
+# --- Medição -----------------------------------------------------------------
+
+def _measure(run, repeat, budget, timed=False):
+    """
+    Executa run() até 'repeat' vezes (ou até o orçamento); devolve os tempos
+
+    timed=True: run() devolve o próprio tempo medido (ex.: só uma fase)
+    """
+    times = []
+    spent = 0.0
+    while len(times) < repeat and (not times or spent < budget):
+        gc.collect()
+        start = time.perf_counter()
+        measured = run()
+        elapsed = time.perf_counter() - start
+        times.append(measured if timed else elapsed)
+        spent += elapsed
+    return times
+
+
+def _semantic_time(tokens):
+    """Segundos de fase semântica de um parse medido com CompileStats"""
+    stats = CompileStats()
+    GRAMMAR.parser(stats=stats).parse(tokens)
+    return stats.wall["semantic"]
+
+
+def _peak_memory(run):
+    """Pico de memória alocada (bytes) durante uma execução de run()"""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        run()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def _symbol_table_workload(operations):
+    """Latências (s) por operação: declare, lookup e update_value alternados"""
+    names = [f"simbolo_{i}" for i in range(max(1, operations // 3))]
+    table = SymbolTable()
+    clock = time.perf_counter_ns
+    latencies = []
+    for name in names:
+        start = clock()
+        table.declare(name, value=1)
+        latencies.append(clock() - start)
+    for name in names:
+        start = clock()
+        symbol = table.lookup(name)
+        latencies.append(clock() - start)
+        start = clock()
+        table.update_value(symbol, 2)
+        latencies.append(clock() - start)
+    return [latency / 1e9 for latency in latencies]
+
+
+def bench_case(target, shape, size, repeat=REPEAT, budget=BUDGET, memory=True):
+    """Mede um alvo num programa gerado; devolve o dict do caso"""
+    case = {"target": target, "shape": shape, "size": size}
+
+    if target == "symbol_table":
+        # Não depende do formato do programa: n operações na tabela
+        samples = []
+        runs = []
+        for _ in range(repeat):
+            latencies = _symbol_table_workload(size)
+            samples.extend(latencies)
+            runs.append(sum(latencies))
+        samples.sort()
+        operations = len(samples) // repeat
+        median = percentile(sorted(runs), 0.5)
+        case.update({
+            "operations": operations,
+            "unit": "ops/s",
+            "runs": runs,
+            "median_s": median,
+            "throughput": operations / median if median > 0 else 0.0,
+            "p50_ms": percentile(samples, 0.5) * 1000,
+            "p95_ms": percentile(samples, 0.95) * 1000,
+            "p99_ms": percentile(samples, 0.99) * 1000,
+        })
+        if memory:
+            case["peak_bytes"] = _peak_memory(lambda: _symbol_table_workload(size))
+        return case
+
+    source_code = generate(shape, size)
+    tokens = Lexer(source_code).tokenize()
+    if target == "lexer":
+        run = lambda: Lexer(source_code).tokenize()
+    elif target == "pda":
+        adapter = PDALexerAdapter()
+        run = lambda: adapter.tokenize(source_code, verbose=False)
+    elif target == "parser":
+        run = lambda: GRAMMAR.parser().parse(tokens)
+    elif target == "semantic":
+        run = lambda: _semantic_time(tokens)
+    else:
+        raise ValueError(f"alvo desconhecido: {target!r}")
+
+    times = _measure(run, repeat, budget, timed=target == "semantic")
+    ordered = sorted(times)
+    median = percentile(ordered, 0.5)
+    case.update({
+        "tokens": len(tokens),
+        "bytes": len(source_code.encode("utf-8")),
+        "unit": "tokens/s",
+        "runs": times,
+        "median_s": median,
+        "throughput": len(tokens) / median if median > 0 else 0.0,
+        "p50_ms": median * 1000,
+        "p95_ms": percentile(ordered, 0.95) * 1000,
+        "p99_ms": percentile(ordered, 0.99) * 1000,
+    })
+    if memory:
+        case["peak_bytes"] = _peak_memory(run)
+    return case
+
+
+# --- Execução ----------------------------------------------------------------
+
+def environment():
+    """Máquina, Python e commit (se for um repositório git)"""
+    def git(*args):
+        try:
+            return subprocess.run(
+                ["git", *args], capture_output=True, text=True, timeout=5,
+                cwd=os.path.dirname(os.path.abspath(__file__)),
+            ).stdout.strip() or None
+        except (OSError, subprocess.SubprocessError):
+            return None
+
+    commit = git("rev-parse", "HEAD")
+    return {
+        "created": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "machine": platform.node(),
+        "platform": platform.platform(),
+        "processor": platform.machine(),
+        "cpus": os.cpu_count(),
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "commit": commit,
+        # Alterações não commitadas: os números são de HEAD + diff
+        "dirty": commit is not None and bool(git("status", "--porcelain", "--untracked-files=no")),
+    }
+
+
+def run_suite(targets=TARGETS, shapes=tuple(SHAPES), sizes=None, repeat=REPEAT,
+              budget=BUDGET, memory=True, progress=None):
+    """Executa todos os casos; devolve o documento de resultados (dict)"""
+    sizes = sizes or [10 ** exponent for exponent in range(2, 6)]
+    cases = []
+    for target in targets:
+        # A tabela de símbolos não usa o programa: um caso por tamanho
+        target_shapes = ("-",) if target == "symbol_table" else shapes
+        for shape in target_shapes:
+            for size in sizes:
+                case = bench_case(target, shape, size, repeat, budget, memory)
+                cases.append(case)
+                if progress:
+                    progress(case)
+    return {"format": RESULTS_FORMAT, "environment": environment(), "cases": cases}
+
+
+def format_case(case):
+    peak = case.get("peak_bytes")
+    memory = f"{peak / 2 ** 20:9.2f} MiB" if peak is not None else f"{'-':>13}"
+    return (f"{case['target']:<13} {case['shape']:<12} {case['size']:>9} "
+            f"{case['throughput']:>14,.0f} {case['unit']:<8} "
+            f"p50 {case['p50_ms']:10.4f} ms  p99 {case['p99_ms']:10.4f} ms  {memory}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks do compilador Fantasy em escala")
+    parser.add_argument("--targets", nargs="+", choices=TARGETS, default=list(TARGETS))
+    parser.add_argument("--shapes", nargs="+", choices=tuple(SHAPES), default=list(SHAPES))
+    parser.add_argument("--min-exp", type=int, default=2, help="menor tamanho: 10^N tokens")
+    parser.add_argument("--max-exp", type=int, default=5, help="maior tamanho: 10^N tokens")
+    parser.add_argument("--repeat", type=int, default=REPEAT)
+    parser.add_argument("--budget", type=float, default=BUDGET,
+                        help="segundos por caso antes de parar de repetir")
+    parser.add_argument("--no-memory", action="store_true", help="não mede o pico de memória")
+    parser.add_argument("-o", "--output", metavar="JSON", help="grava os resultados em JSON")
+    args = parser.parse_args(argv)
+
+    sizes = [10 ** exponent for exponent in range(args.min_exp, args.max_exp + 1)]
+    print(f"{'alvo':<13} {'formato':<12} {'tamanho':>9} {'vazão':>14}")
+    results = run_suite(args.targets, args.shapes, sizes, args.repeat, args.budget,
+                        not args.no_memory, progress=lambda case: print(format_case(case), flush=True))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(results, file, indent=2)
+        print(f"\nResultados gravados em {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
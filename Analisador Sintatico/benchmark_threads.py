@@ -0,0 +1,87 @@
+"""
+Benchmark de Escalabilidade com Threads
+Mede a vazão (programas/s) compilando vários programas em paralelo
+
+Todas as threads compartilham o mesmo CompiledGrammar (GRAMMAR, imutável);
+cada compilação usa seu próprio Lexer e seu próprio SLRParserWithSemantics.
+Num interpretador com GIL a vazão fica praticamente constante; num build
+free-threaded (python3.13t ou mais novo) ela deve crescer com as threads.
+
+Uso:
+    python benchmark_threads.py [programas] [comandos_por_programa]
+"""
+
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from lexer import Lexer
+from parser_integrated import GRAMMAR
+
+THREAD_COUNTS = (1, 2, 4, 8)
+
+
+def generate_program(seed, statements):
+    """Programa sintético com declarações, atribuições, condicionais e laços"""
+    lines = []
+    declared = []
+    for i in range(statements):
+        kind = (i + seed) % 4
+        if kind == 0 or not declared:
+            lines.append(f"FUS v{i} := {i + seed} + 1 - {i % 7}")
+            declared.append(f"v{i}")
+            continue
+        a = declared[i % len(declared)]
+        b = declared[(i * 7) % len(declared)]
+        if kind == 1:
+            lines.append(f"assign {a} := {a} + {b}")
+        elif kind == 2:
+            lines.append(f"LOS {a} print {b}")
+        else:
+            lines.append(f"FOD assign {a} := {a} - 1 FAH {b}")
+    return " ;\n".join(lines)
+
+
+def compile_source(source_code):
+    """Compila um programa e devolve um resumo comparável do resultado"""
+    parser = GRAMMAR.parser()
+    parser.parse(Lexer(source_code).tokenize())
+    return parser.accepted, tuple(parser.errors), tuple(parser.symbol_table.warnings)
+
+
+def run(programs, threads):
+    """Compila todos os programas com 'threads' threads; devolve (tempo, resultados)"""
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        results = list(pool.map(compile_source, programs))
+    return time.perf_counter() - start, results
+
+
+def main(argv):
+    count = int(argv[0]) if len(argv) > 0 else 64
+    statements = int(argv[1]) if len(argv) > 1 else 500
+    programs = [generate_program(seed, statements) for seed in range(count)]
+
+    gil_check = getattr(sys, "_is_gil_enabled", None)
+    gil = "ativo" if gil_check is None or gil_check() else "desativado"
+    print(f"Python {sys.version.split()[0]} (GIL {gil})")
+    print(f"{count} programas x {statements} comandos\n")
+
+    # Referência sequencial: as execuções paralelas devem dar o mesmo resultado
+    expected = [compile_source(source) for source in programs]
+
+    baseline = None
+    print(f"{'threads':>8} {'tempo (s)':>10} {'programas/s':>12} {'speedup':>8}")
+    for threads in THREAD_COUNTS:
+        elapsed, results = run(programs, threads)
+        if results != expected:
+            print(f"[X] Resultado divergente com {threads} thread(s)")
+            return 1
+        baseline = baseline or elapsed
+        print(f"{threads:>8} {elapsed:>10.3f} {count / elapsed:>12.1f} {baseline / elapsed:>7.2f}x")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,129 @@
+"""
+Benchmark: Tokens por Memória Compartilhada x Listas de Token com pickle
+
+1. Custo do transporte, num único processo, para um código grande:
+     pickle   pickle.dumps(lista de Token) + pickle.loads
+     ring     encode_tokens no TokenRing + leitura dos registros
+   (o lexing em si é medido à parte como referência)
+
+2. Pipeline completo lexer -> parser em processos separados:
+     pickle   lexers enviam (índice, tokens, erros) por uma multiprocessing.Queue
+     ring     token_ring.compile_pipeline
+
+Uso:
+    python benchmark_tokens.py [arquivos] [comandos_por_arquivo] [pares]
+"""
+
+import multiprocessing
+import pickle
+import sys
+import time
+
+from batch import build_result
+from benchmark_threads import generate_program
+from lexer import Lexer
+from parser_integrated import GRAMMAR
+from token_ring import EOF, TokenRing, compile_pipeline, encode_tokens
+
+
+def measure_transport(source_code):
+    """Tempos (lexing, pickle, ring) para um único código"""
+    start = time.perf_counter()
+    tokens = Lexer(source_code).tokenize()
+    lexing = time.perf_counter() - start
+
+    start = time.perf_counter()
+    pickle.loads(pickle.dumps(tokens, pickle.HIGHEST_PROTOCOL))
+    pickled = time.perf_counter() - start
+
+    ring = TokenRing(capacity=len(tokens) + 1)
+    try:
+        start = time.perf_counter()
+        encode_tokens(Lexer(source_code), ring)
+        ring.flush()
+        records = ring.records()
+        for record in records:
+            if record[0] == EOF:
+                break
+        records.close()
+        shared = time.perf_counter() - start - lexing   # desconta o lexing
+    finally:
+        ring.unlink()
+
+    return len(tokens), lexing, pickled, shared
+
+
+def _pickle_lexer(sources, counter, channel):
+    while True:
+        with counter.get_lock():
+            index = counter.value
+            counter.value += 1
+        if index >= len(sources):
+            channel.put(None)
+            return
+        lexer = Lexer(sources[index][1])
+        tokens = lexer.tokenize()
+        channel.put((index, tokens, lexer.errors))
+
+
+def _pickle_parser(sources, channel, results):
+    while True:
+        item = channel.get()
+        if item is None:
+            return
+        index, tokens, errors = item
+        parser = GRAMMAR.parser()
+        parser.parse(tokens)
+        results.put(build_result(index, sources[index][0], errors, parser, 0.0, 0.0, 0.0))
+
+
+def pickle_pipeline(sources, pairs):
+    """Mesmo arranjo do compile_pipeline, mas com listas de Token via Queue"""
+    context = multiprocessing.get_context()
+    counter = context.Value("q", 0)
+    results = context.Queue()
+    processes = []
+    for _ in range(pairs):
+        channel = context.Queue(maxsize=4)              # backpressure
+        processes.append(context.Process(target=_pickle_lexer, args=(sources, counter, channel)))
+        processes.append(context.Process(target=_pickle_parser, args=(sources, channel, results)))
+    for process in processes:
+        process.start()
+    collected = [results.get() for _ in sources]
+    for process in processes:
+        process.join()
+    return collected
+
+
+def main(argv):
+    count = int(argv[0]) if len(argv) > 0 else 16
+    statements = int(argv[1]) if len(argv) > 1 else 20000
+    pairs = int(argv[2]) if len(argv) > 2 else 1
+
+    sources = [(f"programa{i}", generate_program(i, statements)) for i in range(count)]
+
+    tokens, lexing, pickled, shared = measure_transport(sources[0][1])
+    print(f"Transporte de {tokens} tokens (um processo):")
+    print(f"  lexing (referência) {lexing:8.3f}s")
+    print(f"  pickle dumps+loads  {pickled:8.3f}s")
+    print(f"  ring grava+lê       {shared:8.3f}s\n")
+
+    print(f"Pipeline: {count} arquivos x {statements} comandos, {pairs} par(es) lexer/parser")
+    start = time.perf_counter()
+    expected = sorted((r.index, r.success, r.errors) for r in pickle_pipeline(sources, pairs))
+    pickled = time.perf_counter() - start
+    print(f"  pickle {pickled:8.3f}s")
+
+    start = time.perf_counter()
+    results = sorted((r.index, r.success, r.errors) for r in compile_pipeline(sources, pairs))
+    shared = time.perf_counter() - start
+    print(f"  ring   {shared:8.3f}s  ({pickled / shared:.2f}x)")
+
+    if results != expected:
+        print("[X] Resultados divergentes")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,471 @@
+"""
+Cache de Compilação em Disco (endereçado por conteúdo)
+
+Compilar de novo um arquivo que não mudou dá sempre o mesmo resultado. A
+chave de cada entrada é o SHA-256 de:
+    código fonte | versão da gramática/tabelas | lexer usado ("fantasy" ou "pda")
+A versão da gramática cobre as tabelas ACTION/GOTO, as produções e o código
+das ações semânticas, da tabela de símbolos, do lexer e dos textos dos
+diagnósticos (diagnostics.py, governor.py): mudar qualquer um deles gera
+chaves novas (as entradas antigas saem pelo LRU).
+
+Cada entrada guarda os tokens, a tabela de símbolos final, a AST e os
+diagnósticos, num formato binário compacto:
+
+    cabeçalho "<4sHI" (MAGIC, CACHE_FORMAT, crc32) | zlib(marshal(dados))
+
+Tokens e nós da AST são gravados em colunas (só bytes, str, int e tuplas),
+então o marshal não executa nada ao carregar e não há recursão em
+expressões longas.
+
+- Gravação atômica: arquivo temporário no mesmo diretório + os.replace,
+  seguro com vários processos (workers do BatchCompiler) no mesmo cache
+- LRU: uma leitura atualiza o mtime da entrada; passando de max_bytes, as
+  entradas mais antigas são removidas até sobrar EVICT_TO do limite
+
+Uso:
+    cache = CompileCache(".fantasy-cache")
+    compilador = CompiladorCompleto(verbose=False, cache=cache)
+    compilador.compile(codigo)        # 2ª vez: sem léxico nem parser
+
+    with BatchCompiler(workers=8, cache=".fantasy-cache") as batch:
+        ...
+"""
+
+import hashlib
+import marshal
+import os
+import struct
+import tempfile
+import zlib
+from functools import lru_cache
+from itertools import accumulate
+
+import ast_nodes
+from ast_nodes import CHILDREN, Node, Program
+from lexer import LexicalError
+from parser_integrated import GRAMMAR, Token
+from symbol_table import Scope, Symbol, SymbolTable
+
+CACHE_FORMAT = 1                      # Muda quando o formato da entrada muda
+MAGIC = b"FCC\0"
+HEADER = struct.Struct("<4sHI")       # magic, formato, crc32 dos dados
+
+MAX_BYTES = 256 * 1024 * 1024         # Limite padrão do diretório
+EVICT_TO = 0.8                        # Fração do limite que sobra após a limpeza
+
+# Módulos cujo código afeta o resultado, além das tabelas (as mensagens de
+# diagnostics.py e governor.py são gravadas já como texto)
+_DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+_SEMANTIC_SOURCES = ("parser_integrated.py", "symbol_table.py", "ast_nodes.py",
+                     "diagnostics.py", "governor.py")
+BACKEND_SOURCES = {
+    "fantasy": ("lexer.py",),
+    "pda": ("main.py", os.path.join("Compiladores", "pda.py"),
+            os.path.join("Compiladores", "delta.py")),
+}
+
+# Classes de nó da AST gravadas pelo índice nesta tupla
+_NODE_CLASSES = tuple(
+    cls for cls in vars(ast_nodes).values()
+    if isinstance(cls, type) and issubclass(cls, Node) and cls is not Node
+)
+_NODE_CODES = {cls: code for code, cls in enumerate(_NODE_CLASSES)}
+# (campo, é nó filho?) por classe, na ordem de __slots__
+_LAYOUT = {cls: tuple((field, field in CHILDREN.get(cls, ())) for field in cls.__slots__)
+           for cls in _NODE_CLASSES}
+
+
+@lru_cache(maxsize=None)
+def grammar_version(backend):
+    """Impressão digital de gramática, tabelas e código que gera o resultado"""
+    digest = hashlib.sha256(b"%d\0" % CACHE_FORMAT)
+    digest.update(repr(sorted(GRAMMAR.productions.items())).encode())
+    for table in (GRAMMAR.action_table, GRAMMAR.goto_table):
+        digest.update(repr(sorted((state, sorted(row.items())) for state, row in table.items()))
+                      .encode())
+    for name in _SEMANTIC_SOURCES + BACKEND_SOURCES[backend]:
+        with open(os.path.join(_DIRECTORY, name), "rb") as f:
+            digest.update(f.read())
+    return digest.digest()
+
+
+# ============================================================================
+# CODIFICAÇÃO
+# ============================================================================
+
+def _children(node):
+    """Nós filhos diretos, na ordem dos campos"""
+    if type(node) is Program:
+        return list(node.statements)
+    return [child for field in CHILDREN.get(type(node), ())
+            if isinstance(child := getattr(node, field), Node)]
+
+
+def _encode_nodes(roots):
+    """
+    Nós da AST -> (colunas, índice de cada raiz)
+
+    Um nó por posição, em pós-ordem (filhos antes do pai); um nó
+    compartilhado (o valor de uma declaração está na AST e no Symbol) é
+    gravado uma vez. Colunas:
+        classes   bytes, código da classe de cada nó
+        linhas    diferença para a linha do nó anterior
+        campos    valores de __slots__ em sequência; um filho (CHILDREN) é
+                  gravado como distância para trás até ele, e Program grava
+                  uma tupla de distâncias dos seus comandos
+    Distâncias e diferenças são números pequenos e repetidos: comprimem bem.
+    """
+    codes = bytearray()
+    lines = []
+    fields = []
+    memo = {}                         # id(nó) -> posição
+    indices = []
+    for root in roots:
+        if not isinstance(root, Node):
+            indices.append(None)
+            continue
+        pending = [(root, False)]
+        while pending:
+            node, ready = pending.pop()
+            if id(node) in memo:
+                continue
+            if not ready:
+                pending.append((node, True))
+                pending.extend((child, False) for child in reversed(_children(node)))
+                continue
+
+            position = len(codes)
+            cls = type(node)
+            code = _NODE_CODES.get(cls)
+            if code is None:
+                raise ValueError(f"nó sem codificação: {node!r}")
+            codes.append(code)
+            lines.append(node.line)
+            if cls is Program:
+                fields.append(tuple(position - memo[id(s)] for s in node.statements))
+            else:
+                for field, child in _LAYOUT[cls]:
+                    value = getattr(node, field)
+                    if isinstance(value, Node) != (child and value is not None):
+                        raise ValueError(f"campo '{field}' inesperado em {node!r}")
+                    fields.append(position - memo[id(value)] if isinstance(value, Node) else value)
+            memo[id(node)] = position
+        indices.append(memo[id(root)])
+    return (bytes(codes), _deltas(lines), tuple(fields)), indices
+
+
+def _decode_nodes(columns):
+    """Inverso de _encode_nodes: lista de nós na ordem das posições"""
+    codes, lines, fields = columns
+    nodes = []
+    cursor = 0
+    line = 0
+    for position, (code, delta) in enumerate(zip(codes, lines)):
+        line += delta
+        cls = _NODE_CLASSES[code]
+        if cls is Program:
+            node = Program([nodes[position - d] for d in fields[cursor]], line)
+            cursor += 1
+        else:
+            node = cls.__new__(cls)
+            node.line = line
+            for field, child in _LAYOUT[cls]:
+                value = fields[cursor]
+                cursor += 1
+                setattr(node, field, nodes[position - value] if child and value is not None else value)
+        nodes.append(node)
+    return nodes
+
+
+def _deltas(values):
+    """Diferenças consecutivas (a primeira em relação a 0)"""
+    previous = 0
+    deltas = []
+    for value in values:
+        deltas.append(value - previous)
+        previous = value
+    return tuple(deltas)
+
+
+def _encode_table(table, memo):
+    """Escopos em pré-ordem: (nome, índice do pai, símbolos)"""
+    scopes = []
+    pending = [(table.global_scope, -1)]
+    while pending:
+        scope, parent = pending.pop()
+        index = len(scopes)
+        scopes.append((scope.name, parent, tuple(
+            (s.name, s.symbol_type, s.scope, s.line, s.used) + (
+                (memo[id(s.value)], None) if isinstance(s.value, Node) else (None, s.value))
+            for s in scope.symbols.values()
+        )))
+        pending.extend((child, index) for child in reversed(scope.children))
+    return tuple(scopes)
+
+
+def _decode_table(scopes, nodes, errors, warnings):
+    table = SymbolTable()
+    built = []
+    for name, parent, symbols in scopes:
+        if parent < 0:
+            scope = table.global_scope
+        else:
+            scope = Scope(name, parent=built[parent])
+            built[parent].children.append(scope)
+        built.append(scope)
+
+        table.current_scope = scope
+        for symbol_name, symbol_type, scope_name, line, used, node, value in symbols:
+            if node is not None:
+                value = nodes[node]
+            symbol = Symbol(symbol_name, symbol_type, scope_name, line, value)
+            symbol.used = used
+            table._define(symbol)
+    table.current_scope = table.global_scope
+    table.errors = list(errors)
+    table.warnings = list(warnings)
+    return table
+
+
+def _encode_tokens(tokens):
+    """
+    Tokens em colunas: tipos como índices numa tabela de tipos, linhas como
+    diferenças e value só quando difere do lexema (... = igual ao lexema)
+    """
+    kinds = {}
+    codes = bytes(kinds.setdefault(t.type, len(kinds)) for t in tokens)
+    return (
+        tuple(kinds),
+        codes,
+        tuple(t.lexeme for t in tokens),
+        _deltas([t.line for t in tokens]),
+        tuple(t.column for t in tokens),
+        tuple(... if t.value == t.lexeme else t.value for t in tokens),
+    )
+
+
+def _decode_tokens(columns):
+    kinds, codes, lexemes, lines, token_columns, values = columns
+    return [
+        Token(kinds[code], lexeme, line, column, lexeme if value is ... else value)
+        for code, lexeme, line, column, value
+        in zip(codes, lexemes, accumulate(lines), token_columns, values)
+    ]
+
+
+def encode_entry(tokens, lexical_errors, parser):
+    """Resultado de uma compilação (parser após o '$') -> bytes"""
+    table = parser.symbol_table
+    values = [symbol.value for scope in _scopes(table) for symbol in scope.symbols.values()]
+    records, indices = _encode_nodes([parser.ast] + values)
+    memo = {id(value): index for value, index in zip(values, indices[1:]) if index is not None}
+    payload = (
+        tuple((e.message, e.line, e.column, e.char) for e in lexical_errors),
+        tuple(map(str, parser.errors)),
+        tuple(map(str, parser.warnings)),
+        tuple(map(str, table.errors)),
+        tuple(map(str, table.warnings)),
+        parser.accepted,
+        parser.last_line,
+        _encode_tokens(tokens),
+        records,
+        indices[0],
+        _encode_table(table, memo),
+    )
+    data = zlib.compress(marshal.dumps(payload), 1)
+    return HEADER.pack(MAGIC, CACHE_FORMAT, zlib.crc32(data)) + data
+
+
+def _scopes(table):
+    pending = [table.global_scope]
+    while pending:
+        scope = pending.pop()
+        yield scope
+        pending.extend(reversed(scope.children))
+
+
+class CacheEntry:
+    """
+    Resultado guardado no cache
+
+    Diagnósticos são decodificados ao carregar; tokens, AST e tabela de
+    símbolos só quando usados (o BatchCompiler não precisa deles).
+    """
+    __slots__ = ("lexical_errors", "errors", "warnings", "table_errors", "table_warnings",
+                 "accepted", "last_line", "_tokens", "_records", "_ast", "_scopes", "_nodes")
+
+    def __init__(self, blob):
+        magic, version, crc = HEADER.unpack_from(blob)
+        data = memoryview(blob)[HEADER.size:]
+        if magic != MAGIC or version != CACHE_FORMAT or zlib.crc32(data) != crc:
+            raise ValueError("entrada de cache inválida")
+        (lexical_errors, self.errors, self.warnings, self.table_errors, self.table_warnings,
+         self.accepted, self.last_line, self._tokens, self._records, self._ast,
+         self._scopes) = marshal.loads(zlib.decompress(data))
+        self.lexical_errors = [LexicalError(*error) for error in lexical_errors]
+        self._nodes = None
+
+    @property
+    def tokens(self):
+        """Lista de Token (nova a cada acesso)"""
+        return _decode_tokens(self._tokens)
+
+    def _decoded_nodes(self):
+        if self._nodes is None:
+            self._nodes = _decode_nodes(self._records)
+        return self._nodes
+
+    @property
+    def ast(self):
+        return None if self._ast is None else self._decoded_nodes()[self._ast]
+
+    @property
+    def symbol_table(self):
+        """SymbolTable final (nova a cada acesso)"""
+        return _decode_table(self._scopes, self._decoded_nodes(),
+                             self.table_errors, self.table_warnings)
+
+    def restore(self, parser, symbols=True):
+        """
+        Deixa o parser como ficou ao terminar a compilação original
+
+        Args:
+            symbols: False restaura só os diagnósticos (tabela de símbolos
+                     vazia, sem AST), o suficiente para batch.build_result
+
+        Returns:
+            True se a compilação original foi bem-sucedida
+        """
+        parser.reset()
+        if symbols:
+            parser.symbol_table = self.symbol_table
+            parser.ast = self.ast
+        else:
+            parser.symbol_table.errors = list(self.table_errors)
+            parser.symbol_table.warnings = list(self.table_warnings)
+        parser.errors = list(self.errors)
+        parser.warnings = list(self.warnings)
+        parser.accepted = self.accepted
+        parser.finished = True
+        parser.last_line = self.last_line
+        return parser.accepted and not parser.has_errors()
+
+
+# ============================================================================
+# DIRETÓRIO DO CACHE
+# ============================================================================
+
+class CompileCache:
+    """
+    Entradas em directory/ab/cdef... (SHA-256 em hexadecimal)
+
+    Seguro entre processos: leituras de entradas incompletas não acontecem
+    (os.replace) e entradas corrompidas são tratadas como ausentes.
+    """
+
+    def __init__(self, directory, max_bytes=MAX_BYTES):
+        self.directory = os.fspath(directory)
+        self.max_bytes = max_bytes
+        self.size = None              # Bytes em disco (estimativa, None = não medido)
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(self.directory, exist_ok=True)
+
+    def key(self, source_code, backend="fantasy"):
+        """Chave da entrada para um código compilado com o lexer 'backend'"""
+        digest = hashlib.sha256(grammar_version(backend))
+        digest.update(backend.encode())
+        digest.update(b"\0")
+        digest.update(source_code.encode("utf-8", "surrogatepass"))
+        return digest.hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, key[:2], key[2:])
+
+    def get(self, key):
+        """CacheEntry da chave, ou None"""
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                entry = CacheEntry(f.read())
+            os.utime(path)            # Uso recente (LRU)
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except (OSError, ValueError, EOFError, TypeError, struct.error, zlib.error):
+            self._remove(path)
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry
+
+    def put(self, key, tokens, lexical_errors, parser):
+        """Guarda o resultado de uma compilação; False se não coube no formato"""
+        try:
+            blob = encode_entry(tokens, lexical_errors, parser)
+        except ValueError:
+            return False              # Valor que o marshal não grava
+        if len(blob) > self.max_bytes:
+            return False
+
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, temporary = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(blob)
+            os.replace(temporary, path)
+        except BaseException:
+            self._remove(temporary)
+            raise
+
+        if self.size is None:
+            self.size = self._measure()
+        else:
+            self.size += len(blob)
+        if self.size > self.max_bytes:
+            self.evict()
+        return True
+
+    def evict(self, target=None):
+        """Remove as entradas usadas há mais tempo até o total caber em target"""
+        if target is None:
+            target = int(self.max_bytes * EVICT_TO)
+        entries = sorted(self._entries(), key=lambda entry: entry[0])
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= target:
+                break
+            if self._remove(path):
+                total -= size
+        self.size = total
+
+    def clear(self):
+        """Remove todas as entradas"""
+        self.evict(target=0)
+
+    def _entries(self):
+        """(mtime, tamanho, caminho) de cada entrada no diretório"""
+        for bucket in os.scandir(self.directory):
+            if not bucket.is_dir():
+                continue
+            for item in os.scandir(bucket.path):
+                if item.name.startswith(".tmp-"):
+                    continue
+                try:
+                    info = item.stat()
+                except FileNotFoundError:
+                    continue          # Removida por outro processo
+                yield info.st_mtime, info.st_size, item.path
+
+    def _measure(self):
+        return sum(size for _, size, _ in self._entries())
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.unlink(path)
+            return True
+        except FileNotFoundError:
+            return False
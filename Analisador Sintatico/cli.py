@@ -0,0 +1,231 @@
+"""
+Linha de Comando do Compilador Fantasy
+
+Compila arquivos (caminhos ou padrões glob), ou a entrada padrão, sem
+editar código e sem os relatórios detalhados do main.py.
+
+Uso (dentro de 'Analisador Sintatico'):
+    python -m cli programa.fan
+    python -m cli "exemplos/**/*.fan" --jobs 8 --stats
+    cat programa.fan | python -m cli -
+    python -m cli *.fan --format json > resultados.jsonl
+    python -m cli *.fan --quiet && echo "tudo compilou"
+
+Backends (--backend):
+    fantasy   lexer.py + SLR (padrão); --jobs N usa N processos (batch.py)
+    pda       PDALexerAdapter + SLR; --jobs N usa N processos (batch.py)
+    pipeline  lexer e parser em processos separados (token_ring.py),
+              --jobs N usa N // 2 pares
+    async     pipeline asyncio com threads (async_pipeline.py),
+              --jobs N lexers e N parsers
+
+Saída:
+    text   arquivos com erro e seus diagnósticos, depois um resumo
+    json   um objeto JSON por arquivo e por linha (como o compile_server);
+           com --stats, uma última linha {"stats": {...}}
+    --stats nos backends fantasy e pda inclui tempos por fase (léxico,
+            sintático, semântico) e contadores do parser (stats.py)
+    --quiet não imprime os resultados (só --stats, se pedido)
+
+Códigos de saída: 0 tudo compilou, 1 algum arquivo falhou (erro léxico,
+sintático, semântico ou de leitura), 2 uso inválido ou nenhuma entrada.
+"""
+
+import argparse
+import asyncio
+import glob
+import os
+import sys
+import time
+
+from async_pipeline import compile_async, percentile
+from batch import BatchCompiler, compile_file, compile_source
+from cache import CompileCache
+from result import NDJSONWriter
+from stats import CompileStats
+from token_ring import compile_pipeline
+
+BACKENDS = ("fantasy", "pda", "pipeline", "async")
+GLOB_CHARS = frozenset("*?[")
+
+EXIT_OK = 0
+EXIT_FAILED = 1                       # Uso inválido: 2 (argparse)
+
+
+def expand_inputs(arguments, stdin=None):
+    """
+    Argumentos -> itens de compile_many (caminhos ou pares (nome, código))
+
+    '-' lê a entrada padrão; padrões com * ? [ são expandidos (** recursivo),
+    para funcionar também quando o shell não expande (ex.: entre aspas).
+
+    Raises:
+        ValueError: padrão sem nenhum arquivo correspondente
+    """
+    stdin = stdin or sys.stdin
+    items = []
+    for argument in arguments:
+        if argument == "-":
+            items.append(("<stdin>", stdin.read()))
+        elif GLOB_CHARS & set(argument) and not os.path.exists(argument):
+            matches = sorted(path for path in glob.glob(argument, recursive=True)
+                             if not os.path.isdir(path))
+            if not matches:
+                raise ValueError(f"nenhum arquivo corresponde a '{argument}'")
+            items.extend(matches)
+        else:
+            items.append(argument)
+    return items
+
+
+def compile_items(items, backend="fantasy", jobs=1, cache=None, stats=False):
+    """
+    Compila os itens com o backend escolhido
+
+    stats=True (fantasy e pda) preenche result.stats com um CompileStats
+
+    Yields:
+        BatchResult na ordem de conclusão
+    """
+    if backend == "pipeline":
+        yield from compile_pipeline(items, pairs=max(1, jobs // 2))
+    elif backend == "async":
+        yield from _run_async(items, jobs)
+    elif jobs > 1:
+        with BatchCompiler(jobs, cache=cache, lexer=backend, stats=stats) as batch:
+            yield from batch.compile_many(items)
+    else:
+        # Um processo: sem pool, sem pickle
+        for index, item in enumerate(items):
+            if isinstance(item, str):
+                yield compile_file(index, item, cache, backend, stats)
+            else:
+                yield compile_source(index, *item, cache, backend, stats)
+
+
+def _run_async(items, jobs):
+    async def collect():
+        return [result async for result in compile_async(items, lexers=jobs, parsers=jobs)]
+    return asyncio.run(collect())
+
+
+def summarize(results, elapsed):
+    """Estatísticas de uma execução (--stats)"""
+    latencies = sorted(result.total_time for result in results)
+    failed = sum(1 for result in results if not result.success)
+    stats = {
+        "files": len(results),
+        "succeeded": len(results) - failed,
+        "failed": failed,
+        "cached": sum(1 for result in results if result.cached),
+        "wall_s": elapsed,
+        "files_per_s": len(results) / elapsed if elapsed > 0 else 0.0,
+        "lex_s": sum(result.lex_time for result in results),
+        "parse_s": sum(result.parse_time for result in results),
+    }
+    if latencies:
+        for fraction in (0.5, 0.95, 0.99):
+            stats[f"p{int(fraction * 100)}_ms"] = percentile(latencies, fraction) * 1000
+    if any(result.stats is not None for result in results):
+        stats["compile"] = CompileStats.aggregate(result.stats for result in results).to_dict()
+    return stats
+
+
+def _print_text(result, out):
+    if result.success:
+        return
+    print(f"{result.name}:", file=out)
+    for error in result.errors:
+        print(f"  - {error}", file=out)
+
+
+def _print_stats(stats, out):
+    print(f"Arquivos: {stats['files']} ({stats['succeeded']} ok, {stats['failed']} com erro, "
+          f"{stats['cached']} do cache)", file=out)
+    print(f"Tempo: {stats['wall_s']:.3f}s ({stats['files_per_s']:.1f} arquivos/s); "
+          f"léxico {stats['lex_s']:.3f}s, sintático/semântico {stats['parse_s']:.3f}s "
+          f"(soma dos arquivos)", file=out)
+    if "p50_ms" in stats:
+        print(f"Latência por arquivo: p50 {stats['p50_ms']:.2f} ms, "
+              f"p95 {stats['p95_ms']:.2f} ms, p99 {stats['p99_ms']:.2f} ms", file=out)
+    if "compile" in stats:
+        print("Fases (soma dos arquivos):", file=out)
+        print(CompileStats.from_dict(stats["compile"]).report(), file=out)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="python -m cli",
+        description="Compilador da linguagem Fantasy (léxico, sintático e semântico)",
+    )
+    parser.add_argument("inputs", nargs="*", metavar="ARQUIVO",
+                        help="arquivos, padrões glob ou '-' para a entrada padrão")
+    parser.add_argument("-j", "--jobs", type=int, default=1,
+                        help="compilações em paralelo (0 = número de CPUs; padrão: 1)")
+    parser.add_argument("-b", "--backend", choices=BACKENDS, default="fantasy",
+                        help="motor léxico/sintático (padrão: fantasy)")
+    parser.add_argument("-f", "--format", choices=("text", "json"), default="text",
+                        help="formato da saída (padrão: text)")
+    parser.add_argument("-q", "--quiet", action="store_true",
+                        help="não imprime os resultados; só o código de saída (e --stats)")
+    parser.add_argument("--stats", action="store_true",
+                        help="imprime tempos e vazão ao final")
+    parser.add_argument("--cache", metavar="DIR",
+                        help="diretório do cache de compilação (backends fantasy e pda)")
+    return parser
+
+
+def main(argv=None, stdin=None, stdout=None):
+    """Executa a linha de comando; devolve o código de saída"""
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    out = stdout or sys.stdout
+    stdin = stdin or sys.stdin
+
+    if args.jobs < 0:
+        parser.error("--jobs deve ser >= 0")
+    jobs = args.jobs or os.cpu_count() or 1
+    if args.cache and args.backend not in ("fantasy", "pda"):
+        parser.error(f"--cache não é suportado pelo backend '{args.backend}'")
+
+    inputs = args.inputs
+    if not inputs:
+        if stdin.isatty():
+            parser.error("nenhum arquivo informado (use '-' para ler a entrada padrão)")
+        inputs = ["-"]
+    try:
+        items = expand_inputs(inputs, stdin)
+    except ValueError as e:
+        parser.error(str(e))
+
+    cache = CompileCache(args.cache) if args.cache else None
+    writer = NDJSONWriter(out) if args.format == "json" else None
+    results = []
+    start = time.perf_counter()
+    measure = args.stats and args.backend in ("fantasy", "pda")
+    for result in compile_items(items, args.backend, jobs, cache, measure):
+        results.append(result)
+        if args.quiet:
+            continue
+        if writer is not None:
+            writer.write(result)
+        else:
+            _print_text(result, out)
+    elapsed = time.perf_counter() - start
+
+    failed = sum(1 for result in results if not result.success)
+    if args.stats:
+        stats = summarize(results, elapsed)
+        if writer is not None:
+            writer.write({"stats": stats})
+        else:
+            _print_stats(stats, out)
+    elif not args.quiet and args.format == "text":
+        print(f"{len(results) - failed}/{len(results)} arquivo(s) compilado(s) "
+              f"em {elapsed:.2f}s", file=out)
+    out.flush()
+    return EXIT_FAILED if failed else EXIT_OK
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,371 @@
+"""
+Servidor de Compilação (daemon) via Socket Unix
+Mantém tabelas, PDA e workers carregados entre compilações
+
+Cada compilação por linha de comando paga o import de SLR.py, goto.py e
+Compiladores/delta.py, a construção do PDA e das tabelas do parser antes de
+olhar o código. O servidor faz isso uma vez: o processo principal carrega
+tudo, abre o socket e cria os workers com fork (pre-fork), que herdam as
+estruturas já prontas. Cada worker atende várias conexões com selectors.
+
+Protocolo: uma requisição JSON por linha, uma resposta JSON por linha
+    -> {"id": 1, "source": "FUS x := 1 ; print x", "lexer": "fantasy"}
+    -> {"id": 2, "path": "/caminho/programa.fan"}
+    <- {"id": 1, "name": "<fonte>", "success": true, "errors": [],
+        "warnings": [], "timings": {"lex_ms": .., "parse_ms": .., "total_ms": ..}}
+'lexer' é "fantasy" (lexer.py, padrão) ou "pda" (PDALexerAdapter).
+Requisição inválida (ou falha inesperada ao compilá-la): {"id": ...,
+"error": "mensagem"}; o worker e as demais conexões seguem atendendo.
+
+Limites por compilação (governor.py): serve --max-tokens, --max-depth,
+--max-scopes, --timeout e --max-memory. Uma entrada que esgota o orçamento
+falha rápido, com success false, o diagnóstico "LIMITE DE RECURSOS ..." em
+'errors' e "limit": "tokens" | "depth" | "scopes" | "timeout" | "memory".
+O lexer "pda" não é interrompido no meio; o parser aplica o orçamento.
+
+Uso:
+    python compile_server.py serve /tmp/fantasy.sock --workers 4
+    python compile_server.py serve /tmp/fantasy.sock --timeout 2 --max-tokens 1000000
+    python compile_server.py bench /tmp/fantasy.sock
+
+    with CompileClient("/tmp/fantasy.sock") as client:
+        client.compile("FUS x := 1 ; print x")
+"""
+
+import argparse
+import json
+import os
+import selectors
+import signal
+import socket
+import sys
+import time
+import traceback
+
+from batch import build_result, read_source
+from governor import Budget, BudgetExceeded
+from lexer import Lexer
+from main import CompiladorCompleto
+from parser_integrated import GRAMMAR
+
+WORKERS = 4
+BACKLOG = 128
+RECV_SIZE = 65536
+
+
+class CompileWorker:
+    """Compila requisições decodificadas; uma instância por processo worker"""
+
+    def __init__(self, budget=None):
+        # PDA construído uma vez (antes do fork, herdado pelos workers)
+        self.compiler = CompiladorCompleto(verbose=False)
+        self.budget = budget          # Budget reiniciado a cada requisição (None = sem limites)
+
+    def handle(self, request):
+        """Requisição (dict) -> resposta (dict)"""
+        request_id = request.get("id")
+        try:
+            if "source" in request:
+                name, source_code = request.get("name", "<fonte>"), request["source"]
+                if not isinstance(source_code, str):
+                    return {"id": request_id, "error": "'source' deve ser uma string"}
+                if not isinstance(name, str):
+                    return {"id": request_id, "error": "'name' deve ser uma string"}
+            elif "path" in request:
+                name = request["path"]
+                if not isinstance(name, str):
+                    return {"id": request_id, "error": "'path' deve ser uma string"}
+                source_code = read_source(name)
+            else:
+                return {"id": request_id, "error": "requisição sem 'source' ou 'path'"}
+        except (OSError, UnicodeDecodeError) as e:
+            return {"id": request_id, "error": f"ERRO DE LEITURA: {e}"}
+
+        lexer_kind = request.get("lexer", "fantasy")
+        if lexer_kind not in ("fantasy", "pda"):
+            return {"id": request_id, "error": f"lexer desconhecido: {lexer_kind!r}"}
+
+        budget = self.budget
+        if budget is not None:
+            budget.start()
+        parser = GRAMMAR.parser(budget=budget)
+        lexer = None
+        tokens = ()
+
+        start = time.perf_counter()
+        try:
+            if lexer_kind == "pda":
+                tokens = self.compiler.lexer.tokenize(source_code, verbose=False)
+            else:
+                lexer = Lexer(source_code, budget=budget)
+                tokens = lexer.tokenize()
+        except BudgetExceeded as e:
+            parser.abort(e)
+        lexical_errors = lexer.errors if lexer is not None else []
+        lexed = time.perf_counter()
+
+        if not parser.finished:
+            parser.parse(tokens)
+        parsed = time.perf_counter()
+
+        result = build_result(0, name, lexical_errors, parser,
+                              lexed - start, parsed - lexed, parsed - start)
+        response = {
+            "id": request_id,
+            "name": name,
+            "success": result.success,
+            "errors": result.errors,
+            "warnings": result.warnings,
+            "timings": {
+                "lex_ms": result.lex_time * 1000,
+                "parse_ms": result.parse_time * 1000,
+                "total_ms": result.total_time * 1000,
+            },
+        }
+        if budget is not None and budget.exceeded is not None:
+            response["limit"] = budget.exceeded.resource
+        return response
+
+    def respond(self, line):
+        """Linha JSON recebida -> linha JSON de resposta (bytes)"""
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ValueError("esperado um objeto JSON")
+        except ValueError as e:
+            response = {"id": None, "error": f"JSON inválido: {e}"}
+        else:
+            try:
+                response = self.handle(request)
+            except Exception as e:
+                # Uma requisição não pode derrubar o worker (e as conexões dele)
+                traceback.print_exc()
+                response = {"id": request.get("id"),
+                            "error": f"ERRO INTERNO: {type(e).__name__}: {e}"}
+        return json.dumps(response, ensure_ascii=False).encode("utf-8") + b"\n"
+
+
+def _serve_worker(listener, worker):
+    """Laço de um worker: aceita conexões e responde linha a linha"""
+    selector = selectors.DefaultSelector()
+    selector.register(listener, selectors.EVENT_READ)
+    buffers = {}
+
+    while True:
+        for key, _ in selector.select():
+            if key.fileobj is listener:
+                try:
+                    conn, _ = listener.accept()
+                except BlockingIOError:
+                    continue          # Outro worker aceitou primeiro
+                conn.setblocking(True)
+                selector.register(conn, selectors.EVENT_READ)
+                buffers[conn] = b""
+                continue
+
+            conn = key.fileobj
+            try:
+                data = conn.recv(RECV_SIZE)
+            except ConnectionError:
+                data = b""
+            if not data:
+                selector.unregister(conn)
+                del buffers[conn]
+                conn.close()
+                continue
+
+            *lines, buffers[conn] = (buffers[conn] + data).split(b"\n")
+            replies = [worker.respond(line) for line in lines if line.strip()]
+            try:
+                conn.sendall(b"".join(replies))
+            except ConnectionError:
+                selector.unregister(conn)
+                del buffers[conn]
+                conn.close()
+
+
+class CompileServer:
+    """
+    Processo principal: socket Unix + workers pré-criados com fork
+
+    Se um worker terminar inesperadamente, outro é criado no lugar.
+    SIGTERM/SIGINT encerram os workers e removem o arquivo do socket.
+    """
+
+    def __init__(self, path, workers=WORKERS, budget=None):
+        self.path = path
+        self.workers = workers
+        self.budget = budget          # Limites de cada compilação (governor.Budget)
+        self.children = set()
+        self.listener = None
+        self.running = False
+
+    def serve_forever(self):
+        worker = CompileWorker(self.budget)
+        worker.respond(b'{"source": "FUS x := 1 ; print x"}')    # aquece
+
+        self.listener = self._listen()
+        self.running = True
+        signal.signal(signal.SIGTERM, self._stop)
+        signal.signal(signal.SIGINT, self._stop)
+        try:
+            for _ in range(self.workers):
+                self._fork(worker)
+            while self.running and self.children:
+                try:
+                    pid, _ = os.wait()
+                except ChildProcessError:
+                    break
+                except InterruptedError:
+                    continue
+                self.children.discard(pid)
+                if self.running:
+                    self._fork(worker)
+        finally:
+            self.shutdown()
+
+    def shutdown(self):
+        """Encerra workers e remove o socket"""
+        self.running = False
+        for pid in list(self.children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+                os.waitpid(pid, 0)
+            except (ProcessLookupError, ChildProcessError):
+                pass
+        self.children.clear()
+        if self.listener is not None:
+            self.listener.close()
+            self.listener = None
+            try:
+                os.unlink(self.path)
+            except FileNotFoundError:
+                pass
+
+    def _stop(self, signum, frame):
+        self.running = False
+        raise KeyboardInterrupt
+
+    def _listen(self):
+        """Abre o socket; remove um arquivo de socket abandonado"""
+        if os.path.exists(self.path):
+            probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                probe.connect(self.path)
+            except (ConnectionRefusedError, FileNotFoundError):
+                os.unlink(self.path)
+            else:
+                raise OSError(f"Já existe um servidor em {self.path}")
+            finally:
+                probe.close()
+
+        listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        listener.bind(self.path)
+        listener.listen(BACKLOG)
+        listener.setblocking(False)
+        return listener
+
+    def _fork(self, worker):
+        pid = os.fork()
+        if pid == 0:
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            signal.signal(signal.SIGINT, signal.SIG_IGN)
+            try:
+                _serve_worker(self.listener, worker)
+            except Exception:
+                traceback.print_exc()
+            finally:
+                os._exit(1)           # O processo principal cria outro worker
+        self.children.add(pid)
+
+
+class CompileClient:
+    """Cliente do servidor: uma conexão reutilizada entre requisições"""
+
+    def __init__(self, path):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.connect(path)
+        self.reader = self.sock.makefile("rb")
+        self.next_id = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.reader.close()
+        self.sock.close()
+
+    def request(self, **fields):
+        """Envia uma requisição e espera a resposta (dict)"""
+        self.next_id += 1
+        fields.setdefault("id", self.next_id)
+        self.sock.sendall(json.dumps(fields).encode("utf-8") + b"\n")
+        line = self.reader.readline()
+        if not line:
+            raise ConnectionError("servidor encerrou a conexão")
+        return json.loads(line)
+
+    def compile(self, source_code, name=None, lexer="fantasy"):
+        fields = {"source": source_code, "lexer": lexer}
+        if name is not None:
+            fields["name"] = name
+        return self.request(**fields)
+
+    def compile_file(self, path, lexer="fantasy"):
+        return self.request(path=os.path.abspath(path), lexer=lexer)
+
+
+def bench(path, requests=2000):
+    """Latência (ms) de ida e volta para um programa pequeno"""
+    with CompileClient(path) as client:
+        client.compile("FUS x := 1 ; print x")
+        latencies = []
+        for i in range(requests):
+            start = time.perf_counter()
+            client.compile(f"FUS x := {i} ; print x")
+            latencies.append(time.perf_counter() - start)
+
+    latencies.sort()
+    for label, fraction in (("p50", 0.5), ("p95", 0.95), ("p99", 0.99)):
+        value = latencies[min(len(latencies) - 1, int(fraction * len(latencies)))]
+        print(f"{label}: {value * 1000:.3f} ms")
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="Servidor de compilação da linguagem Fantasy")
+    commands = parser.add_subparsers(dest="command", required=True)
+    serve = commands.add_parser("serve", help="inicia o servidor")
+    serve.add_argument("socket")
+    serve.add_argument("--workers", type=int, default=WORKERS)
+    serve.add_argument("--max-tokens", type=int, help="tokens por compilação")
+    serve.add_argument("--max-depth", type=int, help="profundidade da pilha do parser")
+    serve.add_argument("--max-scopes", type=int, help="escopos por compilação")
+    serve.add_argument("--timeout", type=float, help="segundos por compilação")
+    serve.add_argument("--max-memory", type=float, metavar="MIB",
+                       help="crescimento máximo (suave) do RSS do worker por compilação")
+    measure = commands.add_parser("bench", help="mede a latência de um servidor ativo")
+    measure.add_argument("socket")
+    measure.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args(argv)
+
+    if args.command == "serve":
+        limits = (args.max_tokens, args.max_depth, args.max_scopes, args.timeout, args.max_memory)
+        budget = None
+        if any(limit is not None for limit in limits):
+            budget = Budget(args.max_tokens, args.max_depth, args.max_scopes, args.timeout,
+                            None if args.max_memory is None else int(args.max_memory * 2 ** 20))
+        print(f"Servidor em {args.socket} ({args.workers} workers)" + (f", {budget!r}" if budget else ""))
+        try:
+            CompileServer(args.socket, args.workers, budget).serve_forever()
+        except KeyboardInterrupt:
+            pass
+    else:
+        bench(args.socket, args.requests)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,133 @@
+"""
+Diagnósticos Estruturados: registros agregados e mensagem sob demanda
+
+Diagnostic guarda código, nome, posição e argumentos; o texto
+("Erro semântico (linha 3): 'x' não foi declarado") só é montado em str().
+A SymbolTable agrega por (código, nome): usar de novo o mesmo nome não
+declarado só incrementa count e atualiza a última posição, e a mensagem
+ganha o sufixo " (N ocorrências; última: linha L)". O Lexer faz o mesmo
+com LexicalError, por caractere inválido.
+
+Limite: cada compilação guarda no máximo MAX_DIAGNOSTICS registros
+distintos por lista (SymbolTable(max_diagnostics=...), Lexer(...,
+max_errors=...)); os seguintes só são contados num último registro
+LIMIT ("Limite de 1000 diagnósticos atingido: 25 omitido(s)").
+
+Com journal (compilação incremental) cada ocorrência continua sendo um
+registro: rollback/replay desfazem e refazem pelo tamanho das listas.
+aggregate() monta, dessas listas, o mesmo resultado de uma compilação
+completa (IncrementalCompiler._finish).
+
+As listas errors/warnings podem misturar Diagnostic e str (parser, cache);
+quem exporta ou compara usa str(d).
+"""
+
+MAX_DIAGNOSTICS = 1000
+
+# Código -> modelo da mensagem (campos: name, line, column e os argumentos)
+TEMPLATES = {
+    "UNDECLARED": "Erro semântico (linha {line}): '{name}' não foi declarado",
+    "REDECLARED": "Erro semântico (linha {line}): '{name}' já foi declarado em '{scope}'",
+    "UNUSED": "Aviso (linha {line}): variável '{name}' declarada mas não usada",
+    "GLOBAL_SCOPE_EXIT": "Tentativa de sair do escopo global",
+    "LIMIT": "Limite de {limit} diagnósticos atingido: {omitted} omitido(s)",
+}
+
+
+def occurrences(count, line, column=None):
+    """Sufixo de uma mensagem agregada ('' para uma ocorrência só)"""
+    if count <= 1:
+        return ""
+    where = f"linha {line}" if column is None else f"linha {line}, coluna {column}"
+    return f" ({count} ocorrências; última: {where})"
+
+
+class Diagnostic:
+    """Erro ou aviso estruturado; uma ou mais ocorrências de (código, nome)"""
+    __slots__ = ("code", "name", "line", "column", "args", "count", "last_line", "last_column")
+
+    def __init__(self, code, name=None, line=None, column=0, **args):
+        self.code = code              # Chave de TEMPLATES
+        self.name = name              # Identificador envolvido (se houver)
+        self.line = line              # Primeira ocorrência
+        self.column = column
+        self.args = args              # Outros campos do modelo (ex.: scope)
+        self.count = 1
+        self.last_line = line         # Última ocorrência
+        self.last_column = column
+
+    def occur(self, line, column=0):
+        """Mais uma ocorrência (agregação)"""
+        self.count += 1
+        self.last_line = line
+        self.last_column = column
+
+    def merge(self, other):
+        """Soma as ocorrências de 'other' (posterior a este registro)"""
+        self.count += other.count
+        self.last_line = other.last_line
+        self.last_column = other.last_column
+
+    @property
+    def message(self):
+        if self.code == "LIMIT":
+            return TEMPLATES["LIMIT"].format(omitted=self.count, **self.args)
+        text = TEMPLATES[self.code].format(name=self.name, line=self.line,
+                                           column=self.column, **self.args)
+        return text + occurrences(self.count, self.last_line)
+
+    __str__ = message.fget
+
+    def shifted(self, delta):
+        """Cópia com as linhas deslocadas em 'delta' (compilação incremental)"""
+        copy = Diagnostic(self.code, self.name, self.line, self.column, **self.args)
+        if self.line is not None:
+            copy.line += delta
+            copy.last_line = self.last_line + delta
+        copy.count = self.count
+        copy.last_column = self.last_column
+        return copy
+
+    def to_dict(self):
+        return {"code": self.code, "name": self.name, "line": self.line,
+                "column": self.column, "count": self.count, "last_line": self.last_line,
+                "last_column": self.last_column, "message": self.message}
+
+    def __repr__(self):
+        return f"Diagnostic({self.code}, {self.name!r}, L{self.line}, x{self.count})"
+
+
+def limit_record(limit):
+    """Registro LIMIT vazio (count = ocorrências omitidas, somadas por occur/merge)"""
+    record = Diagnostic("LIMIT", limit=limit)
+    record.count = 0
+    return record
+
+
+def aggregate(records, limit=MAX_DIAGNOSTICS):
+    """
+    Agrega uma lista de registros como SymbolTable._report faria ao recebê-los
+    nessa ordem: por (código, nome), com no máximo 'limit' registros e o
+    excedente contado num registro LIMIT. Devolve cópias (str passam direto).
+    """
+    result = []
+    index = {}
+    for record in records:
+        if not isinstance(record, Diagnostic) or record.code == "LIMIT":
+            result.append(record)
+            continue
+        key = (record.code, record.name)
+        existing = index.get(key)
+        if existing is not None:
+            existing.merge(record)
+            continue
+        if limit is not None and len(result) >= limit:
+            last = result[-1] if result else None
+            if not (isinstance(last, Diagnostic) and last.code == "LIMIT"):
+                last = limit_record(limit)
+                result.append(last)
+            last.merge(record)
+            continue
+        index[key] = copy = record.shifted(0)
+        result.append(copy)
+    return result
@@ -7,7 +7,7 @@ FOLLOW = {
     "EXPR": {"LOS","FOD","FAH","JUN","KEL","FUS","HON","print","assign","HIM",";","$",")"},
     "EXPR'": {"LOS","FOD","FAH","JUN","KEL","FUS","HON","print","assign","HIM",";","$",")"},
     "OP": {"NUST","id","num","HIM","("},
-    "TERM": {"ε","+","-","ANRK","AAN","KO",")"},
-    "UNARY": {"ε","+","-","ANRK","AAN","KO",")"},
-    "FACTOR": {"ε","+","-","ANRK","AAN","KO",")"}
+    "TERM": {"ε","+","-","ANRK","AAN","KO",")","LOS","FOD","FAH","JUN","KEL","FUS","HON","print","assign","HIM",";","$"},
+    "UNARY": {"ε","+","-","ANRK","AAN","KO",")","LOS","FOD","FAH","JUN","KEL","FUS","HON","print","assign","HIM",";","$"},
+    "FACTOR": {"ε","+","-","ANRK","AAN","KO",")","LOS","FOD","FAH","JUN","KEL","FUS","HON","print","assign","HIM",";","$"}
 }
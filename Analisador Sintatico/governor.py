@@ -0,0 +1,153 @@
+"""
+Governador de Recursos: orçamento de tokens, pilha, escopos, tempo e memória
+
+Uma entrada patológica (uma expressão gigante, um '/*' que nunca fecha,
+KEL/LOS aninhados a fundo) pode prender um worker do compile_server. Um
+Budget limita cada compilação:
+
+    max_tokens   tokens gerados pelo Lexer / recebidos pelo parser
+    max_depth    profundidade da pilha de estados do parser
+    max_scopes   escopos abertos na SymbolTable (os handlers atuais não abrem
+                 escopos: KEL/LOS aninhados são limitados por max_depth)
+    timeout      prazo em segundos (relógio monotônico, a partir de start())
+    max_memory   limite suave: crescimento do RSS do processo desde start()
+    cancel()     cancelamento cooperativo (outra thread, handler de sinal...)
+
+Lexer(..., budget=b), GRAMMAR.parser(budget=b) e SymbolTable(budget=b)
+consultam o mesmo orçamento. Tokens e escopos são contados exatamente; o
+prazo, o cancelamento, a memória e a profundidade da pilha só são
+conferidos a cada check_every tokens, então o custo por token é um
+incremento e uma comparação.
+
+Esgotado o orçamento, BudgetExceeded é levantada. O parser a registra como
+diagnóstico ("LIMITE DE RECURSOS (Linha 12): tempo limite de 2 s esgotado;
+análise interrompida") e termina sem aceitar, inclusive quando a exceção
+vem do Lexer que o alimenta. Quem chama Lexer.tokenize() diretamente
+trata a exceção (parser.abort(e) a registra no parser).
+
+Uso:
+    budget = Budget(max_tokens=10**6, max_depth=10_000, timeout=2.0)
+    parser = GRAMMAR.parser(budget=budget)
+    parser.parse(Lexer(codigo, budget=budget).iter_tokens())
+    budget.start()                        # próxima compilação: prazo novo
+"""
+
+import os
+import sys
+import time
+
+CHECK_EVERY = 1024                    # Tokens entre verificações periódicas
+
+try:
+    _PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+except (AttributeError, ValueError, OSError):
+    _PAGE_SIZE = 4096
+
+
+def resident_memory():
+    """
+    Memória residente do processo em bytes
+
+    Linux: RSS atual (/proc/self/statm). Outros Unix: pico do RSS
+    (getrusage), que não diminui. None se nenhum dos dois existir.
+    """
+    try:
+        with open("/proc/self/statm", "rb") as file:
+            return int(file.read().split()[1]) * _PAGE_SIZE
+    except (OSError, IndexError, ValueError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024   # macOS: bytes
+
+
+class BudgetExceeded(Exception):
+    """Orçamento de uma compilação esgotado"""
+
+    def __init__(self, resource, detail, line=None):
+        super().__init__(resource, detail, line)
+        self.resource = resource      # tokens, depth, scopes, timeout, memory, cancelled
+        self.detail = detail
+        self.line = line              # Linha onde a análise parou (se conhecida)
+
+    def __str__(self):
+        where = "" if self.line is None else f" (Linha {self.line})"
+        return f"LIMITE DE RECURSOS{where}: {self.detail}; análise interrompida"
+
+
+class Budget:
+    """Limites de uma compilação (None = sem limite); start() abre uma nova"""
+    __slots__ = ("max_tokens", "max_depth", "max_scopes", "timeout", "max_memory",
+                 "check_every", "deadline", "baseline", "cancelled", "exceeded")
+
+    def __init__(self, max_tokens=None, max_depth=None, max_scopes=None, timeout=None,
+                 max_memory=None, check_every=CHECK_EVERY):
+        self.max_tokens = max_tokens
+        self.max_depth = max_depth
+        self.max_scopes = max_scopes
+        self.timeout = timeout        # Segundos
+        self.max_memory = max_memory  # Bytes além do RSS de start()
+        self.check_every = check_every
+        self.start()
+
+    def start(self):
+        """Começa uma compilação: prazo, memória de referência e cancelamento novos"""
+        self.deadline = None if self.timeout is None else time.monotonic() + self.timeout
+        self.baseline = resident_memory() if self.max_memory is not None else None
+        self.cancelled = False
+        self.exceeded = None          # BudgetExceeded levantada nesta compilação
+        return self
+
+    def cancel(self):
+        """Pede o fim da compilação (visto na próxima verificação periódica)"""
+        self.cancelled = True
+
+    def fail(self, resource, detail, line=None):
+        """Registra e levanta BudgetExceeded"""
+        self.exceeded = BudgetExceeded(resource, detail, line)
+        raise self.exceeded
+
+    def charge(self, tokens, line=None, depth=0):
+        """
+        Verificação periódica, com 'tokens' contados até agora
+
+        Returns:
+            Contagem de tokens em que a próxima verificação deve ocorrer
+            (antes, se o limite de tokens vier primeiro)
+        """
+        if self.max_tokens is not None and tokens > self.max_tokens:
+            self.fail("tokens", f"mais de {self.max_tokens} tokens", line)
+        if self.cancelled:
+            self.fail("cancelled", "compilação cancelada", line)
+        if self.deadline is not None and time.monotonic() > self.deadline:
+            self.fail("timeout", f"tempo limite de {self.timeout:g} s esgotado", line)
+        if self.max_depth is not None and depth > self.max_depth:
+            self.fail("depth", f"pilha do parser com mais de {self.max_depth} níveis", line)
+        if self.baseline is not None:
+            grown = resident_memory() - self.baseline
+            if grown > self.max_memory:
+                self.fail("memory", f"memória cresceu {grown / 2 ** 20:.1f} MiB "
+                                    f"(limite de {self.max_memory / 2 ** 20:.1f} MiB)", line)
+
+        next_check = tokens + self.check_every
+        if self.max_tokens is not None:
+            next_check = min(next_check, self.max_tokens + 1)
+        return next_check
+
+    def charge_scope(self, scopes, line=None):
+        """Verifica o número de escopos abertos até agora"""
+        if self.max_scopes is not None and scopes > self.max_scopes:
+            self.fail("scopes", f"mais de {self.max_scopes} escopos", line)
+
+    def to_dict(self):
+        return {"max_tokens": self.max_tokens, "max_depth": self.max_depth,
+                "max_scopes": self.max_scopes, "timeout": self.timeout,
+                "max_memory": self.max_memory, "check_every": self.check_every}
+
+    def __repr__(self):
+        limits = ", ".join(f"{key}={value}" for key, value in self.to_dict().items()
+                           if value is not None)
+        return f"Budget({limits})"
@@ -0,0 +1,408 @@
+"""
+Compilação Incremental da Linguagem Fantasy
+Reanalisa apenas a partir do primeiro comando de nível superior alterado
+
+Após cada ';' de nível superior são registrados checkpoints do lexer
+(posição, linha, coluna), do parser e da tabela de símbolos. Numa nova
+versão do código:
+
+  1. Acha o primeiro caractere alterado e o último checkpoint antes dele
+  2. Restaura parser + SymbolTable nesse checkpoint (rollback do journal)
+  3. Reanalisa (léxico, sintático e semântico) a partir dali
+  4. Para assim que um ';' coincide com um checkpoint da execução anterior:
+     mesmo texto restante, mesma coluna e os mesmos símbolos declarados, ou
+     símbolos diferentes que o trecho restante não menciona.
+     O restante da execução anterior é reaproveitado: AST, erros e as
+     operações da tabela de símbolos (reaplicadas com SymbolTable.replay).
+     Se a edição inseriu/removeu linhas, o trecho reaproveitado tem as
+     linhas deslocadas (AST, símbolos, mensagens) em vez de ser reanalisado
+
+O trabalho de análise é proporcional ao trecho editado. O que continua linear
+é barato: emendar listas, deslocar os índices dos checkpoints e a verificação
+final de símbolos não usados.
+"""
+
+import re
+from bisect import bisect_left, bisect_right
+
+from diagnostics import Diagnostic, aggregate
+from lexer import Lexer, LexicalError
+from parser_integrated import SLRParserWithSemantics, ParserCheckpoint, SEQUENCE_STATE
+from symbol_table import SymbolTable
+from ast_nodes import Program, shift_lines
+
+# Tamanho dos blocos comparados ao procurar o trecho alterado
+_BLOCK = 4096
+
+# Número da linha dentro de uma mensagem: "(Linha 3" / "(linha 3"
+_MESSAGE_LINE = re.compile(r"(\([Ll]inha )(\d+)")
+
+
+def common_prefix(a, b):
+    """Tamanho do maior prefixo comum entre duas strings"""
+    limit = min(len(a), len(b))
+    i = 0
+    while i < limit and a[i:i + _BLOCK] == b[i:i + _BLOCK]:
+        i += _BLOCK
+    i = min(i, limit)
+    while i < limit and a[i] == b[i]:
+        i += 1
+    return i
+
+
+def shift_message(message, delta):
+    """Mensagem de erro/aviso com o número da linha deslocado em 'delta'"""
+    if isinstance(message, Diagnostic):
+        return message.shifted(delta)
+    return _MESSAGE_LINE.sub(lambda m: f"{m[1]}{int(m[2]) + delta}", message, count=1)
+
+
+def common_suffix(a, b, limit):
+    """Tamanho do maior sufixo comum (no máximo 'limit' caracteres)"""
+    la, lb = len(a), len(b)
+    n = 0
+    while n < limit and a[la - n - _BLOCK:la - n] == b[lb - n - _BLOCK:lb - n] \
+            and n + _BLOCK <= min(la, lb):
+        n += _BLOCK
+    n = min(n, limit)
+    while n < limit and a[la - n - 1] == b[lb - n - 1]:
+        n += 1
+    return n
+
+
+def _key(symbol):
+    """Identidade de um símbolo declarado (a mesma usada no digest)"""
+    return symbol.name, (symbol.scope, symbol.symbol_type)
+
+
+def _last_references(operations):
+    """Nome -> índice da última operação do journal que o menciona"""
+    references = {}
+    for index, (kind, target, data) in enumerate(operations):
+        if kind == "define":
+            references[data.name] = index
+        elif kind == "ref":
+            references[data] = index
+        elif kind in ("use", "value"):
+            references[target.name] = index
+    return references
+
+
+class IncrementalCompiler:
+    """
+    Compilador incremental: Lexer -> SLRParserWithSemantics -> SymbolTable
+
+    Os checkpoints ficam em listas paralelas (um índice por ';' de nível
+    superior, o índice 0 é o início do código). Assim, deslocar os
+    checkpoints reaproveitados após uma edição é uma operação sobre listas
+    de inteiros.
+    """
+
+    def __init__(self):
+        self.parser = None
+        self.source = None
+        self.statements = []          # Comandos de nível superior (AST)
+        self.lexical_errors = []      # LexicalError da versão atual
+        self.accepted = False         # Execução chegou ao '$' sem erro sintático
+
+        # Checkpoints (listas paralelas)
+        self.offsets = []             # Posição no código logo após o ';'
+        self.lines = []
+        self.columns = []
+        self.digests = []             # SymbolTable.digest
+        self.statement_marks = []     # Comandos de nível superior concluídos
+        self.journal_marks = []       # SymbolTable.checkpoint()[0]
+        self.error_marks = []         # SymbolTable.checkpoint()[1]
+        self.warning_marks = []       # SymbolTable.checkpoint()[2]
+        self.parser_error_marks = []  # len(parser.errors)
+
+        # Resultado da última compilação
+        self.success = False
+        self.errors = []
+        self.warnings = []
+        self.ast = None
+        self.reparsed_statements = 0  # Comandos reanalisados na última chamada
+        self.reused_statements = 0    # Comandos reaproveitados na última chamada
+
+    def compile(self, source_code):
+        """
+        Compila uma nova versão do código, reaproveitando a anterior
+
+        Args:
+            source_code: Texto completo da nova versão
+
+        Returns:
+            bool: True se compilação bem-sucedida
+        """
+        if self.parser is not None and source_code == self.source:
+            self.reparsed_statements = 0
+            self.reused_statements = len(self.statements)
+            return self.success
+
+        if self.parser is None:
+            self._start()
+            old = None
+            start = 0
+        else:
+            start = bisect_right(self.offsets, common_prefix(self.source, source_code)) - 1
+            old = self._detach(start)
+
+        self._resume(source_code, start, old)
+        self.source = source_code
+        self._finish()
+        return self.success
+
+    def _start(self):
+        """Primeira compilação: parser novo com checkpoint no início do código"""
+        self.parser = SLRParserWithSemantics(verbose=False)
+        self.parser.symbol_table = SymbolTable(journal=True)
+        self.parser.defer_program = True
+        self._record(0, 1, 1)
+
+    def _detach(self, start):
+        """
+        Restaura o checkpoint 'start' e devolve o que é preciso da execução
+        anterior para reaproveitar o final dela
+        """
+        parser = self.parser
+        old = {
+            "source": self.source,
+            "statements": self.statements,
+            "lexical_errors": self.lexical_errors,
+            "accepted": self.accepted,
+            "parser_errors": parser.errors[self.parser_error_marks[start]:],
+            "columns": self._columns(),
+            "start": start,
+        }
+
+        checkpoint = ParserCheckpoint(
+            self.statement_marks[start], self.parser_error_marks[start], 0,
+            (self.journal_marks[start], self.error_marks[start], self.warning_marks[start])
+        )
+        old["undone"] = parser.restore(checkpoint, self.statements)
+
+        position = (self.lines[start], self.columns[start])
+        self.statements = self.statements[:self.statement_marks[start]]
+        self.lexical_errors = [e for e in self.lexical_errors if (e.line, e.column) < position]
+        # Novas listas: as antigas continuam em old["columns"]
+        (self.offsets, self.lines, self.columns, self.digests, self.statement_marks,
+         self.journal_marks, self.error_marks, self.warning_marks,
+         self.parser_error_marks) = [column[:start + 1] for column in self._columns()]
+        return old
+
+    def _resume(self, source_code, start, old):
+        """Relexa e reanalisa a partir do checkpoint 'start'"""
+        parser = self.parser
+        lexer = Lexer(source_code, self.offsets[start], self.lines[start], self.columns[start],
+                      aggregate=False)
+        lexical_base = self.lexical_errors
+
+        if old is not None:
+            delta = len(source_code) - len(old["source"])
+            line_delta = source_code.count("\n") - old["source"].count("\n")
+            prefix_limit = min(len(source_code), len(old["source"])) - self.offsets[start]
+            resume_at = len(source_code) - common_suffix(old["source"], source_code, prefix_limit)
+            old_offsets = old["columns"][0]
+            sync = {"floor": -1}          # Estado de _independent nesta chamada
+
+        statements = self.statements
+        reparsed = 0
+        resynced = False
+        self.reused_statements = len(statements)
+
+        tokens = lexer.iter_tokens()
+        for token in tokens:
+            completed, _ = parser.feed(token)
+            if completed:
+                statements.extend(completed)
+                reparsed += len(completed)
+
+            if parser.finished:
+                # Após um erro sintático o lexer continua até o fim, como na
+                # compilação completa, para relatar todos os erros léxicos
+                for _ in tokens:
+                    pass
+                break
+
+            if token.type != ";" or parser.stack[-1] != SEQUENCE_STATE:
+                continue
+
+            self._record(lexer.position, lexer.line, lexer.column)
+
+            # Ressincronização com a execução anterior
+            if old is None or lexer.position < resume_at:
+                continue
+            j = bisect_left(old_offsets, lexer.position - delta)
+            if j < len(old_offsets) and self._matches(old, j, lexer.position - delta,
+                                                      line_delta, sync):
+                self.lexical_errors = lexical_base + lexer.errors
+                self._splice(old, j, delta, line_delta)
+                resynced = True
+                break
+
+        self.reparsed_statements = reparsed
+        if not resynced:
+            self.lexical_errors = lexical_base + lexer.errors
+            self.accepted = parser.accepted
+
+    def _matches(self, old, j, old_offset, line_delta, sync):
+        """Checkpoint novo equivale ao checkpoint j da execução anterior?"""
+        offsets, lines, columns, digests = old["columns"][:4]
+        if not (offsets[j] == old_offset
+                and lines[j] + line_delta == self.lines[-1]
+                and columns[j] == self.columns[-1]):
+            return False
+        return digests[j] == self.digests[-1] or self._independent(old, j, sync)
+
+    def _independent(self, old, j, sync):
+        """
+        Os símbolos declarados diferem, mas o final reaproveitado (a partir
+        do checkpoint j) não menciona nenhum dos nomes que mudaram?
+
+        Ex.: inserir 'FUS novo := 1' no meio do código muda a tabela para
+        todo o resto, mas nada depois dali usa 'novo'. sync["floor"] guarda
+        a última operação do final anterior que cita um nome alterado:
+        checkpoints antes dela são descartados sem refazer a conta.
+        """
+        operations = old["undone"][0]
+        journal_marks = old["columns"][5]
+        start = old["start"]
+        tail = journal_marks[j] - journal_marks[start]
+        if tail <= sync["floor"]:
+            return False
+
+        table = self.parser.symbol_table
+        changed = (
+            {_key(data) for kind, _, data in operations[:tail] if kind == "define"}
+            ^ {_key(data) for kind, _, data in table.journal[self.journal_marks[start]:]
+               if kind == "define"}
+        )
+        if "references" not in sync:
+            sync["references"] = _last_references(operations)
+        references = sync["references"]
+        sync["floor"] = max((references.get(name, -1) for name, _ in changed), default=-1)
+        return sync["floor"] < tail
+
+    def _splice(self, old, j, delta, line_delta):
+        """Reaproveita a execução anterior a partir do checkpoint j"""
+        parser = self.parser
+        start = old["start"]
+        (offsets, lines, columns, digests, statement_marks,
+         journal_marks, error_marks, warning_marks, parser_error_marks) = old["columns"]
+
+        # Tabela de símbolos: reaplica as operações feitas depois do checkpoint j
+        skip = (journal_marks[j] - journal_marks[start],
+                error_marks[j] - error_marks[start],
+                warning_marks[j] - warning_marks[start])
+        shift_journal = self.journal_marks[-1] - journal_marks[j]
+        shift_errors = self.error_marks[-1] - error_marks[j]
+        shift_warnings = self.warning_marks[-1] - warning_marks[j]
+        shift_parser_errors = self.parser_error_marks[-1] - parser_error_marks[j]
+        shift_statements = self.statement_marks[-1] - statement_marks[j]
+        undone = old["undone"]
+        parser_errors = old["parser_errors"][parser_error_marks[j] - parser_error_marks[start]:]
+        statements = old["statements"][statement_marks[j]:]
+        position = (lines[j], columns[j])
+        lexical_errors = [e for e in old["lexical_errors"] if (e.line, e.column) >= position]
+
+        if line_delta:
+            undone, parser_errors, lexical_errors = self._shift_lines(
+                undone, skip, parser_errors, statements, lexical_errors, line_delta
+            )
+        parser.symbol_table.replay(undone, skip)
+
+        # Erros do parser (sintáticos/ações) posteriores ao checkpoint j
+        parser.errors.extend(parser_errors)
+
+        # Comandos e erros léxicos do final da versão anterior
+        # (um ';' virtual da recuperação de erros não gera checkpoint, então
+        # o índice do checkpoint não é o número de comandos)
+        self.statements.extend(statements)
+        self.lexical_errors.extend(lexical_errors)
+
+        # Checkpoints posteriores, deslocados para a nova versão
+        self.offsets.extend([o + delta for o in offsets[j + 1:]])
+        self.lines.extend([line + line_delta for line in lines[j + 1:]])
+        self.columns.extend(columns[j + 1:])
+        # digest é um XOR por símbolo: a diferença no checkpoint j vale para
+        # todos os seguintes
+        digest_shift = self.digests[-1] ^ digests[j]
+        self.digests.extend([d ^ digest_shift for d in digests[j + 1:]])
+        self.statement_marks.extend([m + shift_statements for m in statement_marks[j + 1:]])
+        self.journal_marks.extend([m + shift_journal for m in journal_marks[j + 1:]])
+        self.error_marks.extend([m + shift_errors for m in error_marks[j + 1:]])
+        self.warning_marks.extend([m + shift_warnings for m in warning_marks[j + 1:]])
+        self.parser_error_marks.extend([m + shift_parser_errors for m in parser_error_marks[j + 1:]])
+
+        self.accepted = old["accepted"]
+        self.reused_statements += len(old["statements"]) - statement_marks[j]
+
+    @staticmethod
+    def _shift_lines(undone, skip, parser_errors, statements, lexical_errors, line_delta):
+        """
+        Desloca as linhas do trecho reaproveitado (linhas inseridas/removidas
+        antes dele): AST, símbolos declarados e mensagens
+        """
+        operations, errors, warnings = undone
+        for kind, _, data in operations[skip[0]:]:
+            if kind == "define" and data.line is not None:
+                data.line += line_delta
+        errors = errors[:skip[1]] + [shift_message(e, line_delta) for e in errors[skip[1]:]]
+        warnings = warnings[:skip[2]] + [shift_message(w, line_delta) for w in warnings[skip[2]:]]
+
+        for statement in statements:
+            shift_lines(statement, line_delta)
+
+        return (
+            (operations, errors, warnings),
+            [shift_message(e, line_delta) for e in parser_errors],
+            [LexicalError(e.message, e.line + line_delta, e.column, e.char) for e in lexical_errors],
+        )
+
+    def _record(self, offset, line, column):
+        """Registra um checkpoint no estado atual do parser"""
+        checkpoint = self.parser.checkpoint()
+        journal, errors, warnings = checkpoint.symbols
+        self.offsets.append(offset)
+        self.lines.append(line)
+        self.columns.append(column)
+        self.digests.append(self.parser.symbol_table.digest)
+        self.statement_marks.append(checkpoint.statements)
+        self.journal_marks.append(journal)
+        self.error_marks.append(errors)
+        self.warning_marks.append(warnings)
+        self.parser_error_marks.append(checkpoint.errors)
+
+    def _columns(self):
+        return (self.offsets, self.lines, self.columns, self.digests, self.statement_marks,
+                self.journal_marks, self.error_marks, self.warning_marks,
+                self.parser_error_marks)
+
+    def _finish(self):
+        """Monta o resultado: AST, erros e avisos (inclui símbolos não usados)"""
+        parser = self.parser
+        table = parser.symbol_table
+
+        # Como no parser completo, só há AST se a análise sintática foi aceita
+        if self.accepted and self.statements:
+            self.ast = Program(self.statements, self.statements[0].line)
+        else:
+            self.ast = None
+
+        # check_unused_symbols acrescenta avisos: são copiados e descartados
+        # para não alterar as marcas registradas nos checkpoints
+        warnings_len = len(table.warnings)
+        if self.accepted:
+            table.check_unused_symbols()
+        limit = parser.max_diagnostics
+        self.warnings = [str(w) for w in aggregate(table.warnings, limit)]
+        del table.warnings[warnings_len:]
+
+        # Único ponto em que os erros da tabela se juntam aos do parser (com
+        # defer_program o parser nunca os copia). A tabela e o lexer guardam
+        # uma ocorrência por registro (rollback); o resultado é agregado como
+        # numa compilação completa
+        errors = Lexer.aggregate_errors(self.lexical_errors, limit) + parser.errors
+        errors += aggregate(table.errors, limit)
+        self.errors = [str(e) for e in errors]
+        self.success = self.accepted and not self.errors
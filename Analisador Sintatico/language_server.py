@@ -0,0 +1,432 @@
+"""
+Servidor de Linguagem (LSP via stdio) para a Linguagem Fantasy
+
+Mantém os documentos abertos e, para cada um, um IncrementalCompiler:
+edições do editor (didChange com intervalos) são aplicadas ao texto e só os
+comandos a partir do trecho alterado são reanalisados (léxico, sintático e
+tabela de símbolos).
+
+- Diagnósticos (Lexer, SLRParserWithSemantics, SymbolTable) são publicados
+  com debounce: cada edição adia a análise do documento em DEBOUNCE segundos,
+  então uma sequência de digitação gera uma única análise, já da última versão
+- Requisições canceladas ($/cancelRequest) antes de serem atendidas são
+  respondidas com RequestCancelled, sem executar
+- Ir para definição (id e HIM . id) consulta a tabela de símbolos mantida
+  pelo compilador incremental: um acesso a dicionário, sem reanalisar o texto
+
+Uso (configurado no editor como comando do servidor):
+    python language_server.py
+"""
+
+import json
+import os
+import re
+import select
+import sys
+import time
+import traceback
+from collections import deque
+from bisect import bisect_right
+
+from incremental import IncrementalCompiler
+
+DEBOUNCE = 0.2                        # Segundos entre a última edição e a análise
+READ_SIZE = 65536
+
+# Códigos de erro JSON-RPC / LSP
+METHOD_NOT_FOUND = -32601
+INTERNAL_ERROR = -32603
+REQUEST_CANCELLED = -32800
+
+# Severidade dos diagnósticos (LSP)
+SEVERITY_ERROR = 1
+SEVERITY_WARNING = 2
+
+# Linha/coluna nas mensagens: "(Linha 3, Coluna 7)" ou "(linha 3)"
+POSITION_PATTERN = re.compile(r"\([Ll]inha (\d+)(?:, Coluna (\d+))?\)")
+IDENTIFIER = re.compile(r"[^\W\d]\w*")
+
+
+# ============================================================================
+# TRANSPORTE (JSON-RPC com cabeçalho Content-Length)
+# ============================================================================
+
+def read_message(stream):
+    """Lê uma mensagem do stream binário; None no fim da entrada"""
+    length = None
+    while True:
+        header = stream.readline()
+        if not header:
+            return None
+        header = header.strip()
+        if not header:
+            break
+        name, _, value = header.partition(b":")
+        if name.lower() == b"content-length":
+            length = int(value)
+    if length is None:
+        return None
+    return json.loads(stream.read(length))
+
+
+class MessageReader:
+    """
+    Lê mensagens de um descritor sem bloquear o servidor
+
+    poll() devolve as mensagens completas que já chegaram (esperando no
+    máximo 'timeout' segundos por dados); quadros incompletos ficam no buffer.
+    Usa select + os.read direto no descritor, sem thread de leitura.
+    """
+
+    def __init__(self, stream):
+        self.fd = stream.fileno()
+        self.buffer = bytearray()
+        self.closed = False
+
+    def poll(self, timeout=0):
+        messages = self._frames()
+        if messages or self.closed:
+            return messages
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        while ready:
+            data = os.read(self.fd, READ_SIZE)
+            if not data:
+                self.closed = True
+                break
+            self.buffer += data
+            ready, _, _ = select.select([self.fd], [], [], 0)
+        return self._frames()
+
+    def _frames(self):
+        messages = []
+        buffer = self.buffer
+        while True:
+            separator = buffer.find(b"\r\n\r\n")
+            if separator < 0:
+                return messages
+            length = 0
+            for header in bytes(buffer[:separator]).split(b"\r\n"):
+                name, _, value = header.partition(b":")
+                if name.strip().lower() == b"content-length":
+                    length = int(value)
+            start = separator + 4
+            if len(buffer) < start + length:
+                return messages
+            messages.append(json.loads(bytes(buffer[start:start + length])))
+            del buffer[:start + length]
+
+
+def write_message(stream, message):
+    """Escreve uma mensagem no stream binário"""
+    body = json.dumps(message, ensure_ascii=False).encode("utf-8")
+    stream.write(b"Content-Length: %d\r\n\r\n" % len(body) + body)
+    stream.flush()
+
+
+# ============================================================================
+# DOCUMENTO ABERTO
+# ============================================================================
+
+class Document:
+    """
+    Texto de um documento aberto, índice de linhas e compilador incremental
+
+    line_starts[i] é a posição do primeiro caractere da linha i (base 0).
+    Uma edição atualiza só as linhas alteradas e desloca as seguintes.
+    """
+
+    def __init__(self, uri, text, version):
+        self.uri = uri
+        self.text = text
+        self.version = version
+        self.line_starts = [0] + [m.end() for m in re.finditer("\n", text)]
+        self.compiler = IncrementalCompiler()
+        # Texto alterado desde a última análise (a 'version' do cliente é
+        # opcional e não serve para isso)
+        self.dirty = True
+
+    def apply_change(self, change):
+        """Aplica um TextDocumentContentChangeEvent (com ou sem 'range')"""
+        self.dirty = True
+        if "range" not in change:
+            self.text = change["text"]
+            self.line_starts = [0] + [m.end() for m in re.finditer("\n", self.text)]
+            return
+
+        start = self.offset(change["range"]["start"])
+        end = self.offset(change["range"]["end"])
+        new_text = change["text"]
+        self.text = self.text[:start] + new_text + self.text[end:]
+
+        starts = self.line_starts
+        first = bisect_right(starts, start) - 1
+        last = bisect_right(starts, end) - 1
+        delta = len(new_text) - (end - start)
+        inserted = [start + m.end() for m in re.finditer("\n", new_text)]
+        self.line_starts = (starts[:first + 1] + inserted
+                            + [s + delta for s in starts[last + 1:]])
+
+    def line_text(self, line):
+        """Texto da linha (base 0), sem a quebra"""
+        starts = self.line_starts
+        if line >= len(starts):
+            return ""
+        end = starts[line + 1] - 1 if line + 1 < len(starts) else len(self.text)
+        return self.text[starts[line]:end]
+
+    def offset(self, position):
+        """Position LSP (linha, caractere UTF-16) -> posição no texto"""
+        line = position["line"]
+        if line >= len(self.line_starts):
+            return len(self.text)
+        text = self.line_text(line)
+        return self.line_starts[line] + _utf16_to_index(text, position["character"])
+
+    def compile(self):
+        """Recompila (incremental) se o texto mudou desde a última análise"""
+        if self.dirty:
+            self.compiler.compile(self.text)
+            self.dirty = False
+
+    def diagnostics(self):
+        """Erros e avisos da última compilação no formato LSP"""
+        compiler = self.compiler
+        return ([self._diagnostic(message, SEVERITY_ERROR) for message in compiler.errors]
+                + [self._diagnostic(message, SEVERITY_WARNING) for message in compiler.warnings])
+
+    def _diagnostic(self, message, severity):
+        match = POSITION_PATTERN.search(message)
+        line = int(match[1]) - 1 if match else 0
+        text = self.line_text(line)
+        if match and match[2]:
+            start = _index_to_utf16(text, int(match[2]) - 1)
+            end = start + 1
+        else:
+            start, end = 0, _index_to_utf16(text, len(text))
+        return {
+            "range": {"start": {"line": line, "character": start},
+                      "end": {"line": line, "character": end}},
+            "severity": severity,
+            "source": "fantasy",
+            "message": message,
+        }
+
+    def definition(self, position):
+        """Location da declaração do id (ou HIM . id) na posição, ou None"""
+        line = position["line"]
+        text = self.line_text(line)
+        index = _utf16_to_index(text, position["character"])
+        for match in IDENTIFIER.finditer(text):
+            if match.start() <= index <= match.end():
+                break
+        else:
+            return None
+
+        # id e HIM . id resolvem igual: o parser declara tudo no escopo global
+        name = match[0]
+        if name in _KEYWORDS:
+            return None
+
+        symbol = self.compiler.parser.symbol_table.global_scope.lookup(name)
+        if symbol is None or symbol.line is None:
+            return None
+
+        declared = self.line_text(symbol.line - 1)
+        found = re.search(rf"\b(?:FUS|KEL)\s+({re.escape(name)})\b", declared)
+        column = found.start(1) if found else 0
+        start = {"line": symbol.line - 1, "character": _index_to_utf16(declared, column)}
+        end = {"line": symbol.line - 1,
+               "character": _index_to_utf16(declared, column + len(name))}
+        return {"uri": self.uri, "range": {"start": start, "end": end}}
+
+
+_KEYWORDS = frozenset(("LOS", "FOD", "FAH", "JUN", "KEL", "FUS", "HON", "print",
+                       "assign", "HIM", "NUST", "ANRK", "AAN", "KO"))
+
+
+def _utf16_to_index(text, units):
+    """Caractere UTF-16 (LSP) -> índice na string Python"""
+    if text.isascii():
+        return min(units, len(text))
+    count = 0
+    for index, char in enumerate(text):
+        if count >= units:
+            return index
+        count += 2 if ord(char) > 0xFFFF else 1
+    return len(text)
+
+
+def _index_to_utf16(text, index):
+    """Índice na string Python -> caractere UTF-16 (LSP)"""
+    if text.isascii():
+        return index
+    return index + sum(1 for char in text[:index] if ord(char) > 0xFFFF)
+
+
+# ============================================================================
+# SERVIDOR
+# ============================================================================
+
+class LanguageServer:
+    """
+    Laço principal do servidor
+
+    Antes de atender cada mensagem o servidor recolhe o que já chegou na
+    entrada, registrando os cancelamentos; quando a fila fica vazia por
+    DEBOUNCE segundos após uma edição, analisa o documento editado.
+    """
+
+    def __init__(self, reader, writer, debounce=DEBOUNCE):
+        self.reader = MessageReader(reader)
+        self.writer = writer
+        self.debounce = debounce
+        self.documents = {}
+        self.due = {}                 # uri -> instante da análise pendente
+        self.inbox = deque()
+        self.cancelled = set()
+        self.running = True
+        self.handlers = {
+            "initialize": self.initialize,
+            "shutdown": self.shutdown,
+            "exit": self.exit,
+            "textDocument/didOpen": self.did_open,
+            "textDocument/didChange": self.did_change,
+            "textDocument/didClose": self.did_close,
+            "textDocument/definition": self.definition,
+        }
+
+    def serve(self):
+        while self.running:
+            if not self.inbox:
+                if self.reader.closed:
+                    break
+                timeout = max(0.0, min(self.due.values()) - time.monotonic()) if self.due else None
+                self._receive(timeout)
+                if not self.inbox:
+                    self._publish_due()
+                    continue
+            self._receive(0)          # Cancelamentos chegados durante o atendimento
+            self._dispatch(self.inbox.popleft())
+
+    def _receive(self, timeout):
+        for message in self.reader.poll(timeout):
+            if message.get("method") == "$/cancelRequest":
+                self.cancelled.add(message["params"]["id"])
+            else:
+                self.inbox.append(message)
+
+    def _dispatch(self, message):
+        method = message.get("method")
+        request_id = message.get("id")
+        if method is None:
+            return                    # Resposta do cliente: ignorada
+
+        if request_id is not None and request_id in self.cancelled:
+            self.cancelled.discard(request_id)
+            self._error(request_id, REQUEST_CANCELLED, "requisição cancelada")
+            return
+
+        handler = self.handlers.get(method)
+        if handler is None:
+            if request_id is not None:
+                self._error(request_id, METHOD_NOT_FOUND, f"método não suportado: {method}")
+            return
+
+        try:
+            result = handler(message.get("params") or {})
+        except Exception as e:
+            # Uma mensagem com problema não derruba o servidor: o log vai
+            # para stderr (stdout é o canal do protocolo)
+            traceback.print_exc(file=sys.stderr)
+            if request_id is not None:
+                self._error(request_id, INTERNAL_ERROR, f"erro interno em {method}: {e}")
+            return
+        if request_id is not None:
+            write_message(self.writer, {"jsonrpc": "2.0", "id": request_id, "result": result})
+
+    def _error(self, request_id, code, text):
+        write_message(self.writer, {"jsonrpc": "2.0", "id": request_id,
+                                    "error": {"code": code, "message": text}})
+
+    def _publish_due(self):
+        """Analisa os documentos cujo debounce terminou"""
+        self._receive(0)
+        if self.inbox:
+            return                    # Edições novas primeiro: podem adiar a análise
+        now = time.monotonic()
+        for uri in [uri for uri, when in self.due.items() if when <= now]:
+            del self.due[uri]
+            try:
+                self._publish(self.documents[uri])
+            except Exception:
+                traceback.print_exc(file=sys.stderr)
+
+    def _publish(self, document):
+        document.compile()
+        write_message(self.writer, {
+            "jsonrpc": "2.0",
+            "method": "textDocument/publishDiagnostics",
+            "params": {"uri": document.uri, "version": document.version,
+                       "diagnostics": document.diagnostics()},
+        })
+
+    # --- Métodos LSP --------------------------------------------------------
+
+    def initialize(self, params):
+        return {
+            "capabilities": {
+                "textDocumentSync": {"openClose": True, "change": 2},   # incremental
+                "definitionProvider": True,
+            },
+            "serverInfo": {"name": "fantasy-language-server"},
+        }
+
+    def shutdown(self, params):
+        return None
+
+    def exit(self, params):
+        self.running = False
+
+    def did_open(self, params):
+        item = params["textDocument"]
+        document = Document(item["uri"], item["text"], item.get("version"))
+        self.documents[document.uri] = document
+        self._publish(document)
+
+    def did_change(self, params):
+        document = self.documents.get(params["textDocument"]["uri"])
+        if document is None:
+            return
+        for change in params["contentChanges"]:
+            document.apply_change(change)
+        document.version = params["textDocument"].get("version")
+        self.due[document.uri] = time.monotonic() + self.debounce
+
+    def did_close(self, params):
+        uri = params["textDocument"]["uri"]
+        self.documents.pop(uri, None)
+        self.due.pop(uri, None)
+        write_message(self.writer, {
+            "jsonrpc": "2.0",
+            "method": "textDocument/publishDiagnostics",
+            "params": {"uri": uri, "diagnostics": []},
+        })
+
+    def definition(self, params):
+        uri = params["textDocument"]["uri"]
+        document = self.documents.get(uri)
+        if document is None:
+            return None
+        # Índice precisa refletir o texto atual: antecipa a análise pendente
+        if self.due.pop(uri, None) is not None:
+            self._publish(document)
+        return document.definition(params["position"])
+
+
+def main():
+    LanguageServer(sys.stdin.buffer, sys.stdout.buffer).serve()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
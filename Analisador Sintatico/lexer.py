@@ -10,6 +10,7 @@ Números: [0-9]+
 
 import re
 from enum import Enum
+from diagnostics import MAX_DIAGNOSTICS, occurrences
 from parser_integrated import Token
 
 class TokenType(Enum):
@@ -54,14 +55,46 @@ class TokenType(Enum):
     ERROR = "ERROR"       # erro léxico
 
 
+# Um token precedido de espaços/comentários, com as mesmas regras de
+# iter_tokens. Usada pela validação rápida (scan_types), que não cria objetos
+# Token. Grupo 1 vazio: fim do código ou caractere inválido.
+TOKEN_PATTERN = re.compile(r"""
+    [ \t\n\r]* (?: (?: \#[^\n]*\n? | /\*.*?\*/ ) [ \t\n\r]* )*
+    ( [^\W\d]\w* | \d+ | := | [-+;.()] | )
+""", re.VERBOSE | re.DOTALL)
+
+
 class LexicalError(Exception):
-    """Exceção para erros léxicos"""
+    """
+    Exceção para erros léxicos
+    
+    message=None: "Caractere inválido 'c'", montada só quando lida. Um
+    registro pode agregar várias ocorrências do mesmo caractere (count,
+    last_line/last_column), como os Diagnostic da tabela de símbolos.
+    """
     def __init__(self, message, line, column, char):
-        self.message = message
+        super().__init__(message, line, column, char)
+        self._message = message
         self.line = line
         self.column = column
-        self.char = char
-        super().__init__(f"ERRO LÉXICO (Linha {line}, Coluna {column}): {message}")
+        self.char = char              # None: registro de limite (sem caractere)
+        self.count = 1
+        self.last_line = line         # Última ocorrência
+        self.last_column = column
+    
+    @property
+    def message(self):
+        text = self._message if self._message is not None else f"Caractere inválido '{self.char}'"
+        return text + occurrences(self.count, self.last_line, self.last_column)
+    
+    def occur(self, line, column):
+        """Mais uma ocorrência do mesmo erro"""
+        self.count += 1
+        self.last_line = line
+        self.last_column = column
+    
+    def __str__(self):
+        return f"ERRO LÉXICO (Linha {self.line}, Coluna {self.column}): {self.message}"
 
 
 class Lexer:
@@ -85,13 +118,30 @@ class Lexer:
         'KO': TokenType.KO,
     }
     
-    def __init__(self, source_code):
+    # Lexema -> tipo do token para palavras reservadas e operadores
+    # (tipo = string usada pelo parser; demais palavras são 'id')
+    LEXEME_TYPES = {text: token_type.value for text, token_type in KEYWORDS.items()}
+    LEXEME_TYPES.update((op, op) for op in (":=", "+", "-", ";", ".", "(", ")"))
+    
+    def __init__(self, source_code, position=0, line=1, column=1, aggregate=True,
+                 max_errors=MAX_DIAGNOSTICS, budget=None):
         self.source = source_code
-        self.position = 0
-        self.line = 1
-        self.column = 1
+        self.position = position      # Permite retomar a análise no meio do código
+        self.line = line
+        self.column = column
         self.tokens = []
         self.errors = []
+        # aggregate=True: o mesmo caractere inválido vira um só registro (com
+        # contagem) e no máximo max_errors registros (None = sem limite); os
+        # demais só são contados. False: um registro por ocorrência, na ordem
+        # (análise incremental e token_ring, que acompanham self.errors)
+        self.aggregate = aggregate
+        self.max_errors = max_errors
+        self.occurrences = {}         # Caractere -> LexicalError
+        self.omitted = 0              # Erros além do limite
+        self.omitted_at = None        # (linha, coluna) do primeiro erro omitido
+        # Budget (governor.py): tokens, prazo, cancelamento e memória; None = sem limites
+        self.budget = budget
     
     def current_char(self):
         """Retorna o caractere atual"""
@@ -132,27 +182,30 @@ class Lexer:
             self.advance()  # Pula o \n
             return True
         
-        # Comentário de bloco: /* ... */
+        # Comentário de bloco: /* ... */ (busca o fim de uma vez: um '/*'
+        # sem fechamento custa uma busca, não um advance() por caractere)
         if char == '/' and self.peek_char() == '*':
-            self.advance()  # Pula /
-            self.advance()  # Pula *
-            
-            while self.current_char():
-                if self.current_char() == '*' and self.peek_char() == '/':
-                    self.advance()  # Pula *
-                    self.advance()  # Pula /
-                    return True
-                self.advance()
+            end = self.source.find("*/", self.position + 2)
+            closed = end >= 0
+            self._skip_to(end + 2 if closed else len(self.source))
             
-            # Comentário não fechado
-            self.errors.append(LexicalError(
-                "Comentário de bloco não fechado",
-                self.line, self.column, "/*"
-            ))
+            if not closed:
+                self._report("Comentário de bloco não fechado", self.line, self.column, "/*")
             return True
         
         return False
     
+    def _skip_to(self, position):
+        """Avança até 'position' atualizando linha e coluna (como advance())"""
+        source = self.source
+        newlines = source.count("\n", self.position, position)
+        if newlines:
+            self.line += newlines
+            self.column = position - source.rfind("\n", self.position, position)
+        else:
+            self.column += position - self.position
+        self.position = position
+    
     def read_number(self):
         """Lê um número inteiro"""
         start_line = self.line
@@ -213,8 +266,23 @@ class Lexer:
     
     def tokenize(self):
         """Analisa o código fonte e gera lista de tokens"""
-        self.tokens = []
+        self.tokens = list(self.iter_tokens())
+        return self.tokens
+    
+    def iter_tokens(self):
+        """
+        Gera os tokens sob demanda, um por vez (termina com EOF)
+        
+        Permite alimentar o parser (SLRParserWithSemantics.feed/parse)
+        enquanto o código ainda está sendo analisado, sem montar a lista.
+        """
         self.errors = []
+        self.occurrences = {}
+        self.omitted = 0
+        self.omitted_at = None
+        budget = self.budget
+        count = 0                     # Tokens gerados (orçamento)
+        next_check = 0 if budget is None else budget.charge(0)
         
         while self.position < len(self.source):
             # Pula espaços e comentários
@@ -233,32 +301,114 @@ class Lexer:
             
             # Números
             if char.isdigit():
-                self.tokens.append(self.read_number())
-                continue
+                token = self.read_number()
             
             # Identificadores e palavras-chave
-            if char.isalpha() or char == '_':
-                self.tokens.append(self.read_identifier_or_keyword())
-                continue
+            elif char.isalpha() or char == '_':
+                token = self.read_identifier_or_keyword()
             
             # Operadores
-            operator_token = self.read_operator()
-            if operator_token:
-                self.tokens.append(operator_token)
-                continue
+            else:
+                token = self.read_operator()
+                if token is None:
+                    # Caractere inválido
+                    self._report(None, start_line, start_col, char)
+                    self.advance()
+                    continue
             
-            # Caractere inválido
-            error = LexicalError(
-                f"Caractere inválido '{char}'",
-                start_line, start_col, char
-            )
-            self.errors.append(error)
-            self.advance()
+            if budget is not None:
+                count += 1
+                if count >= next_check:
+                    next_check = budget.charge(count, start_line)
+            yield token
+        
+        self._close_errors()
         
         # Adiciona token EOF
-        self.tokens.append(Token(TokenType.EOF.value, "$", self.line, self.column, "$"))
+        yield Token(TokenType.EOF.value, "$", self.line, self.column, "$")
+    
+    def _report(self, message, line, column, char):
+        """Registra um erro léxico (agregado por caractere e limitado, se aggregate)"""
+        if self.aggregate:
+            error = self.occurrences.get(char)
+            if error is not None:
+                error.occur(line, column)
+                return
+            if self.max_errors is not None and len(self.errors) >= self.max_errors:
+                if not self.omitted:
+                    self.omitted_at = (line, column)
+                self.omitted += 1
+                return
+            error = self.occurrences[char] = LexicalError(message, line, column, char)
+        else:
+            error = LexicalError(message, line, column, char)
+        self.errors.append(error)
+    
+    def _close_errors(self):
+        """Acrescenta o registro de limite (na posição do primeiro erro omitido)"""
+        if self.omitted:
+            line, column = self.omitted_at
+            self.errors.append(LexicalError(
+                f"Limite de {self.max_errors} erros léxicos atingido: {self.omitted} omitido(s)",
+                line, column, None
+            ))
+    
+    @classmethod
+    def aggregate_errors(cls, errors, max_errors=MAX_DIAGNOSTICS):
+        """
+        Erros de um Lexer(aggregate=False), um por ocorrência, agregados e
+        limitados como um Lexer(aggregate=True) os teria registrado
+        """
+        collector = cls("", max_errors=max_errors)
+        for error in errors:
+            collector._report(error._message, error.line, error.column, error.char)
+        collector._close_errors()
+        return collector.errors
+    
+    def scan_types(self):
+        """
+        Gera apenas (tipo, match) de cada token, terminando com ('$', match)
         
-        return self.tokens
+        Versão rápida de iter_tokens para validação sintática: uma expressão
+        regular por token e nenhum objeto Token. O match dá a posição
+        (match.start(1)), convertida em linha/coluna só quando necessário.
+        Para no primeiro erro léxico, registrado em self.errors.
+        """
+        self.errors = []
+        types = self.LEXEME_TYPES
+        end = len(self.source)
+        
+        # O grupo 1 casa vazio no pior caso: finditer nunca pula caracteres
+        for m in TOKEN_PATTERN.finditer(self.source, self.position):
+            text = m[1]
+            token_type = types.get(text)
+            if token_type is None:
+                if not text:
+                    if m.end() == end:
+                        yield "$", m
+                    else:
+                        # Caractere inválido ou comentário de bloco não fechado
+                        self._scan_error(m.end())
+                    return
+                token_type = "num" if text[0].isdigit() else "id"
+            yield token_type, m
+    
+    def locate(self, position):
+        """Converte uma posição do código em (linha, coluna)"""
+        source = self.source
+        line = self.line + source.count("\n", self.position, position)
+        if line == self.line:
+            return line, self.column + position - self.position
+        return line, position - source.rfind("\n", 0, position)
+    
+    def _scan_error(self, position):
+        """Registra o erro léxico que interrompeu scan_types"""
+        line, column = self.locate(position)
+        if self.source.startswith("/*", position):
+            self.errors.append(LexicalError("Comentário de bloco não fechado", line, column, "/*"))
+        else:
+            char = self.source[position]
+            self.errors.append(LexicalError(f"Caractere inválido '{char}'", line, column, char))
     
     def print_tokens(self):
         """Imprime lista de tokens formatada"""
@@ -25,17 +25,32 @@ MODO VERBOSE:
 =============================================================================
 """
 
+import time
+from functools import partial
+
 from SLR import closures
 from goto import transitions
 from terminais import terminals
 from nao_terminais import nonterminals
 from follow import FOLLOW
 from parser_integrated import SLRParserWithSemantics, Token
+from incremental import IncrementalCompiler
+from batch import BatchCompiler
+from cache import CompileCache
+from stats import CompileStats
+from memory import MemoryProfile
+from result import CompileResult, TextRenderer
+from token_ring import compile_pipeline
+from async_pipeline import compile_async
 from Compiladores.pda import AP
 from Compiladores.constants import EPSILON
 from Compiladores.delta import DeltaFinal
 
 
+def _quiet(*args, **kwargs):
+    """Substitui print quando a saída detalhada está desligada"""
+
+
 class PDALexerAdapter:
     """
     Adapta a saída do PDA para gerar tokens compatíveis com o parser SLR
@@ -97,26 +112,33 @@ class PDALexerAdapter:
         
         self.pda = AP(Sigma, gama, DeltaFinal, 'S', F)
     
-    def tokenize(self, source_code):
+    def tokenize(self, source_code, verbose=True):
         """
         Executa PDA e converte saída para tokens
         
         Args:
             source_code: String com código fonte (formato: "KO KEL # LOS")
+            verbose: Imprime a saída do PDA (False no servidor de compilação);
+                     uma função recebe as linhas no lugar de print
+                     (ex.: TextRenderer.log)
         
         Returns:
             Lista de objetos Token
         """
+        if callable(verbose):
+            log = verbose
+        else:
+            log = print if verbose else _quiet
         tokens = []
         linha_atual = 1
         
-        print("==================================================================")
-        print("=          SAÍDA DO PDA (Compiladores/main.py)                  =")
-        print("==================================================================")
+        log("==================================================================")
+        log("=          SAÍDA DO PDA (Compiladores/main.py)                  =")
+        log("==================================================================")
         
         # Executar PDA original e capturar saída
-        print("\n Processando entrada no PDA...")
-        print(f"Entrada: {source_code}\n")
+        log("\n Processando entrada no PDA...")
+        log(f"Entrada: {source_code}\n")
         
         # Separar por linhas (delimitadas por '#')
         linhas = source_code.split('#')
@@ -143,7 +165,7 @@ class PDALexerAdapter:
                 if token:
                     # Token reconhecido diretamente (não precisa do PDA)
                     tokens.append(token)
-                    print(f"  Linha {linha_atual}: '{palavra}' -> Reconhecido diretamente -> {token.type}")
+                    log(f"  Linha {linha_atual}: '{palavra}' -> Reconhecido diretamente -> {token.type}")
                 else:
                     # Não reconhecido diretamente, tentar PDA (palavras-chave)
                     estado_final = self._reconhecer_palavra(palavra)
@@ -164,17 +186,17 @@ class PDALexerAdapter:
                         tokens.append(token)
                         
                         # Mostrar saída do PDA (similar ao original)
-                        print(f"[OK] Linha {linha_atual}: '{palavra}' -> Estado {estado_final} -> {token_type} (ACEITO)")
+                        log(f"[OK] Linha {linha_atual}: '{palavra}' -> Estado {estado_final} -> {token_type} (ACEITO)")
                     
                     elif estado_final == 'X':
                         # Palavra rejeitada pelo PDA - classificar como ID
                         token = Token("id", palavra, linha_atual, value=palavra)
                         tokens.append(token)
-                        print(f"  Linha {linha_atual}: '{palavra}' -> Não reconhecido pelo PDA -> {token.type}")
+                        log(f"  Linha {linha_atual}: '{palavra}' -> Não reconhecido pelo PDA -> {token.type}")
                     
                     else:
                         # Estado não mapeado - tratar como ID
-                        print(f"[!] Linha {linha_atual}: '{palavra}' -> Estado '{estado_final}' não mapeado")
+                        log(f"[!] Linha {linha_atual}: '{palavra}' -> Estado '{estado_final}' não mapeado")
                         token = Token("id", palavra, linha_atual, value=palavra)
                         tokens.append(token)
             
@@ -185,22 +207,22 @@ class PDALexerAdapter:
         
         # Mostrar tabela de símbolos do PDA (apenas palavras processadas pelo PDA)
         if pda_results:
-            print("\n" + "="*70)
-            print(" TABELA DE SÍMBOLOS DO PDA:")
-            print("="*70)
-            print(f"{'Linha':<8} {'Palavra':<15} {'Estado Final':<15} {'Status':<10}")
-            print("="*70)
+            log("\n" + "="*70)
+            log(" TABELA DE SÍMBOLOS DO PDA:")
+            log("="*70)
+            log(f"{'Linha':<8} {'Palavra':<15} {'Estado Final':<15} {'Status':<10}")
+            log("="*70)
             
             for result in pda_results:
                 status = "[OK] ACEITO" if result['aceito'] else "[X] REJEITADO"
-                print(f"{result['linha']:<8} {result['palavra']:<15} {result['estado']:<15} {status:<10}")
+                log(f"{result['linha']:<8} {result['palavra']:<15} {result['estado']:<15} {status:<10}")
             
-            print("="*70)
-            print(f"\n[OK] PDA processou {len(pda_results)} palavras")
+            log("="*70)
+            log(f"\n[OK] PDA processou {len(pda_results)} palavras")
         else:
-            print("\n[!] Nenhuma palavra foi processada pelo PDA (todas reconhecidas diretamente)")
+            log("\n[!] Nenhuma palavra foi processada pelo PDA (todas reconhecidas diretamente)")
         
-        print(f"[OK] Gerados {len(tokens)} tokens (incluindo EOF)\n")
+        log(f"[OK] Gerados {len(tokens)} tokens (incluindo EOF)\n")
         
         return tokens
     
@@ -299,14 +321,30 @@ class PDALexerAdapter:
 class CompiladorCompleto:
     """Pipeline completo: PDA Léxico -> SLR Sintático -> Análise Semântica"""
     
-    def __init__(self, verbose=True):
+    def __init__(self, verbose=True, cache=None, stats=False, memory=False, renderer="text"):
         self.lexer = PDALexerAdapter()
-        self.parser = SLRParserWithSemantics(verbose=verbose)
+        # CompileStats acumulado entre compile() e compile_many() (stats=True)
+        self.stats = CompileStats() if stats else None
+        # MemoryProfile (tracemalloc) acumulado entre chamadas de compile() (memory=True)
+        self.memory = MemoryProfile() if memory else None
+        # Saída legível: "text" (TextRenderer), None (nada impresso, nem o
+        # trace do parser) ou um objeto com os métodos de TextRenderer
+        if renderer == "text":
+            renderer = TextRenderer(verbose=verbose)
+        self.renderer = renderer
+        self.parser = SLRParserWithSemantics(verbose=verbose and renderer is not None,
+                                             stats=self.stats, memory=self.memory)
         self.verbose = verbose
+        self.incremental = None       # IncrementalCompiler (criado sob demanda)
+        self.batch = None             # BatchCompiler (pool criado sob demanda)
+        # CompileCache ou diretório do cache em disco (None = sem cache)
+        if cache is not None and not isinstance(cache, CompileCache):
+            cache = CompileCache(cache)
+        self.cache = cache
     
     def compile(self, source_code):
         """
-        Executa compilação completa
+        Executa compilação completa (analyze() e o relatório do renderer)
         
         Args:
             source_code: String com código fonte
@@ -314,42 +352,207 @@ class CompiladorCompleto:
         Returns:
             bool: True se compilação bem-sucedida
         """
-        print("\n" + "="*80)
-        print("FASE 1: ANÁLISE LÉXICA (PDA)")
-        print("="*80)
-        print(f"Código fonte: {source_code}\n")
+        return self.analyze(source_code).success
+    
+    def analyze(self, source_code, keep_tokens=False):
+        """
+        Compila e devolve um CompileResult (result.py)
+        
+        Com cache, um código já compilado (mesma gramática e lexer) não
+        passa pelo PDA nem pelo parser: tokens, tabela de símbolos e
+        diagnósticos guardados são restaurados em self.parser.
+        
+        Args:
+            source_code: String com código fonte
+            keep_tokens: Guarda a lista de tokens em result.tokens
         
-        # Fase 1: Análise Léxica com PDA
+        Returns:
+            CompileResult com diagnósticos, tabela de símbolos, AST e o
+            CompileStats desta compilação (stats=True)
+        """
+        render = self.renderer
+        start = time.perf_counter()
+        before = self.stats.copy() if self.stats is not None else None
+        # Cada chamada é uma compilação nova, mesmo se a anterior falhou no
+        # léxico ou veio do cache
+        self.parser.reset()
+        if render is not None:
+            render.start(source_code)
+        
+        if self.cache is not None:
+            key = self.cache.key(source_code, "pda")
+            entry = self.cache.get(key)
+            if entry is not None:
+                if render is not None:
+                    render.cached()
+                sucesso = entry.restore(self.parser)
+                if self.stats is not None:
+                    self.stats.compilations += 1
+                    self.stats.cached += 1
+                result = self._result(sucesso, before, cached=True,
+                                      total_time=time.perf_counter() - start)
+                if render is not None:
+                    render.report(result)
+                return result
+        
+        if self.memory is not None:
+            self.memory.begin()
+        
+        # Fase 1: Análise Léxica com PDA (o trace do PDA vai para o renderer)
         try:
-            tokens = self.lexer.tokenize(source_code)
+            log = render.log if render is not None else False
+            if self.stats is None:
+                tokenize = self.lexer.tokenize
+            else:
+                tokenize = partial(self.stats.lex, self.lexer.tokenize)
+            if self.memory is None:
+                tokens = tokenize(source_code, log)
+            else:
+                tokens = self.memory.lex(tokenize, source_code, log)
             
-            if self.verbose:
-                print("\n==================================================================")
-                print("=              TOKENS GERADOS PARA O PARSER                      =")
-                print("==================================================================")
-                for i, token in enumerate(tokens, 1):
-                    print(f"{i:3}. {token}")
-                print("-" * 80)
+            if render is not None:
+                render.tokens(tokens)
         
         except Exception as e:
-            print(f"\n[X] ERRO LÉXICO: {e}")
-            return False
+            if render is not None:
+                render.lexical_error(e)
+            if self.memory is not None:
+                self.memory.end()
+            return CompileResult(False, [f"ERRO LÉXICO: {e}"], [],
+                                 total_time=time.perf_counter() - start)
+        lexed = time.perf_counter()
         
         # Fase 2 & 3: Análise Sintática + Semântica
-        print("\n" + "="*80)
-        print("FASE 2 & 3: ANÁLISE SINTÁTICA E SEMÂNTICA (SLR)")
-        print("="*80 + "\n")
-        
-        sucesso = self.parser.parse(tokens)
+        if render is not None:
+            render.parsing()
         
+        if self.stats is None:
+            parse = self.parser.parse
+        else:
+            parse = partial(self.stats.parse, self.parser)
+        if self.memory is None:
+            sucesso = parse(tokens)
+        else:
+            sucesso = self.memory.measure("parse", parse, tokens)
+            self.memory.end()
+        parsed = time.perf_counter()
+        if self.cache is not None:
+            self.cache.put(key, tokens, [], self.parser)
+        
+        result = self._result(sucesso, before, tokens=tokens if keep_tokens else None,
+                              lex_time=lexed - start, parse_time=parsed - lexed,
+                              total_time=parsed - start)
         # Relatório final
-        self.parser.print_report()
+        if render is not None:
+            render.report(result)
+        return result
+    
+    def _result(self, sucesso, before, **fields):
+        """CompileResult do estado atual de self.parser"""
+        stats = self.stats.since(before) if before is not None else None
+        return CompileResult.from_parser(self.parser, sucesso, stats=stats, **fields)
+    
+    def compile_incremental(self, source_code):
+        """
+        Recompila reaproveitando a versão anterior (modo editor/watch)
+        
+        Usa o Lexer de lexer.py, que registra posição/linha/coluna e pode ser
+        retomado no meio do código. Só os comandos a partir do primeiro
+        trecho alterado são reanalisados (ver incremental.py).
+        
+        Args:
+            source_code: String com a versão completa do código fonte
+        
+        Returns:
+            CompileResult (léxico e sintático são intercalados: só
+            total_time é medido)
+        """
+        render = self.renderer
+        start = time.perf_counter()
+        if self.incremental is None:
+            self.incremental = IncrementalCompiler()
+        
+        inc = self.incremental
+        sucesso = inc.compile(source_code)
+        result = CompileResult(sucesso, list(inc.errors), list(inc.warnings),
+                               inc.parser.symbol_table, inc.ast, lex_time=None,
+                               parse_time=None, total_time=time.perf_counter() - start)
+        
+        if render is not None:
+            render.incremental(inc.reparsed_statements, inc.reused_statements)
+            render.report(result)
+        return result
+    
+    def compile_many(self, items, workers=None, chunksize=None, pipeline=False):
+        """
+        Compila muitos arquivos/códigos em paralelo, sem imprimir relatórios
         
-        return sucesso
+        Usa o Lexer de lexer.py e um pool de processos (ver batch.py) que é
+        mantido entre chamadas: os workers carregam lexer e tabelas uma vez.
+        
+        Args:
+            items: Caminhos de arquivos ou pares (nome, código fonte)
+            workers: Número de processos (padrão: os.cpu_count())
+            chunksize: Itens por lote enviado a cada worker
+            pipeline: Lexer e parser em processos separados, com os tokens
+                      em memória compartilhada (ver token_ring.py); usa
+                      workers // 2 pares (no mínimo 1) e ignora
+                      chunksize e o cache
+        
+        Yields:
+            BatchResult (success, errors, warnings, tempos) na ordem de conclusão
+        """
+        if pipeline:
+            pairs = max(1, workers // 2) if workers else None
+            yield from compile_pipeline(items, pairs=pairs)
+            return
+        
+        if self.batch is None or (workers and workers != self.batch.workers):
+            self.close()
+            self.batch = BatchCompiler(workers, cache=self.cache, stats=self.stats is not None)
+        
+        for result in self.batch.compile_many(items, chunksize):
+            if result.stats is not None:
+                self.stats.merge(result.stats)
+            yield result
+    
+    async def compile_async(self, items, **limits):
+        """
+        Versão asyncio de compile_many: leitura, léxico e parser sobrepostos
+        
+        Args:
+            items: Caminhos de arquivos ou pares (nome, código fonte)
+            limits: readers, lexers, parsers, queue_size, executor
+                    (ver async_pipeline.compile_async)
+        
+        Yields:
+            BatchResult na ordem de conclusão (total_time = latência do item)
+        """
+        async for result in compile_async(items, **limits):
+            yield result
+    
+    def close(self):
+        """Encerra os processos de compile_many()"""
+        if self.batch is not None:
+            self.batch.close()
+            self.batch = None
     
     def reset(self):
         """Reinicia compilador"""
         self.parser.reset()
+        if self.stats is not None or self.memory is not None:
+            # Handlers originais, instrumentados de novo para os objetos novos
+            self.parser.actions = self.parser.grammar.handlers
+        if self.stats is not None:
+            self.stats = CompileStats()
+            self.parser.stats = self.stats
+            self.stats.instrument(self.parser)
+        if self.memory is not None:
+            self.memory = MemoryProfile()
+            self.parser.memory = self.memory
+            self.memory.instrument(self.parser)
+        self.incremental = None
+        self.close()
 
 
 # ============================================================================
@@ -0,0 +1,412 @@
+"""
+Perfil de Memória da Compilação (tracemalloc)
+
+MemoryProfile mede, com tracemalloc, o pico e a memória retida das fases
+    lex        Lexer.tokenize / PDALexerAdapter.tokenize
+    parse      autômato SLR(1): pilhas, atributos empilhados, recuperação
+    semantic   handlers semânticos e verificação final da tabela de símbolos
+e atribui a memória que sobra no fim de cada compilação a categorias:
+    tokens       objetos Token, listas de tokens e lexemas
+    attributes   nós da AST e a pilha de atributos do parser
+    symbols      Symbol, Scope e os dicionários de cada escopo
+    diagnostics  mensagens de erro e aviso, LexicalError
+    other        o resto
+
+Pico: maior memória rastreada durante a fase, acima da memória no início
+da compilação. Retida: crescimento líquido da fase. Como em stats.py, a
+semântica é medida em volta de cada handler (cópia dos handlers do parser
+criado com memory=..., e check_unused_symbols da sua SymbolTable); 'parse'
+exclui o que foi medido na semântica e pode ser negativo, quando o
+autômato descarta da pilha atributos que os handlers criaram.
+
+Atribuição por local de alocação: tracemalloc guarda arquivo e linha de
+cada bloco, e as linhas do compilador são classificadas uma vez, lendo o
+código com o módulo ast: chamadas Token(...), Symbol(...)/Scope(...), nós
+da AST, errors.append(...)/LexicalError(...); senão vale a classe, função
+ou módulo que contém a linha (lexer.py, SymbolTable, handlers @semantic).
+
+Snapshots: dump() grava o snapshot do tracemalloc junto com o resumo e a
+categoria de cada linha; diff() compara dois arquivos por fase, por
+categoria e pelas linhas que mais cresceram.
+
+Custo: com tracemalloc cada alocação fica várias vezes mais lenta, e cada
+compilação tira dois snapshots. Desligado (memory=None, o padrão) nada muda.
+
+Uso:
+    compilador = CompiladorCompleto(verbose=False, memory=True, renderer=None)
+    compilador.compile(codigo)
+    print(compilador.memory.report())
+    compilador.memory.dump("depois.snap")
+
+    python memory.py exemplos/*.fan --snapshot depois.snap
+    python memory.py --diff antes.snap depois.snap
+"""
+
+import argparse
+import ast
+import linecache
+import os
+import pickle
+import sys
+import tracemalloc
+
+PHASES = ("lex", "parse", "semantic")
+CATEGORIES = ("tokens", "attributes", "symbols", "diagnostics", "other")
+SNAPSHOT_FORMAT = 1
+
+# Módulos, classes e funções inteiros atribuídos a uma categoria (o que está
+# dentro deles e não casa com uma regra de chamada abaixo)
+_MODULES = {"lexer.py": "tokens", "ast_nodes.py": "attributes", "symbol_table.py": "symbols"}
+_CLASSES = {"Token": "tokens", "PDALexerAdapter": "tokens", "Lexer": "tokens",
+            "Symbol": "symbols", "Scope": "symbols", "SymbolTable": "symbols"}
+_FUNCTIONS = {"_push_attribute": "attributes", "_grow_attributes": "attributes"}
+# Chamadas que alocam o objeto da categoria na linha de quem chama
+_CALLS = {"Token": "tokens", "Symbol": "symbols", "Scope": "symbols",
+          "LexicalError": "diagnostics", "SemanticError": "diagnostics"}
+_DIAGNOSTIC_LISTS = ("errors", "warnings")
+
+# Alocações do próprio perfil e do tracemalloc não entram nas contagens
+_IGNORED = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, linecache.__file__),
+    tracemalloc.Filter(False, ast.__file__),
+    tracemalloc.Filter(False, __file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+
+def _node_classes():
+    """Nomes das classes de nós da AST (ast_nodes.py)"""
+    import ast_nodes
+
+    return {name for name, value in vars(ast_nodes).items()
+            if isinstance(value, type) and issubclass(value, ast_nodes.Node)}
+
+
+def _call_name(node):
+    function = node.func
+    if isinstance(function, ast.Name):
+        return function.id
+    if isinstance(function, ast.Attribute):
+        return function.attr
+    return None
+
+
+def _is_diagnostic_call(node):
+    """self.errors.append(...), table.warnings.extend(...), ..."""
+    function = node.func
+    return (isinstance(function, ast.Attribute)
+            and function.attr in ("append", "extend", "insert")
+            and isinstance(function.value, ast.Attribute)
+            and function.value.attr in _DIAGNOSTIC_LISTS)
+
+
+def classify_file(filename):
+    """
+    {linha: categoria} de um arquivo do compilador (vazio se não for Python)
+
+    Regras do mais amplo ao mais específico; a última que cobre a linha vale:
+    módulo, classe/função (as internas depois das externas), chamadas.
+    """
+    source = "".join(linecache.getlines(filename))
+    if not source:
+        return {}
+    try:
+        tree = ast.parse(source, filename)
+    except (SyntaxError, ValueError):
+        return {}
+
+    categories = {}
+
+    def mark(node, category):
+        for line in range(node.lineno, (node.end_lineno or node.lineno) + 1):
+            categories[line] = category
+
+    default = _MODULES.get(os.path.basename(filename))
+    if default is not None:
+        for line in range(1, source.count("\n") + 2):
+            categories[line] = default
+
+    nodes = _node_classes()
+    calls = []
+    for node in ast.walk(tree):           # Em largura: externas antes das internas
+        if isinstance(node, ast.ClassDef) and node.name in _CLASSES:
+            mark(node, _CLASSES[node.name])
+        elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            semantic = node.name.startswith("_action") or any(
+                isinstance(decorator, ast.Call) and _call_name(decorator) == "semantic"
+                for decorator in node.decorator_list)
+            if semantic:
+                mark(node, "attributes")
+            elif node.name in _FUNCTIONS:
+                mark(node, _FUNCTIONS[node.name])
+        elif isinstance(node, ast.Assign) and any(
+                isinstance(target, ast.Attribute) and target.attr == "attributes"
+                for target in node.targets):
+            mark(node, "attributes")
+        elif isinstance(node, ast.Call):
+            calls.append(node)
+
+    for node in calls:
+        name = _call_name(node)
+        if _is_diagnostic_call(node):
+            mark(node, "diagnostics")
+        elif name in _CALLS:
+            mark(node, _CALLS[name])
+        elif name in nodes:
+            mark(node, "attributes")
+    return categories
+
+
+class SiteClassifier:
+    """Categoria de (arquivo, linha), classificando cada arquivo uma vez"""
+    __slots__ = ("files",)
+
+    def __init__(self):
+        self.files = {}
+
+    def __call__(self, filename, lineno):
+        lines = self.files.get(filename)
+        if lines is None:
+            lines = self.files[filename] = classify_file(filename)
+        return lines.get(lineno, "other")
+
+
+def take_snapshot():
+    """Snapshot do tracemalloc sem as alocações do próprio perfil"""
+    return tracemalloc.take_snapshot().filter_traces(_IGNORED)
+
+
+class MemoryProfile:
+    """Pico e memória retida por fase e por categoria de uma ou mais compilações"""
+    __slots__ = ("peak", "retained", "categories", "compilations", "frames", "snapshot",
+                 "classify", "baseline", "outer_peak", "before")
+
+    def __init__(self, frames=1):
+        self.peak = dict.fromkeys(PHASES, 0)           # Bytes acima do início da compilação
+        self.retained = dict.fromkeys(PHASES, 0)       # Crescimento líquido por fase
+        self.categories = dict.fromkeys(CATEGORIES, 0) # Retido no fim, por categoria
+        self.compilations = 0
+        self.frames = frames                  # Profundidade das tracebacks do tracemalloc
+        self.snapshot = None                  # Snapshot do fim da última compilação
+        self.classify = SiteClassifier()
+        self.baseline = 0                     # Memória rastreada no início da compilação
+        self.outer_peak = 0                   # Pico da fase antes do último handler
+        self.before = None                    # Snapshot do início da compilação
+
+    # --- Medição ------------------------------------------------------------
+
+    def begin(self):
+        """Início de uma compilação (liga o tracemalloc se preciso)"""
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+        self.before = take_snapshot()
+        self.baseline = tracemalloc.get_traced_memory()[0]
+
+    def measure(self, phase, function, *args):
+        """Executa function(*args) como a fase 'phase'; devolve o resultado"""
+        tracemalloc.reset_peak()
+        start = tracemalloc.get_traced_memory()[0]
+        semantic = self.retained["semantic"]
+        self.outer_peak = 0
+        try:
+            return function(*args)
+        finally:
+            current, peak = tracemalloc.get_traced_memory()
+            self._note_peak(phase, max(peak, self.outer_peak))
+            self.retained[phase] += (current - start) - (self.retained["semantic"] - semantic)
+
+    def lex(self, tokenize, *args):
+        return self.measure("lex", tokenize, *args)
+
+    def parse(self, parser, tokens):
+        """parser.parse(tokens); o parser precisa ter sido criado com memory=self"""
+        return self.measure("parse", parser.parse, tokens)
+
+    def end(self):
+        """Fim de uma compilação: atribui o que ficou retido às categorias"""
+        snapshot = take_snapshot()
+        if self.before is not None:
+            for stat in snapshot.compare_to(self.before, "lineno"):
+                frame = stat.traceback[0]
+                self.categories[self.classify(frame.filename, frame.lineno)] += stat.size_diff
+        self.snapshot = snapshot
+        self.before = None
+        self.compilations += 1
+
+    def _note_peak(self, phase, peak):
+        if peak - self.baseline > self.peak[phase]:
+            self.peak[phase] = peak - self.baseline
+
+    def instrument(self, parser):
+        """Troca os handlers do parser (só desta instância) por versões medidas"""
+        parser.actions = tuple(self._measured(handler) for handler in parser.actions)
+        self.instrument_table(parser.symbol_table)
+
+    def instrument_table(self, table):
+        """Mede a verificação final da tabela como fase 'semantic'"""
+        table.check_unused_symbols = self._measured(table.check_unused_symbols)
+
+    def _measured(self, function):
+        """function medida como fase 'semantic'"""
+        profile = self
+        retained = self.retained
+        traced, reset_peak = tracemalloc.get_traced_memory, tracemalloc.reset_peak
+
+        def measured(*args):
+            start, peak = traced()
+            # O pico da fase externa até aqui se perderia no reset
+            if peak > profile.outer_peak:
+                profile.outer_peak = peak
+            reset_peak()
+            try:
+                return function(*args)
+            finally:
+                current, peak = traced()
+                profile._note_peak("semantic", peak)
+                retained["semantic"] += current - start
+                reset_peak()
+        return measured
+
+    # --- Agregação e exportação ---------------------------------------------
+
+    def merge(self, other):
+        """Soma outro MemoryProfile neste (picos: o maior)"""
+        for phase in PHASES:
+            self.peak[phase] = max(self.peak[phase], other.peak[phase])
+            self.retained[phase] += other.retained[phase]
+        for category in CATEGORIES:
+            self.categories[category] += other.categories[category]
+        self.compilations += other.compilations
+        return self
+
+    def sites(self, snapshot=None):
+        """{(arquivo, linha): categoria} das linhas presentes no snapshot"""
+        snapshot = snapshot or self.snapshot
+        if snapshot is None:
+            return {}
+        return {(stat.traceback[0].filename, stat.traceback[0].lineno):
+                self.classify(stat.traceback[0].filename, stat.traceback[0].lineno)
+                for stat in snapshot.statistics("lineno")}
+
+    def to_dict(self):
+        return {
+            "compilations": self.compilations,
+            "phases": {
+                phase: {"peak_bytes": self.peak[phase], "retained_bytes": self.retained[phase]}
+                for phase in PHASES
+            },
+            "categories": dict(self.categories),
+        }
+
+    def report(self):
+        """Texto com uma linha por fase e uma por categoria"""
+        lines = [f"  {phase:<12} pico {_mib(self.peak[phase])}  "
+                 f"retido {_mib(self.retained[phase])}" for phase in PHASES]
+        total = sum(self.categories.values())
+        for category in CATEGORIES:
+            share = self.categories[category] / total * 100 if total > 0 else 0.0
+            lines.append(f"  {category:<12} retido {_mib(self.categories[category])}  {share:5.1f}%")
+        return "\n".join(lines)
+
+    def dump(self, path):
+        """Grava o snapshot da última compilação com o resumo (ver load/diff)"""
+        if self.snapshot is None:
+            raise ValueError("nenhuma compilação medida")
+        with open(path, "wb") as file:
+            pickle.dump({"format": SNAPSHOT_FORMAT, "profile": self.to_dict(),
+                         "sites": self.sites(), "snapshot": self.snapshot},
+                        file, pickle.HIGHEST_PROTOCOL)
+
+    def __repr__(self):
+        return (f"MemoryProfile({self.compilations} compilação(ões), pico "
+                f"{max(self.peak.values()) / 2 ** 20:.2f} MiB)")
+
+
+def _mib(size):
+    return f"{size / 2 ** 20:10.3f} MiB"
+
+
+def load(path):
+    """Lê um arquivo gravado por MemoryProfile.dump"""
+    with open(path, "rb") as file:
+        data = pickle.load(file)
+    if data.get("format") != SNAPSHOT_FORMAT:
+        raise ValueError(f"{path}: formato de snapshot desconhecido")
+    return data
+
+
+def category_totals(data):
+    """Bytes por categoria no snapshot de um arquivo de load()"""
+    totals = dict.fromkeys(CATEGORIES, 0)
+    sites = data["sites"]
+    for stat in data["snapshot"].statistics("lineno"):
+        frame = stat.traceback[0]
+        totals[sites.get((frame.filename, frame.lineno), "other")] += stat.size
+    return totals
+
+
+def diff(old, new, top=10):
+    """Texto comparando dois arquivos de dump(): fases, categorias e linhas"""
+    old_data, new_data = load(old), load(new)
+    lines = [f"{'':<12} {'antes':>14} {'depois':>14} {'diferença':>14}"]
+
+    def row(name, before, after):
+        lines.append(f"{name:<12} {_mib(before)} {_mib(after)} {_mib(after - before)}")
+
+    for phase in PHASES:
+        before = old_data["profile"]["phases"][phase]
+        after = new_data["profile"]["phases"][phase]
+        row(f"{phase} pico", before["peak_bytes"], after["peak_bytes"])
+        row(f"{phase} ret.", before["retained_bytes"], after["retained_bytes"])
+    lines.append("")
+    old_totals, new_totals = category_totals(old_data), category_totals(new_data)
+    for category in CATEGORIES:
+        row(category, old_totals[category], new_totals[category])
+
+    lines.append("")
+    lines.append(f"Linhas que mais mudaram (top {top}):")
+    stats = new_data["snapshot"].compare_to(old_data["snapshot"], "lineno")
+    for stat in stats[:top]:
+        frame = stat.traceback[0]
+        category = new_data["sites"].get((frame.filename, frame.lineno),
+                                         old_data["sites"].get((frame.filename, frame.lineno), "other"))
+        lines.append(f"  {stat.size_diff / 1024:+10.1f} KiB {stat.count_diff:+8d} blocos  "
+                     f"{category:<12} {os.path.basename(frame.filename)}:{frame.lineno}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    from main import CompiladorCompleto
+
+    parser = argparse.ArgumentParser(description="Perfil de memória da compilação (tracemalloc)")
+    parser.add_argument("arquivos", nargs="*")
+    parser.add_argument("--snapshot", metavar="ARQUIVO",
+                        help="grava o snapshot da última compilação (para --diff)")
+    parser.add_argument("--diff", nargs=2, metavar=("ANTES", "DEPOIS"),
+                        help="compara dois snapshots gravados com --snapshot")
+    parser.add_argument("--top", type=int, default=10, help="linhas no --diff (padrão: 10)")
+    args = parser.parse_args(argv)
+
+    if args.diff:
+        print(diff(*args.diff, top=args.top))
+        return 0
+    if not args.arquivos:
+        parser.error("informe arquivos para compilar ou --diff")
+
+    compilador = CompiladorCompleto(verbose=False, memory=True, renderer=None)
+    for path in args.arquivos:
+        with open(path, encoding="utf-8") as file:
+            compilador.compile(file.read())
+
+    print(f"{compilador.memory.compilations} compilação(ões)")
+    print(compilador.memory.report())
+    if args.snapshot:
+        compilador.memory.dump(args.snapshot)
+        print(f"\nSnapshot gravado em {args.snapshot}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
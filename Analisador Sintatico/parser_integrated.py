@@ -7,8 +7,63 @@ from SLR import closures
 from goto import transitions
 from terminais import terminals
 from nao_terminais import nonterminals
+from types import MappingProxyType
+
 from follow import FOLLOW
+from first import FIRST
+from diagnostics import MAX_DIAGNOSTICS
+from governor import BudgetExceeded
 from symbol_table import SymbolTable
+from producoes import productions
+from result import CompileResult, TextRenderer
+from tracer import (PrintTracer, ACCEPT as TRACE_ACCEPT, ERROR as TRACE_ERROR,
+                    RECOVER_INSERT, RECOVER_UNWIND, RECOVER_DISCARD)
+from ast_nodes import (Num, Var, Member, Not, BinOp, Declaration, Assignment,
+                       Module, IOCommand, Return, If, Loop, Invalid, Program,
+                       Target, ExprTail)
+
+# Número de cada produção: (lhs, rhs) -> índice em producoes.py
+PRODUCTION_NUMBER = {production: n for n, production in enumerate(productions)}
+
+# Capacidade inicial da pilha de atributos (dobra quando enche)
+ATTRIBUTE_CAPACITY = 256
+
+# Estado alcançado por GOTO(0, CMD) / GOTO(15, CMD): comando de nível superior
+STATEMENT_STATE = transitions[(0, "CMD")]
+
+# Estado após o ';' que separa comandos de nível superior
+SEQUENCE_STATE = transitions[(STATEMENT_STATE, ";")]
+
+# Produção vazia EXPR' -> ε (reduzida via GOTO direto com FOLLOW(EXPR'))
+EMPTY_TAIL = PRODUCTION_NUMBER[("EXPR'", ())]
+
+# Ação de aceitação na tabela de validação sintática (ver validate)
+ACCEPT = -1 - len(productions)
+
+# Recuperação de erros (modo pânico): limite padrão de erros sintáticos e
+# tokens que iniciam um comando (pontos de sincronização além do ';')
+MAX_SYNTAX_ERRORS = 100
+SYNTAX_ERROR = "ERRO SINTATICO"
+COMMAND_START = frozenset(FIRST["CMD"])
+
+# Registro de handlers semânticos: número da produção -> função
+_SEMANTIC_HANDLERS = {}
+
+
+def semantic(*rules):
+    """
+    Decorador que registra um handler semântico para uma ou mais produções
+    
+    Args:
+        rules: Produções no formato 'LHS -> X Y Z' ('ε' para vazia)
+    """
+    def register(handler):
+        for rule in rules:
+            lhs, rhs = rule.split("->")
+            rhs = tuple(s for s in rhs.split() if s != "ε")
+            _SEMANTIC_HANDLERS[PRODUCTION_NUMBER[(lhs.strip(), rhs)]] = handler
+        return handler
+    return register
 
 class Token:
     """Token com atributos completos para análise semântica"""
@@ -33,28 +88,75 @@ class SemanticError(Exception):
         super().__init__(f"{error_type} ERROR (Line {line}): {message}")
 
 
-class SLRParserWithSemantics:
-    """Parser SLR(1) com análise semântica integrada"""
+class ParserCheckpoint:
+    """Estado do parser logo após um ';' de nível superior"""
+    __slots__ = ("statements", "errors", "warnings", "symbols")
+
+    def __init__(self, statements, errors, warnings, symbols):
+        self.statements = statements  # Comandos de nível superior já concluídos
+        self.errors = errors          # len(parser.errors) no checkpoint
+        self.warnings = warnings      # len(parser.warnings) no checkpoint
+        self.symbols = symbols        # SymbolTable.checkpoint()
+
+
+class CompiledGrammar:
+    """
+    Gramática compilada: tabelas do SLR(1) prontas e imutáveis
     
-    def __init__(self, verbose=True):
-        self.stack = [0]
-        self.symbols = []             # Pilha de símbolos sintáticos
-        self.attributes = []          # Pilha de atributos semânticos
-        self.closures = closures
-        self.transitions = transitions
-        self.terminals = terminals
-        self.nonterminals = nonterminals
-        self.follow = FOLLOW
-        self.productions = self._extract_productions()
-        self.symbol_table = SymbolTable()
-        self.verbose = verbose
-        self.errors = []              # Lista de erros (sintáticos + semânticos)
-        self.warnings = []
+    Montada uma única vez (GRAMMAR) e compartilhada por todas as análises,
+    inclusive entre threads: nada aqui é alterado depois da construção
+    (dicionários expostos como MappingProxyType, atributos congelados).
+    O estado de cada análise fica em SLRParserWithSemantics.
+    """
+    __slots__ = ("closures", "transitions", "terminals", "nonterminals", "follow",
+                 "productions", "production_numbers", "sizes", "handlers",
+                 "action_table", "goto_table", "expected")
+    
+    def __init__(self):
+        set_field = object.__setattr__
+        set_field(self, "closures", MappingProxyType(closures))
+        set_field(self, "transitions", MappingProxyType(transitions))
+        set_field(self, "terminals", frozenset(terminals))
+        set_field(self, "nonterminals", frozenset(nonterminals))
+        set_field(self, "follow", MappingProxyType(
+            {lhs: frozenset(symbols) for lhs, symbols in FOLLOW.items()}
+        ))
+        reductions = self._extract_productions()
+        set_field(self, "productions", MappingProxyType(
+            {state: (lhs, tuple(rhs)) for state, (lhs, rhs) in reductions.items()}
+        ))
+        set_field(self, "production_numbers", MappingProxyType(self._number_productions(reductions)))
+        set_field(self, "sizes", tuple(len(rhs) for lhs, rhs in productions))
+        
+        # Handlers semânticos por número da produção (funções, não métodos
+        # ligados: recebem o contexto da análise como primeiro argumento)
+        default = SLRParserWithSemantics._action_default
+        set_field(self, "handlers", tuple(
+            _SEMANTIC_HANDLERS.get(n, default) for n in range(len(productions))
+        ))
+        
+        action_table, goto_table = self._build_tables()
+        set_field(self, "action_table", action_table)
+        set_field(self, "goto_table", goto_table)
+        set_field(self, "expected", MappingProxyType(
+            {state: tuple(sorted(row)) for state, row in action_table.items()}
+        ))
+    
+    def __setattr__(self, name, value):
+        raise AttributeError(f"CompiledGrammar é imutável (atributo '{name}')")
+    
+    def parser(self, verbose=False, max_errors=MAX_SYNTAX_ERRORS, stats=None, tracer=None,
+               profiler=None, memory=None, max_diagnostics=MAX_DIAGNOSTICS, budget=None):
+        """Cria um contexto de análise novo que usa estas tabelas"""
+        return SLRParserWithSemantics(verbose=verbose, max_errors=max_errors, grammar=self,
+                                      stats=stats, tracer=tracer, profiler=profiler,
+                                      memory=memory, max_diagnostics=max_diagnostics,
+                                      budget=budget)
     
     def _extract_productions(self):
         """Extrai produções dos closures"""
         prods = {}
-        for state, closure in self.closures.items():
+        for state, closure in closures.items():
             if isinstance(closure, set):
                 for item in closure:
                     if len(item) == 2:
@@ -78,6 +180,187 @@ class SLRParserWithSemantics:
                         break
         return prods
     
+    def _number_productions(self, reductions):
+        """Associa cada estado de redução ao número da produção (producoes.py)"""
+        numbers = {}
+        for state, (lhs, rhs) in reductions.items():
+            key = (lhs, () if rhs in (["epsilon"], ["ε"]) else tuple(rhs))
+            numbers[state] = PRODUCTION_NUMBER[key]
+        return numbers
+    
+    def _build_tables(self):
+        """
+        Tabelas ACTION e GOTO (validate, recuperação de erros)
+        
+        ACTION: estado -> {lookahead: ação}
+        
+        Reproduz a ordem de decisão de _advance (aceitação, SHIFT, EXPR' -> ε,
+        REDUCE por FOLLOW), que depende só do par (estado, lookahead):
+            ação >= 0       SHIFT para o estado 'ação'
+            ação == ACCEPT  aceitação
+            outra (< 0)     REDUCE pela produção ~ação
+        """
+        follow_tail = self.follow.get("EXPR'", set())
+        table = {}
+        
+        # terminais.py não lista todos os terminais deslocados em goto.py ('.');
+        # 'ε' (transição da produção vazia) nunca é lookahead: não entra em
+        # 'esperado: ...'
+        lookaheads = set(self.terminals) | {
+            symbol for _, symbol in self.transitions if symbol not in self.nonterminals
+        }
+        lookaheads -= {"ε", "epsilon"}
+        
+        for state in self.closures:
+            row = {}
+            for lookahead in lookaheads:
+                if state == 1 and lookahead == "$":
+                    row[lookahead] = ACCEPT
+                elif (state, lookahead) in self.transitions:
+                    row[lookahead] = self.transitions[(state, lookahead)]
+                elif (state, "EXPR'") in self.transitions and (
+                        self.transitions.get((state, "epsilon")) == 38
+                        or lookahead in follow_tail):
+                    row[lookahead] = ~EMPTY_TAIL
+                elif state in self.production_numbers:
+                    production = self.production_numbers[state]
+                    lhs = productions[production][0]
+                    if lookahead in self.follow.get(lhs, set()) or lookahead == "$":
+                        row[lookahead] = ~production
+            table[state] = row
+        
+        # GOTO indexado pelo número da produção: estado -> {produção: destino}
+        gotos = {state: {} for state in self.closures}
+        for (state, symbol), target in self.transitions.items():
+            if symbol in self.nonterminals:
+                for production, (lhs, rhs) in enumerate(productions):
+                    if lhs == symbol:
+                        gotos[state][production] = target
+        
+        return (
+            MappingProxyType({state: MappingProxyType(row) for state, row in table.items()}),
+            MappingProxyType({state: MappingProxyType(row) for state, row in gotos.items()}),
+        )
+    
+    def validate(self, tokens):
+        """
+        Validação apenas sintática: só a pilha de estados, sem atributos,
+        ações semânticas ou tabela de símbolos
+        
+        Args:
+            tokens: Iterável de pares (tipo, posição) terminado por '$'
+                    (ex.: Lexer.scan_types()); a posição não é interpretada,
+                    só devolvida junto com o token do erro
+        
+        Returns:
+            None se o programa é aceito, senão o par (tipo, posição)
+            do primeiro token inesperado
+        """
+        table, gotos = self.action_table, self.goto_table
+        sizes = self.sizes
+        
+        stack = [0]
+        row = table[0]
+        lookahead = position = None
+        
+        for lookahead, position in tokens:
+            action = row.get(lookahead)
+            while action is not None:
+                if action >= 0:
+                    stack.append(action)
+                    row = table[action]
+                    break
+                if action == ACCEPT:
+                    return None
+                
+                production = ~action
+                size = sizes[production]
+                if size:
+                    del stack[-size:]
+                state = gotos[stack[-1]].get(production)
+                if state is None:
+                    return lookahead, position
+                stack.append(state)
+                row = table[state]
+                action = row.get(lookahead)
+            else:
+                return lookahead, position
+        
+        # Entrada terminou sem '$'
+        return lookahead, position
+    
+
+class SLRParserWithSemantics:
+    """
+    Parser SLR(1) com análise semântica integrada
+    
+    Cada instância é o contexto de uma análise (pilhas, erros, tabela de
+    símbolos). As tabelas vêm de um CompiledGrammar compartilhado, então criar
+    um parser é barato e análises simultâneas (uma instância por thread) não
+    interferem entre si.
+    """
+    
+    def __init__(self, verbose=True, max_errors=MAX_SYNTAX_ERRORS, grammar=None, stats=None,
+                 tracer=None, profiler=None, memory=None, max_diagnostics=MAX_DIAGNOSTICS,
+                 budget=None):
+        grammar = grammar or GRAMMAR
+        self.grammar = grammar
+        self.stack = [0]
+        self.symbols = []             # Pilha de símbolos sintáticos
+        self.attributes = [None] * ATTRIBUTE_CAPACITY  # Pilha de atributos (pré-alocada)
+        self.attr_top = 0             # Próxima posição livre em self.attributes
+        # Referências às tabelas compartilhadas (somente leitura)
+        self.closures = grammar.closures
+        self.transitions = grammar.transitions
+        self.terminals = grammar.terminals
+        self.nonterminals = grammar.nonterminals
+        self.follow = grammar.follow
+        self.productions = grammar.productions
+        self.production_numbers = grammar.production_numbers
+        self.actions = grammar.handlers
+        # Erros/avisos semânticos distintos por análise (diagnostics.py)
+        self.max_diagnostics = max_diagnostics
+        # Budget (governor.py): tokens, profundidade da pilha, escopos, prazo,
+        # cancelamento e memória, conferidos a cada budget.check_every tokens
+        self.budget = budget
+        self.fed = 0                  # Tokens recebidos por feed()
+        self.next_check = 0           # Valor de self.fed da próxima verificação
+        self.symbol_table = SymbolTable(max_diagnostics=max_diagnostics, budget=budget)
+        self.verbose = verbose
+        self.errors = []              # Lista de erros (sintáticos + semânticos)
+        self.warnings = []
+        self.ast = None               # Program construído na aceitação
+        self.step = 1                 # Contador de passos (registros do tracer)
+        self.last_line = 0            # Linha do último token recebido
+        self.accepted = False         # '$' aceito no estado final
+        self.finished = False         # Aceito ou interrompido por erro
+        # Se True, o '$' termina no último comando de nível superior sem
+        # reduzir a cadeia S nem finalizar a semântica (IncrementalCompiler)
+        self.defer_program = False
+        self.max_errors = max_errors  # Limite de erros sintáticos por análise
+        self.syntax_errors = 0        # Erros sintáticos registrados até agora
+        self.recovering = False       # Descartando tokens após um erro (modo pânico)
+        # Tracer (tracer.py): recebe cada passo do autômato e as mensagens
+        # das ações semânticas; verbose=True usa um PrintTracer. None = o
+        # laço e os handlers só testam uma variável
+        if tracer is None and verbose:
+            tracer = PrintTracer()
+        self.tracer = tracer
+        # CompileStats (stats.py): se dado, handlers e tabela de símbolos
+        # desta instância passam a ser medidos; None = sem custo algum
+        self.stats = stats
+        if stats is not None:
+            stats.instrument(self)
+        # ProductionProfiler (profiler.py): tempo por produção e por operação
+        # da tabela de símbolos; envolve os handlers atuais (inclusive os de stats)
+        self.profiler = profiler
+        if profiler is not None:
+            profiler.instrument(self)
+        # MemoryProfile (memory.py): pico e memória retida da fase semântica
+        self.memory = memory
+        if memory is not None:
+            memory.instrument(self)
+    
     def semantic_action(self, production_lhs, production_rhs, attributes):
         """
         Executa ações semânticas durante redução
@@ -85,361 +368,687 @@ class SLRParserWithSemantics:
         Args:
             production_lhs: Lado esquerdo da produção
             production_rhs: Lado direito da produção (símbolos)
-            attributes: Lista de atributos dos símbolos (na ordem da produção)
+            attributes: Sequência de atributos dos símbolos (na ordem da produção)
         
         Returns:
             Atributo sintetizado para o não-terminal da esquerda
         """
+        rhs = () if list(production_rhs) in (["epsilon"], ["ε"]) else tuple(production_rhs)
+        return self.actions[PRODUCTION_NUMBER[(production_lhs, rhs)]](self, attributes, 0)
+    
+    # ------------------------------------------------------------------------
+    # Handlers semânticos (um por produção, registrados por @semantic)
+    #
+    # Cada handler recebe o vetor de atributos 'a' e a base 'b' do lado
+    # direito: o i-ésimo símbolo da produção está em a[b + i] (sem fatiar).
+    # ------------------------------------------------------------------------
+    
+    def _action_default(self, a, b):
+        """Padrão: repassa o atributo do primeiro símbolo"""
+        return a[b]
+    
+    @semantic("S -> CMD ; S")
+    def _action_sequence(self, a, b):
+        # S é recursiva à direita: comandos chegam do último ao primeiro
+        program = a[b + 2]
+        program.statements.appendleft(a[b])
+        program.line = a[b].line
+        return program
+    
+    @semantic("S -> CMD")
+    def _action_last_command(self, a, b):
+        return Program([a[b]], a[b].line)
+    
+    @semantic("CMD -> LOS EXPR CMD")
+    def _action_if(self, a, b):
+        return If(a[b + 1], a[b + 2], a[b].line)
+    
+    @semantic("CMD -> FOD CMD FAH EXPR", "CMD -> FAH CMD FAH EXPR")
+    def _action_loop(self, a, b):
+        keyword_token = a[b]
+        return Loop(keyword_token.type, a[b + 1], a[b + 3], keyword_token.line)
+    
+    @semantic("CMD -> IO id")
+    def _action_io(self, a, b):
+        id_token = a[b + 1]
         
-        # FUS id := EXPR - Declaração com atribuição
-        if production_lhs == "CMD" and len(production_rhs) == 4:
-            if production_rhs[0] == "FUS" and production_rhs[2] == ":=":
-                var_token = attributes[1]  # Token do 'id'
-                expr_value = attributes[3]  # Valor da expressão
-                
-                if self.verbose:
-                    print(f"[Semântico] Declarando '{var_token.lexeme}' = {expr_value} (linha {var_token.line})")
-                
-                # Declara na tabela de símbolos
-                self.symbol_table.declare(
-                    var_token.lexeme,
-                    symbol_type="variable",
-                    line=var_token.line,
-                    value=expr_value
-                )
-                
-                return {"type": "declaration", "name": var_token.lexeme, "value": expr_value}
+        if self.tracer is not None:
+            self.tracer.semantic("I/O com '{}' (linha {})", id_token.lexeme, id_token.line)
         
-        # LHS := EXPR - Atribuição
-        elif production_lhs == "CMD" and len(production_rhs) == 3:
-            if production_rhs[1] == ":=":
-                lhs_info = attributes[0]   # Informações do LHS
-                expr_value = attributes[2] # Valor da expressão
-                
-                if lhs_info and "name" in lhs_info:
-                    var_name = lhs_info["name"]
-                    var_line = lhs_info.get("line", 0)
-                    
-                    if self.verbose:
-                        print(f"[Semântico] Atribuindo '{var_name}' = {expr_value} (linha {var_line})")
-                    
-                    # Verifica se a variável foi declarada
-                    symbol = self.symbol_table.lookup(var_name, line=var_line)
-                    if symbol:
-                        symbol.value = expr_value  # Atualiza o valor
-                    
-                    return {"type": "assignment", "name": var_name, "value": expr_value}
-        
-        # LHS -> assign id
-        elif production_lhs == "LHS" and len(production_rhs) == 2:
-            if production_rhs[0] == "assign":
-                id_token = attributes[1]
-                return {"name": id_token.lexeme, "line": id_token.line}
-        
-        # LHS -> HIM . id (acesso a membro)
-        elif production_lhs == "LHS" and len(production_rhs) == 3:
-            if production_rhs[0] == "HIM":
-                id_token = attributes[2]
-                return {"name": f"HIM.{id_token.lexeme}", "line": id_token.line, "scoped": True}
-        
-        # KEL id CMD - Módulo
-        elif production_lhs == "CMD" and len(production_rhs) == 3:
-            if production_rhs[0] == "KEL":
-                module_token = attributes[1]
-                
-                if self.verbose:
-                    print(f"[Semântico] Definindo módulo '{module_token.lexeme}' (linha {module_token.line})")
-                
-                # Nota: enter_scope/exit_scope devem ser chamados durante o parsing
-                # Aqui apenas registramos o módulo
-                self.symbol_table.declare(
-                    module_token.lexeme,
-                    symbol_type="module",
-                    line=module_token.line
-                )
-                
-                return {"type": "module", "name": module_token.lexeme}
+        # Verifica se foi declarado
+        self.symbol_table.lookup(id_token.lexeme, line=id_token.line)
         
-        # IO id - Input/Output
-        elif production_lhs == "CMD" and len(production_rhs) == 2:
-            if production_rhs[0] == "IO":
-                id_token = attributes[1]
-                
-                if self.verbose:
-                    print(f"[Semântico] I/O com '{id_token.lexeme}' (linha {id_token.line})")
-                
-                # Verifica se foi declarado
-                self.symbol_table.lookup(id_token.lexeme, line=id_token.line)
-                
-                return {"type": "io", "name": id_token.lexeme}
+        return IOCommand(a[b], id_token.lexeme, id_token.line)
+    
+    @semantic("CMD -> JUN EXPR")
+    def _action_return(self, a, b):
+        expr_value = a[b + 1]
         
-        # JUN EXPR - Return
-        elif production_lhs == "CMD" and len(production_rhs) == 2:
-            if production_rhs[0] == "JUN":
-                expr_value = attributes[1]
-                
-                if self.verbose:
-                    print(f"[Semântico] Return {expr_value}")
-                
-                return {"type": "return", "value": expr_value}
+        if self.tracer is not None:
+            self.tracer.semantic("Return {}", expr_value)
         
-        # FACTOR -> id (uso de variável)
-        elif production_lhs == "FACTOR" and len(production_rhs) == 1:
-            if production_rhs[0] == "id":
-                id_token = attributes[0]
-                
-                # Busca na tabela de símbolos
-                symbol = self.symbol_table.lookup(id_token.lexeme, line=id_token.line)
-                
-                if symbol:
-                    return symbol.value if symbol.value is not None else f"${id_token.lexeme}"
-                else:
-                    return f"${id_token.lexeme}"  # Placeholder
-        
-        # FACTOR -> num
-        elif production_lhs == "FACTOR" and len(production_rhs) == 1:
-            if production_rhs[0] == "num":
-                num_token = attributes[0]
-                return num_token.value if hasattr(num_token, 'value') else num_token.lexeme
-        
-        # EXPR -> TERM EXPR'
-        elif production_lhs == "EXPR" and len(production_rhs) == 2:
-            term_value = attributes[0]
-            expr_prime = attributes[1]
-            
-            if expr_prime and isinstance(expr_prime, dict) and "op" in expr_prime:
-                # Há operação: term op term'
-                return f"({term_value} {expr_prime['op']} {expr_prime['right']})"
-            else:
-                return term_value
-        
-        # EXPR' -> OP TERM EXPR'
-        elif production_lhs == "EXPR'" and len(production_rhs) == 3:
-            # Extrai o operador corretamente (pode ser Token ou string)
-            op_attr = attributes[0]
-            if hasattr(op_attr, 'lexeme'):
-                op = op_attr.lexeme  # É um Token
-            elif isinstance(op_attr, str):
-                op = op_attr  # Já é string
-            else:
-                op = str(op_attr)
-            
-            term = attributes[1]
-            expr_prime = attributes[2]
-            
-            if expr_prime and isinstance(expr_prime, dict) and "op" in expr_prime:
-                return {"op": op, "right": f"({term} {expr_prime['op']} {expr_prime['right']})"}
-            else:
-                return {"op": op, "right": term}
-        
-        # EXPR' -> epsilon
-        elif production_lhs == "EXPR'" and production_rhs == ["epsilon"]:
-            return None
-        
-        # OP -> operadores
-        elif production_lhs == "OP":
-            if attributes and len(attributes) > 0:
-                op_token = attributes[0]
-                # Retorna o lexeme do token (o operador em si)
-                if hasattr(op_token, 'lexeme'):
-                    return op_token.lexeme
-                return op_token
-            return production_rhs[0]
-        
-        # TERM -> FACTOR
-        elif production_lhs == "TERM" and len(production_rhs) == 1:
-            return attributes[0]
-        
-        # TERM -> UNARY
-        elif production_lhs == "TERM" and production_rhs == ["UNARY"]:
-            return attributes[0]
-        
-        # UNARY -> NUST TERM
-        elif production_lhs == "UNARY" and len(production_rhs) == 2:
-            term_value = attributes[1]
-            return f"(NOT {term_value})"
-        
-        # Padrão: retorna primeiro atributo ou None
-        return attributes[0] if attributes else None
+        return Return(expr_value, a[b].line)
+    
+    @semantic("CMD -> LHS := EXPR")
+    def _action_assignment(self, a, b):
+        target = a[b]            # Target do LHS
+        expr_value = a[b + 2]    # Valor da expressão
+        var_name = target.name
+        var_line = target.line
+        
+        if self.tracer is not None:
+            self.tracer.semantic("Atribuindo '{}' = {} (linha {})", var_name, expr_value, var_line)
+        
+        # Verifica se a variável foi declarada
+        symbol = self.symbol_table.lookup(var_name, line=var_line)
+        if symbol:
+            self.symbol_table.update_value(symbol, expr_value)  # Atualiza o valor
+        
+        return Assignment(var_name, expr_value, var_line)
+    
+    @semantic("CMD -> KEL id CMD")
+    def _action_module(self, a, b):
+        module_token = a[b + 1]
+        
+        if self.tracer is not None:
+            self.tracer.semantic("Definindo módulo '{}' (linha {})",
+                                 module_token.lexeme, module_token.line)
+        
+        # Nota: enter_scope/exit_scope devem ser chamados durante o parsing
+        # Aqui apenas registramos o módulo
+        self.symbol_table.declare(
+            module_token.lexeme,
+            symbol_type="module",
+            line=module_token.line
+        )
+        
+        return Module(module_token.lexeme, a[b + 2], module_token.line)
+    
+    @semantic("CMD -> FUS id := EXPR")
+    def _action_declaration(self, a, b):
+        var_token = a[b + 1]  # Token do 'id'
+        expr_value = a[b + 3]  # Valor da expressão
+        
+        if self.tracer is not None:
+            self.tracer.semantic("Declarando '{}' = {} (linha {})",
+                                 var_token.lexeme, expr_value, var_token.line)
+        
+        # Declara na tabela de símbolos
+        self.symbol_table.declare(
+            var_token.lexeme,
+            symbol_type="variable",
+            line=var_token.line,
+            value=expr_value
+        )
+        
+        return Declaration(var_token.lexeme, expr_value, var_token.line)
+    
+    @semantic("IO -> HON", "IO -> print",
+              "OP -> +", "OP -> -", "OP -> ANRK", "OP -> AAN", "OP -> KO")
+    def _action_keyword(self, a, b):
+        # Retorna o lexeme do token (o operador / comando em si)
+        return a[b].lexeme
+    
+    @semantic("LHS -> assign id")
+    def _action_lhs_name(self, a, b):
+        id_token = a[b + 1]
+        return Target(id_token.lexeme, id_token.line)
+    
+    @semantic("LHS -> HIM . id")
+    def _action_lhs_member(self, a, b):
+        id_token = a[b + 2]
+        return Target(f"HIM.{id_token.lexeme}", id_token.line, scoped=True)
+    
+    @semantic("EXPR -> TERM EXPR'")
+    def _action_expr(self, a, b):
+        term_value = a[b]
+        expr_prime = a[b + 1]
+        
+        if expr_prime is None:
+            return term_value
+        # Há operação: term op term'
+        return BinOp(expr_prime.op, term_value, expr_prime.right, term_value.line)
+    
+    @semantic("EXPR' -> OP TERM EXPR'")
+    def _action_expr_tail(self, a, b):
+        op = a[b]
+        term = a[b + 1]
+        expr_prime = a[b + 2]
+        
+        if expr_prime is None:
+            return ExprTail(op, term)
+        # Um único nó por redução: a cauda já construída é reaproveitada
+        # (o registro ExprTail de baixo é reciclado em vez de alocar outro)
+        expr_prime.right = BinOp(expr_prime.op, term, expr_prime.right, term.line)
+        expr_prime.op = op
+        return expr_prime
+    
+    @semantic("EXPR' -> ε")
+    def _action_empty_tail(self, a, b):
+        return None
+    
+    @semantic("UNARY -> NUST TERM")
+    def _action_not(self, a, b):
+        return Not(a[b + 1], a[b].line)
+    
+    @semantic("FACTOR -> id")
+    def _action_variable(self, a, b):
+        id_token = a[b]
+        
+        # Busca na tabela de símbolos (marca uso / registra erro)
+        self.symbol_table.lookup(id_token.lexeme, line=id_token.line)
+        
+        return Var(id_token.lexeme, id_token.line)
+    
+    @semantic("FACTOR -> num")
+    def _action_number(self, a, b):
+        num_token = a[b]
+        value = num_token.value if num_token.value is not None else num_token.lexeme
+        return Num(value, num_token.line)
+    
+    @semantic("FACTOR -> HIM . id")
+    def _action_member(self, a, b):
+        id_token = a[b + 2]
+        return Member(id_token.lexeme, id_token.line)
+    
+    @semantic("FACTOR -> ( EXPR )")
+    def _action_parenthesized(self, a, b):
+        return a[b + 1]
     
     def parse(self, tokens):
         """
         Parsing com análise semântica integrada
         
+        Cada chamada é uma análise nova: o estado da anterior é descartado
+        (reset()), então o mesmo parser pode ser reutilizado.
+        
         Args:
-            tokens: Lista de objetos Token
+            tokens: Iterável de objetos Token (lista, gerador, stream...)
+        
+        Returns:
+            True se aceito sem erros, False caso contrário
         """
         if self.verbose:
             print("=== Analise Sintatica e Semantica SLR(1) ===\n")
         
-        token_index = 0
-        current_token = tokens[token_index] if token_index < len(tokens) else Token("$", "$", 0)
-        step = 1
+        self.reset()
+        try:
+            for token in tokens:
+                self.feed(token)
+                if self.finished:
+                    break
+        except BudgetExceeded as e:
+            # Levantada pelo Lexer que gera os tokens (iter_tokens)
+            self.abort(e)
+        
+        return self.finish()
+    
+    def feed(self, token):
+        """
+        API push: avança o autômato com um token até precisar do próximo
+        
+        Args:
+            token: Próximo Token da entrada (tipo '$' finaliza a análise)
+        
+        Returns:
+            Tupla (statements, diagnostics): comandos de nível superior
+            concluídos e novas mensagens de erro produzidas por este token
+        
+        Raises:
+            RuntimeError: A análise já terminou (aceita, interrompida ou
+                abortada); reset() inicia outra
+        """
+        if self.finished:
+            raise RuntimeError("análise já finalizada; chame reset() para iniciar outra")
+        
+        self.last_line = token.line
+        completed = []
+        errors_before = len(self.errors)
+        semantic_before = len(self.symbol_table.errors)
         
         try:
-            while True:
-                state = self.stack[-1]
-                lookahead = current_token.type
-                
-                if self.verbose:
-                    print(f"Passo {step}: Stack={self.stack}, Estado={state}, Token={current_token}")
+            budget = self.budget
+            if budget is not None:
+                self.fed += 1
+                if self.fed >= self.next_check:
+                    self.next_check = budget.charge(self.fed, token.line, len(self.stack))
+            self._advance(token, completed)
+        except BudgetExceeded as e:
+            self.abort(e)
+        except Exception as e:
+            self.errors.append(f"ERRO FATAL: {str(e)}")
+            self.finished = True
+        
+        parser_errors_end = len(self.errors)
+        if self.accepted:
+            # Na aceitação os erros semânticos são copiados para self.errors
+            parser_errors_end -= len(self.symbol_table.errors)
+        diagnostics = self.errors[errors_before:parser_errors_end]
+        diagnostics += self.symbol_table.errors[semantic_before:]
+        return completed, diagnostics
+    
+    def abort(self, error):
+        """Interrompe a análise registrando um BudgetExceeded (governor.py)"""
+        if error.line is None:
+            error.line = self.last_line
+        self.errors.append(str(error))
+        self.finished = True
+    
+    def finish(self):
+        """
+        Finaliza a análise (equivale a alimentar '$' se ainda não foi visto)
+        
+        Returns:
+            True se aceito sem erros, False caso contrário
+        """
+        if not self.finished:
+            self.feed(Token("$", "$", self.last_line))
+        return self.accepted and not self.has_errors()
+    
+    def _advance(self, current_token, completed):
+        """Executa SHIFT/REDUCE/GOTO para um lookahead até consumi-lo"""
+        lookahead = current_token.type
+        trace = self.tracer
+        
+        # Modo pânico: descarta tokens até um que o parser consiga deslocar
+        if self.recovering and not self._synchronize(current_token, completed):
+            return
+        
+        while True:
+            state = self.stack[-1]
+            
+            # IncrementalCompiler: o '$' termina no último comando de nível
+            # superior, tenha ele vindo de uma redução ou da recuperação de
+            # erro (comando Invalid), sem finalizar a semântica
+            if state == STATEMENT_STATE and lookahead == "$" and self.defer_program:
+                self.accepted = True
+                self.finished = True
+                return
+            
+            # Aceitação
+            if state == 1 and lookahead == "$":
+                if trace is not None:
+                    trace.record(self.step, state, TRACE_ACCEPT, current_token)
                 
-                # Aceitação
-                if state == 1 and lookahead == "$":
-                    if self.verbose:
-                        print("\n[OK] ANALISE SINTATICA ACEITA!\n")
-                    
-                    # Finaliza análise semântica
-                    self.symbol_table.check_unused_symbols()
-                    self.warnings.extend(self.symbol_table.warnings)
-                    self.errors.extend(self.symbol_table.errors)
-                    
-                    return not self.has_errors()
+                # AST completa do programa
+                self.ast = self.attributes[self.attr_top - 1] if self.attr_top else None
                 
-                # SHIFT
-                if (state, lookahead) in self.transitions:
-                    next_state = self.transitions[(state, lookahead)]
-                    if self.verbose:
-                        print(f"  SHIFT -> {next_state}\n")
-                    
-                    self.stack.append(next_state)
-                    self.symbols.append(lookahead)
-                    self.attributes.append(current_token)  # Atributo é o token
-                    
-                    token_index += 1
-                    current_token = tokens[token_index] if token_index < len(tokens) else Token("$", "$", 0)
-                    step += 1
-                    continue
+                # Finaliza análise semântica
+                self.symbol_table.check_unused_symbols()
+                self.warnings.extend(self.symbol_table.warnings)
+                self.errors.extend(self.symbol_table.errors)
                 
-                # Epsilon transition
-                if (state, "epsilon") in self.transitions:
-                    next_state = self.transitions[(state, "epsilon")]
-                    if next_state == 38:
-                        if (state, "EXPR'") in self.transitions:
-                            expr_state = self.transitions[(state, "EXPR'")]
-                            if self.verbose:
-                                print(f"  REDUCE EXPR' -> epsilon, GOTO({state}, EXPR') = {expr_state}\n")
-                            self.stack.append(expr_state)
-                            self.symbols.append("EXPR'")
-                            self.attributes.append(None)  # EXPR' -> epsilon não tem valor
-                            step += 1
-                            continue
+                self.accepted = True
+                self.finished = True
+                return
+            
+            # SHIFT
+            if (state, lookahead) in self.transitions:
+                next_state = self.transitions[(state, lookahead)]
+                if trace is not None:
+                    trace.record(self.step, state, next_state, current_token)
                 
-                # GOTO para não-terminais com epsilon
-                found_goto = False
-                for nt in self.nonterminals:
-                    if (state, nt) in self.transitions and nt == "EXPR'" and lookahead in self.follow.get("EXPR'", set()):
-                        next_state = self.transitions[(state, nt)]
-                        if self.verbose:
-                            print(f"  REDUCE EXPR' -> epsilon, GOTO({state}, {nt}) = {next_state}\n")
-                        self.stack.append(next_state)
-                        self.symbols.append(nt)
-                        self.attributes.append(None)
-                        step += 1
-                        found_goto = True
-                        break
+                self.stack.append(next_state)
+                self.symbols.append(lookahead)
+                # Atributo é o token
+                top = self.attr_top
+                if top == len(self.attributes):
+                    self._grow_attributes()
+                self.attributes[top] = current_token
+                self.attr_top = top + 1
                 
-                if found_goto:
-                    continue
+                self.step += 1
+                return
+            
+            # Epsilon transition
+            if (state, "epsilon") in self.transitions:
+                next_state = self.transitions[(state, "epsilon")]
+                if next_state == 38:
+                    if (state, "EXPR'") in self.transitions:
+                        expr_state = self.transitions[(state, "EXPR'")]
+                        if trace is not None:
+                            trace.record(self.step, state, ~EMPTY_TAIL, current_token)
+                        self.stack.append(expr_state)
+                        self.symbols.append("EXPR'")
+                        self._push_attribute(self.actions[EMPTY_TAIL](self, self.attributes, self.attr_top))
+                        self.step += 1
+                        continue
+            
+            # GOTO para não-terminais com epsilon
+            found_goto = False
+            for nt in self.nonterminals:
+                if (state, nt) in self.transitions and nt == "EXPR'" and lookahead in self.follow.get("EXPR'", set()):
+                    next_state = self.transitions[(state, nt)]
+                    if trace is not None:
+                        trace.record(self.step, state, ~EMPTY_TAIL, current_token)
+                    self.stack.append(next_state)
+                    self.symbols.append(nt)
+                    self._push_attribute(self.actions[EMPTY_TAIL](self, self.attributes, self.attr_top))
+                    self.step += 1
+                    found_goto = True
+                    break
+            
+            if found_goto:
+                continue
+            
+            # REDUCE
+            if state in self.production_numbers:
+                production = self.production_numbers[state]
+                lhs, rhs = productions[production]
                 
-                # REDUCE
-                if state in self.productions:
-                    lhs, rhs = self.productions[state]
+                if lookahead in self.follow.get(lhs, set()) or lookahead == "$":
+                    if trace is not None:
+                        trace.record(self.step, state, ~production, current_token)
                     
-                    if lookahead in self.follow.get(lhs, set()) or lookahead == "$":
-                        if self.verbose:
-                            print(f"  REDUCE {lhs} -> {' '.join(rhs)}")
-                        
-                        # Coleta atributos dos símbolos da produção
-                        prod_attributes = []
-                        if rhs != ["epsilon"]:
-                            prod_attributes = self.attributes[-len(rhs):] if len(rhs) > 0 else []
-                        
-                        # Ação semântica
-                        try:
-                            synthesized_attr = self.semantic_action(lhs, rhs, prod_attributes)
-                        except Exception as e:
-                            self.errors.append(f"Erro em ação semântica: {e}")
-                            synthesized_attr = None
+                    # Base dos atributos do lado direito (lidos por índice)
+                    base = self.attr_top - len(rhs)
+                    
+                    # Ação semântica: uma chamada indexada pelo número da produção
+                    try:
+                        synthesized_attr = self.actions[production](self, self.attributes, base)
+                    except BudgetExceeded:
+                        raise
+                    except Exception as e:
+                        self.errors.append(f"Erro em ação semântica: {e}")
+                        synthesized_attr = None
+                    
+                    # Remove símbolos da pilha
+                    if rhs:
+                        del self.stack[-len(rhs):]
+                        del self.symbols[-len(rhs):]
+                        # Libera as posições consumidas (o slot 'base' é reescrito no GOTO)
+                        attributes = self.attributes
+                        for slot in range(base + 1, self.attr_top):
+                            attributes[slot] = None
+                    elif base == len(self.attributes):
+                        self._grow_attributes()
+                    
+                    state_after = self.stack[-1] if self.stack else 0
+                    
+                    # GOTO
+                    if (state_after, lhs) in self.transitions:
+                        goto_state = self.transitions[(state_after, lhs)]
                         
-                        # Remove símbolos da pilha
-                        if rhs != ["epsilon"]:
-                            for _ in range(len(rhs)):
-                                if self.stack:
-                                    self.stack.pop()
-                                if self.symbols:
-                                    self.symbols.pop()
-                                if self.attributes:
-                                    self.attributes.pop()
+                        self.stack.append(goto_state)
+                        self.symbols.append(lhs)
+                        # O atributo sintetizado ocupa o slot 'base' (já alocado)
+                        self.attributes[base] = synthesized_attr
+                        self.attr_top = base + 1
                         
-                        state_after = self.stack[-1] if self.stack else 0
+                        # CMD de nível superior concluído (antes de ';' ou '$')
+                        if goto_state == STATEMENT_STATE and lhs == "CMD":
+                            completed.append(synthesized_attr)
                         
-                        # GOTO
-                        if (state_after, lhs) in self.transitions:
-                            goto_state = self.transitions[(state_after, lhs)]
-                            if self.verbose:
-                                print(f"  GOTO({state_after}, {lhs}) = {goto_state}\n")
-                            
-                            self.stack.append(goto_state)
-                            self.symbols.append(lhs)
-                            self.attributes.append(synthesized_attr)
-                            
-                            step += 1
-                            continue
-                        else:
-                            error_msg = f"GOTO({state_after}, {lhs}) não encontrado"
-                            self.errors.append(f"ERRO SINTATICO (Linha {current_token.line}): {error_msg}")
-                            return False
+                        self.step += 1
+                        continue
+                    else:
+                        error_msg = f"GOTO({state_after}, {lhs}) não encontrado"
+                        self.errors.append(f"{SYNTAX_ERROR} (Linha {current_token.line}): {error_msg}")
+                        self.finished = True
+                        return
+            
+            # Erro sintatico: registra e tenta se recuperar
+            if not self._recover(current_token, completed):
+                return
+    
+    def _can_shift(self, *lookaheads):
+        """
+        Simula só a pilha de estados: os lookaheads seriam deslocados em
+        sequência, sem erro? (não altera a pilha real)
+        """
+        table, gotos = self.grammar.action_table, self.grammar.goto_table
+        stack = self.stack
+        depth = len(stack)            # Parte da pilha real ainda não desempilhada
+        pushed = []                   # Estados empilhados pela simulação
+        
+        for lookahead in lookaheads:
+            while True:
+                state = pushed[-1] if pushed else stack[depth - 1]
+                action = table[state].get(lookahead)
+                if action is None:
+                    return False
+                if action >= 0:
+                    pushed.append(action)
+                    break
+                if action == ACCEPT:
+                    return True
                 
-                # Erro sintatico
-                error_msg = f"Token inesperado '{current_token.lexeme}' (tipo: {lookahead})"
-                self.errors.append(f"ERRO SINTATICO (Linha {current_token.line}): {error_msg}")
-                return False
+                production = ~action
+                size = len(productions[production][1])
+                taken = min(size, len(pushed))
+                del pushed[len(pushed) - taken:]
+                depth -= size - taken
+                below = pushed[-1] if pushed else stack[depth - 1]
+                target = gotos[below].get(production)
+                if target is None:
+                    return False
+                pushed.append(target)
         
-        except Exception as e:
-            self.errors.append(f"ERRO FATAL: {str(e)}")
+        return True
+    
+    def _report_syntax_error(self, token, state):
+        """Registra um erro sintático com os tokens esperados no estado"""
+        if self.syntax_errors >= self.max_errors:
+            self.errors.append(
+                f"{SYNTAX_ERROR}: limite de {self.max_errors} erros atingido, análise interrompida"
+            )
+            self.finished = True
+            return
+        
+        # Candidatos pré-calculados do estado, confirmados na pilha atual
+        # (o SLR reduz por FOLLOW e aceita '$' em qualquer redução)
+        expected = ", ".join(
+            f"'{symbol}'" for symbol in self.grammar.expected.get(state, ())
+            if self._can_shift(symbol)
+        )
+        self.errors.append(
+            f"{SYNTAX_ERROR} (Linha {token.line}): Token inesperado '{token.lexeme}' "
+            f"(tipo: {token.type}); esperado: {expected}"
+        )
+        self.syntax_errors += 1
+        if self.tracer is not None:
+            self.tracer.record(self.step, state, TRACE_ERROR, token)
+    
+    def _recover(self, token, completed):
+        """
+        Recuperação de erro sintático
+        
+        1. Se o token inicia um comando e falta só o ';' antes dele, insere
+           um ';' virtual e segue (o comando anterior é preservado)
+        2. Senão, modo pânico: desempilha até um estado com GOTO em CMD,
+           empilha um comando Invalid e descarta tokens até sincronizar
+        
+        Returns:
+            True para continuar processando o token atual, False se ele foi
+            descartado (ou a análise foi interrompida)
+        """
+        self._report_syntax_error(token, self.stack[-1])
+        if self.finished:
+            return False
+        
+        if token.type in COMMAND_START and self._can_shift(";", token.type):
+            if self.tracer is not None:
+                self.tracer.record(self.step, self.stack[-1], RECOVER_INSERT, token)
+            self._advance(Token(";", ";", token.line, token.column), completed)
+            return True
+        
+        self._unwind(len(self.stack) - 1, token, completed)
+        self.recovering = True
+        return self._synchronize(token, completed)
+    
+    def _unwind(self, depth, token, completed):
+        """
+        Desempilha até o estado mais alto (a partir de stack[depth]) com GOTO
+        em CMD e empilha um comando Invalid no lugar do que foi descartado
+        
+        Returns:
+            False se não há estado abaixo de 'depth' que aceite um comando
+        """
+        stack = self.stack
+        while depth >= 0 and (stack[depth], "CMD") not in self.transitions:
+            depth -= 1
+        if depth < 0:
             return False
+        
+        del stack[depth + 1:]
+        del self.symbols[depth:]
+        attributes = self.attributes
+        for slot in range(depth, self.attr_top):
+            attributes[slot] = None
+        self.attr_top = depth
+        
+        goto_state = self.transitions[(stack[depth], "CMD")]
+        if self.tracer is not None:
+            self.tracer.record(self.step, goto_state, RECOVER_UNWIND, token)
+        
+        error_command = Invalid(token.line)
+        stack.append(goto_state)
+        self.symbols.append("CMD")
+        self._push_attribute(error_command)
+        if goto_state == STATEMENT_STATE:
+            completed.append(error_command)
+        return True
+    
+    def _synchronize(self, token, completed):
+        """
+        Modo pânico: decide se o token retoma a análise ou é descartado
+        
+        Retoma quando o token pode ser deslocado (';', 'FAH', '$'... ) ou
+        quando inicia um comando e um ';' virtual o torna válido. ';' e '$'
+        que não cabem no comando aninhado atual (ex.: corpo de FOD sem FAH)
+        descartam também os comandos que o envolvem.
+        
+        Returns:
+            True se a análise retoma com este token, False se foi descartado
+        """
+        lookahead = token.type
+        
+        while True:
+            if self._can_shift(lookahead):
+                self.recovering = False
+                return True
+            
+            if lookahead in COMMAND_START and self._can_shift(";", lookahead):
+                self.recovering = False
+                if self.tracer is not None:
+                    self.tracer.record(self.step, self.stack[-1], RECOVER_INSERT, token)
+                self._advance(Token(";", ";", token.line, token.column), completed)
+                return True
+            
+            # O topo é o comando Invalid (GOTO de stack[-2]): procura abaixo
+            if lookahead not in (";", "$") or not self._unwind(len(self.stack) - 3, token, completed):
+                break
+        
+        if lookahead == "$":
+            # Fim da entrada sem ponto de sincronização (ex.: FOD sem FAH)
+            self.finished = True
+        elif self.tracer is not None:
+            self.tracer.record(self.step, self.stack[-1], RECOVER_DISCARD, token)
+        return False
+    
+    def validate(self, tokens):
+        """Validação apenas sintática (ver CompiledGrammar.validate)"""
+        return self.grammar.validate(tokens)
+    
+    def checkpoint(self):
+        """
+        Registra o estado atual; válido logo após um ';' de nível superior,
+        quando a pilha é [0] + [STATEMENT_STATE, SEQUENCE_STATE] * k
+        
+        A tabela de símbolos precisa ter sido criada com journal=True.
+        """
+        return ParserCheckpoint(
+            (len(self.stack) - 1) // 2, len(self.errors),
+            len(self.warnings), self.symbol_table.checkpoint()
+        )
+    
+    def restore(self, checkpoint, statements):
+        """
+        Volta ao estado de um checkpoint
+        
+        Args:
+            checkpoint: ParserCheckpoint obtido com checkpoint()
+            statements: Comandos de nível superior (ao menos checkpoint.statements)
+        
+        Returns:
+            Operações desfeitas na tabela de símbolos (ver SymbolTable.replay)
+        """
+        k = checkpoint.statements
+        self.stack = [0] + [STATEMENT_STATE, SEQUENCE_STATE] * k
+        self.symbols = ["CMD", ";"] * k
+        
+        capacity = ATTRIBUTE_CAPACITY
+        while capacity <= 2 * k:
+            capacity *= 2
+        self.attributes = [None] * capacity
+        # Os ';' não são lidos pelas ações semânticas: um token serve para todos
+        self.attributes[0:2 * k:2] = statements[:k]
+        self.attributes[1:2 * k:2] = [Token(";", ";", 0)] * k
+        self.attr_top = 2 * k
+        
+        del self.errors[checkpoint.errors:]
+        del self.warnings[checkpoint.warnings:]
+        self.syntax_errors = sum(1 for error in self.errors
+                                 if isinstance(error, str) and error.startswith(SYNTAX_ERROR))
+        self.recovering = False
+        self.ast = None
+        self.accepted = False
+        self.finished = False
+        return self.symbol_table.rollback(checkpoint.symbols)
+    
+    def _push_attribute(self, value):
+        """Empilha um atributo na pilha pré-alocada"""
+        top = self.attr_top
+        if top == len(self.attributes):
+            self._grow_attributes()
+        self.attributes[top] = value
+        self.attr_top = top + 1
+    
+    def _grow_attributes(self):
+        """Dobra a capacidade da pilha de atributos"""
+        self.attributes.extend([None] * len(self.attributes))
     
     def has_errors(self):
         """Verifica se há erros"""
         return len(self.errors) > 0 or self.symbol_table.has_errors()
     
+    def result(self, lexical_errors=()):
+        """CompileResult (result.py) do estado atual da análise"""
+        return CompileResult.from_parser(self, self.accepted and not self.has_errors(),
+                                         lexical_errors)
+    
     def print_report(self):
-        """Imprime relatório completo de erros e avisos"""
-        print("\n" + "="*70)
-        print("RELATORIO DE ANALISE")
-        print("="*70)
-        
-        if self.errors or self.symbol_table.errors:
-            print("\n[X] ERROS ENCONTRADOS:")
-            for error in self.errors:
-                print(f"  - {error}")
-            for error in self.symbol_table.errors:
-                print(f"  - {error}")
-        else:
-            print("\n[OK] Nenhum erro encontrado")
-        
-        if self.warnings or self.symbol_table.warnings:
-            print("\n[!] AVISOS:")
-            for warning in self.warnings:
-                print(f"  - {warning}")
-            for warning in self.symbol_table.warnings:
-                print(f"  - {warning}")
-        
-        print("\n" + "="*70)
-        print("TABELA DE SIMBOLOS")
-        print("="*70)
-        self.symbol_table.print_table()
-        print("="*70 + "\n")
+        """Imprime relatório completo de erros e avisos (TextRenderer)"""
+        TextRenderer().report(self.result())
     
     def reset(self):
         """Reinicia o parser"""
         self.stack = [0]
         self.symbols = []
-        self.attributes = []
-        self.symbol_table = SymbolTable()
+        self.attributes = [None] * ATTRIBUTE_CAPACITY
+        self.attr_top = 0
+        self.fed = 0
+        self.next_check = 0
+        self.symbol_table = SymbolTable(max_diagnostics=self.max_diagnostics, budget=self.budget)
+        if self.stats is not None:
+            self.stats.instrument_table(self.symbol_table)
+        if self.profiler is not None:
+            self.profiler.instrument_table(self.symbol_table)
+        if self.memory is not None:
+            self.memory.instrument_table(self.symbol_table)
         self.errors = []
         self.warnings = []
+        self.ast = None
+        self.step = 1
+        self.last_line = 0
+        self.accepted = False
+        self.finished = False
+        self.syntax_errors = 0
+        self.recovering = False
+
+
+# Gramática compilada compartilhada por todos os parsers do processo
+GRAMMAR = CompiledGrammar()
 
 
 # ============================================================================
@@ -0,0 +1,33 @@
+# Produções numeradas na mesma ordem de sistema.txt (ε = lado direito vazio)
+productions = [
+    ("S'", ("S",)),                             # 0
+    ("S", ("CMD", ";", "S")),                   # 1
+    ("S", ("CMD",)),                            # 2
+    ("CMD", ("LOS", "EXPR", "CMD")),            # 3
+    ("CMD", ("FOD", "CMD", "FAH", "EXPR")),     # 4
+    ("CMD", ("FAH", "CMD", "FAH", "EXPR")),     # 5
+    ("CMD", ("IO", "id")),                      # 6
+    ("CMD", ("JUN", "EXPR")),                   # 7
+    ("CMD", ("LHS", ":=", "EXPR")),             # 8
+    ("CMD", ("KEL", "id", "CMD")),              # 9
+    ("CMD", ("FUS", "id", ":=", "EXPR")),       # 10
+    ("IO", ("HON",)),                           # 11
+    ("IO", ("print",)),                         # 12
+    ("LHS", ("assign", "id")),                  # 13
+    ("LHS", ("HIM", ".", "id")),                # 14
+    ("EXPR", ("TERM", "EXPR'")),                # 15
+    ("EXPR'", ("OP", "TERM", "EXPR'")),         # 16
+    ("EXPR'", ()),                              # 17
+    ("OP", ("+",)),                             # 18
+    ("OP", ("-",)),                             # 19
+    ("OP", ("ANRK",)),                          # 20
+    ("OP", ("AAN",)),                           # 21
+    ("OP", ("KO",)),                            # 22
+    ("TERM", ("UNARY",)),                       # 23
+    ("TERM", ("FACTOR",)),                      # 24
+    ("UNARY", ("NUST", "TERM")),                # 25
+    ("FACTOR", ("id",)),                        # 26
+    ("FACTOR", ("num",)),                       # 27
+    ("FACTOR", ("HIM", ".", "id")),             # 28
+    ("FACTOR", ("(", "EXPR", ")")),             # 29
+]
@@ -0,0 +1,284 @@
+"""
+Perfil por Produção e por Ação Semântica
+
+Onde vai o tempo das fases sintática/semântica medidas em stats.py:
+ProductionProfiler conta as reduções de cada produção, mede o tempo do
+handler semântico de cada uma e o de cada operação da SymbolTable
+(lookup, declare, update_value, enter_scope, exit_scope,
+check_unused_symbols), separando o tempo da tabela chamado de dentro de
+cada handler.
+
+Saídas:
+    report()          hot spots ordenados por tempo: produções, handlers
+                      (funções que atendem várias produções somadas) e
+                      operações da tabela de símbolos
+    write_collapsed() pilhas no formato "collapsed" (uma pilha por linha,
+                      frames separados por ';', tempo em µs), lido por
+                      flamegraph.pl, speedscope e inferno:
+                          parse;FACTOR -> id;SymbolTable.lookup 1830
+                      o ';' dentro de produções vira '；' (U+FF1B)
+
+Como em stats.py, só o parser criado com profiler=... é afetado: ele usa
+uma cópia dos handlers envolvida por medição e a sua SymbolTable recebe
+versões medidas dos métodos (atributos da instância).
+
+Uso:
+    profile = ProductionProfiler()
+    parser = GRAMMAR.parser(profiler=profile)
+    profile.parse(parser, tokens)
+    print(profile.report(top=15))
+    profile.write_collapsed("fantasy.folded")   # flamegraph.pl fantasy.folded > fg.svg
+
+    python profiler.py exemplos/*.fan --repeat 5 --collapsed fantasy.folded
+"""
+
+import argparse
+import sys
+import time
+
+from producoes import productions
+
+TABLE_OPERATIONS = ("lookup", "declare", "update_value", "enter_scope", "exit_scope",
+                    "check_unused_symbols")
+ROOT = "parse"
+FRAME_SEPARATOR = ";"
+
+
+def production_name(number):
+    """Número da produção -> 'LHS -> X Y Z'"""
+    lhs, rhs = productions[number]
+    return f"{lhs} -> {' '.join(rhs) or 'ε'}"
+
+
+def _frame(name):
+    """Nome seguro para um frame do formato collapsed"""
+    return name.replace(FRAME_SEPARATOR, "；")
+
+
+class ProductionProfiler:
+    """Reduções e tempo por produção, por handler e por operação da tabela"""
+    __slots__ = ("reductions", "handler_time", "handler_names", "table_calls",
+                 "table_time", "nested", "parse_time", "parses", "active")
+
+    def __init__(self):
+        size = len(productions)
+        self.reductions = [0] * size          # Reduções por produção
+        self.handler_time = [0.0] * size      # Segundos no handler (inclui a tabela)
+        self.handler_names = [None] * size    # Função que atende cada produção
+        self.table_calls = dict.fromkeys(TABLE_OPERATIONS, 0)
+        self.table_time = dict.fromkeys(TABLE_OPERATIONS, 0.0)
+        self.nested = {}                      # (produção ou None, operação) -> [chamadas, segundos]
+        self.parse_time = 0.0                 # Segundos em parser.parse (tudo)
+        self.parses = 0
+        self.active = None                    # Produção cujo handler está executando
+
+    # --- Medição ------------------------------------------------------------
+
+    def parse(self, parser, tokens):
+        """parser.parse(tokens) medindo o total (o parser precisa de profiler=self)"""
+        start = time.perf_counter()
+        result = parser.parse(tokens)
+        self.parse_time += time.perf_counter() - start
+        self.parses += 1
+        return result
+
+    def instrument(self, parser):
+        """Troca os handlers do parser (só desta instância) por versões medidas"""
+        for number, handler in enumerate(parser.grammar.handlers):
+            self.handler_names[number] = handler.__name__
+        parser.actions = tuple(
+            self._measured_handler(number, handler)
+            for number, handler in enumerate(parser.actions)
+        )
+        self.instrument_table(parser.symbol_table)
+
+    def instrument_table(self, table):
+        """Mede as operações da tabela de símbolos, por handler que as chamou"""
+        for operation in TABLE_OPERATIONS:
+            setattr(table, operation, self._measured_operation(operation, getattr(table, operation)))
+
+    def _measured_handler(self, number, handler):
+        profile = self
+        reductions, handler_time = self.reductions, self.handler_time
+        perf_counter = time.perf_counter
+
+        def measured(parser, attributes, base):
+            outer = profile.active
+            profile.active = number
+            start = perf_counter()
+            try:
+                return handler(parser, attributes, base)
+            finally:
+                handler_time[number] += perf_counter() - start
+                reductions[number] += 1
+                profile.active = outer
+        return measured
+
+    def _measured_operation(self, operation, method):
+        profile = self
+        calls, spent, nested = self.table_calls, self.table_time, self.nested
+        perf_counter = time.perf_counter
+
+        def measured(*args, **kwargs):
+            start = perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                elapsed = perf_counter() - start
+                calls[operation] += 1
+                spent[operation] += elapsed
+                entry = nested.get((profile.active, operation))
+                if entry is None:
+                    nested[(profile.active, operation)] = [1, elapsed]
+                else:
+                    entry[0] += 1
+                    entry[1] += elapsed
+        return measured
+
+    # --- Agregação e relatórios ---------------------------------------------
+
+    def merge(self, other):
+        """Soma outro ProductionProfiler neste"""
+        for number in range(len(productions)):
+            self.reductions[number] += other.reductions[number]
+            self.handler_time[number] += other.handler_time[number]
+            self.handler_names[number] = self.handler_names[number] or other.handler_names[number]
+        for operation in TABLE_OPERATIONS:
+            self.table_calls[operation] += other.table_calls[operation]
+            self.table_time[operation] += other.table_time[operation]
+        for key, (count, seconds) in other.nested.items():
+            entry = self.nested.setdefault(key, [0, 0.0])
+            entry[0] += count
+            entry[1] += seconds
+        self.parse_time += other.parse_time
+        self.parses += other.parses
+        return self
+
+    def table_time_in(self, number):
+        """Segundos de operações da tabela chamadas pelo handler da produção"""
+        return sum(seconds for (production, _), (_, seconds) in self.nested.items()
+                   if production == number)
+
+    def production_rows(self):
+        """[(nome, reduções, total_s, próprio_s)] ordenado por tempo total"""
+        rows = [
+            (production_name(number), self.reductions[number], self.handler_time[number],
+             self.handler_time[number] - self.table_time_in(number))
+            for number in range(len(productions)) if self.reductions[number]
+        ]
+        return sorted(rows, key=lambda row: row[2], reverse=True)
+
+    def handler_rows(self):
+        """[(função, reduções, total_s)] somando as produções de cada handler"""
+        totals = {}
+        for number, name in enumerate(self.handler_names):
+            if name is None or not self.reductions[number]:
+                continue
+            count, seconds = totals.get(name, (0, 0.0))
+            totals[name] = (count + self.reductions[number], seconds + self.handler_time[number])
+        return sorted(((name, count, seconds) for name, (count, seconds) in totals.items()),
+                      key=lambda row: row[2], reverse=True)
+
+    def operation_rows(self):
+        """[(operação, chamadas, total_s)] ordenado por tempo"""
+        rows = [(operation, self.table_calls[operation], self.table_time[operation])
+                for operation in TABLE_OPERATIONS if self.table_calls[operation]]
+        return sorted(rows, key=lambda row: row[2], reverse=True)
+
+    def report(self, top=20):
+        """Texto com os hot spots (as 'top' linhas mais caras de cada seção)"""
+        total = self.parse_time or sum(self.handler_time) or 1.0
+        semantic = sum(self.handler_time)
+        lines = [f"{self.parses} análise(s): {self.parse_time * 1000:.2f} ms no parser, "
+                 f"{semantic * 1000:.2f} ms em handlers ({semantic / total * 100:.1f}%)"]
+
+        def section(title, header, rows):
+            lines.append("")
+            lines.append(title)
+            lines.append(header)
+            for row in rows[:top]:
+                lines.append(row)
+
+        section("Produções (por tempo no handler)",
+                f"  {'reduções':>9} {'total ms':>9} {'próprio ms':>10} {'µs/red':>7} {'%':>5}  produção",
+                [f"  {count:9d} {seconds * 1000:9.3f} {own * 1000:10.3f} "
+                 f"{seconds / count * 1e6:7.2f} {seconds / total * 100:5.1f}  {name}"
+                 for name, count, seconds, own in self.production_rows()])
+        section("Handlers",
+                f"  {'reduções':>9} {'total ms':>9} {'%':>5}  função",
+                [f"  {count:9d} {seconds * 1000:9.3f} {seconds / total * 100:5.1f}  {name}"
+                 for name, count, seconds in self.handler_rows()])
+        section("SymbolTable",
+                f"  {'chamadas':>9} {'total ms':>9} {'µs/op':>7} {'%':>5}  operação",
+                [f"  {count:9d} {seconds * 1000:9.3f} {seconds / count * 1e6:7.2f} "
+                 f"{seconds / total * 100:5.1f}  {operation}"
+                 for operation, count, seconds in self.operation_rows()])
+        return "\n".join(lines)
+
+    def collapsed(self):
+        """
+        Linhas 'frame;frame;frame µs' (tempo próprio de cada pilha)
+
+        parse (o autômato, fora dos handlers) > produção > operação da
+        tabela; operações fora de handlers (check_unused_symbols na
+        aceitação) ficam direto sob parse.
+        """
+        lines = []
+        outside = 0.0
+        for number in range(len(productions)):
+            if not self.reductions[number]:
+                continue
+            stack = f"{ROOT};{_frame(production_name(number))}"
+            own = self.handler_time[number] - self.table_time_in(number)
+            lines.append((stack, own))
+        for (production, operation), (_, seconds) in self.nested.items():
+            if production is None:
+                lines.append((f"{ROOT};SymbolTable.{operation}", seconds))
+                outside += seconds
+            else:
+                lines.append((f"{ROOT};{_frame(production_name(production))};"
+                              f"SymbolTable.{operation}", seconds))
+        automaton = self.parse_time - sum(self.handler_time) - outside
+        if automaton > 0:
+            lines.append((ROOT, automaton))
+        return [f"{stack} {round(seconds * 1e6)}" for stack, seconds in lines
+                if round(seconds * 1e6) > 0]
+
+    def write_collapsed(self, path):
+        with open(path, "w", encoding="utf-8") as file:
+            for line in self.collapsed():
+                file.write(line + "\n")
+
+    def __repr__(self):
+        return (f"ProductionProfiler({self.parses} análise(s), {sum(self.reductions)} reduções, "
+                f"{self.parse_time * 1000:.1f} ms)")
+
+
+def main(argv=None):
+    from lexer import Lexer
+    from parser_integrated import GRAMMAR
+
+    parser = argparse.ArgumentParser(description="Perfil por produção e ação semântica")
+    parser.add_argument("arquivos", nargs="+")
+    parser.add_argument("--repeat", type=int, default=1, help="compila cada arquivo N vezes")
+    parser.add_argument("--top", type=int, default=20, help="linhas por seção (padrão: 20)")
+    parser.add_argument("--collapsed", metavar="ARQUIVO",
+                        help="grava as pilhas no formato collapsed (flamegraph)")
+    args = parser.parse_args(argv)
+
+    profile = ProductionProfiler()
+    for path in args.arquivos:
+        with open(path, encoding="utf-8") as file:
+            tokens = Lexer(file.read()).tokenize()
+        for _ in range(args.repeat):
+            profile.parse(GRAMMAR.parser(profiler=profile), tokens)
+
+    print(profile.report(args.top))
+    if args.collapsed:
+        profile.write_collapsed(args.collapsed)
+        print(f"\nPilhas gravadas em {args.collapsed}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,381 @@
+"""
+Gerador de Programas Aleatórios Guiado pela Gramática
+
+Lê regrasSintáticas.txt e produz derivações aleatórias válidas por
+construção, para testes de estresse e de escala.
+
+Controles:
+    max_depth          altura máxima da árvore de derivação (aninhamento de
+                       LOS/FOD/FAH/KEL, parênteses e NUST)
+    statements         comandos de nível superior (lista de S)
+    max_tokens         para ao passar de N tokens (fecha o comando atual)
+    max_bytes          para ao passar de N bytes (idem)
+    expression_length  média de 'OP TERM' por expressão (cauda EXPR')
+    identifiers        nomes distintos usados quando não há checagem
+    reuse              chance de um uso repetir um dos nomes recentes
+    declare_before_use todo id usado já foi declarado com FUS, então a
+                       análise semântica passa (sem erros; avisos de
+                       variável não usada podem aparecer)
+
+A derivação usa uma pilha explícita: as regras de lista (S -> CMD ; S,
+EXPR' -> OP TERM EXPR') repetem sem empilhar, e os nomes são contadores
+(v0, v1, ... / m0, m1, ...). A memória não depende do tamanho do programa,
+só de max_depth, então write() grava programas de vários GB em disco.
+
+Escolhas de alternativa: uniformes entre as que cabem na altura restante
+(altura mínima de cada alternativa calculada da gramática); a lista de S
+segue até o limite e EXPR' continua com probabilidade L / (L + 1).
+
+Uso:
+    generator = ProgramGenerator(seed=1, statements=1000)
+    codigo = generator.text()
+
+    python program_generator.py -o grande.fan --size 2G --seed 7
+    python program_generator.py --statements 20 --max-depth 10
+"""
+
+import argparse
+import os
+import random
+import re
+import sys
+
+RULES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "regrasSintáticas.txt")
+EPSILON = "ε"
+
+# Semântica que a gramática não expressa: o id depois destes terminais é
+# declarado (prefixo do nome gerado); depois de '.' é um membro (sem busca)
+DECLARING = {"FUS": "v", "KEL": "m"}
+MEMBER = "."
+IDENTIFIER = "id"
+NUMBER = "num"
+LINE_BREAK = ";"
+
+# Alternativas que nunca passam na checagem semântica: atribuir a HIM.x
+# procura 'HIM.x' na tabela, nome que nenhum FUS declara
+UNCHECKABLE = {("LHS", ("HIM", ".", "id"))}
+
+RECENT = 16                           # Nomes "recentes" para reuse
+CHUNK = 1 << 16                       # Caracteres por escrita em write()
+_COMMIT = object()                    # Marcador: fim de um comando com FUS
+
+
+class Grammar:
+    """Regras de regrasSintáticas.txt: LHS -> [alternativas (tuplas)]"""
+
+    def __init__(self, rules, start):
+        self.rules = rules
+        self.start = start
+        self.nonterminals = frozenset(rules)
+        self.terminals = frozenset(
+            symbol for alternatives in rules.values() for alternative in alternatives
+            for symbol in alternative if symbol not in rules
+        )
+
+    @classmethod
+    def load(cls, path=RULES):
+        """Lê a notação 'A ::= x y | z' (comentários /* */, ε = vazio)"""
+        with open(path, encoding="utf-8") as file:
+            text = re.sub(r"/\*.*?\*/", " ", file.read(), flags=re.DOTALL)
+        rules = {}
+        start = current = None
+        for line in text.splitlines():
+            line = line.strip()
+            if not line:
+                continue
+            if "::=" in line:
+                current, line = (part.strip() for part in line.split("::=", 1))
+                rules.setdefault(current, [])
+                start = start or current
+            elif line.startswith("|"):
+                line = line[1:]
+            elif current is None:
+                raise ValueError(f"linha fora de uma regra: {line!r}")
+            for alternative in line.split("|"):
+                symbols = tuple(s for s in alternative.split() if s != EPSILON)
+                if alternative.strip() or symbols:
+                    rules[current].append(symbols)
+        return cls({lhs: tuple(alternatives) for lhs, alternatives in rules.items()}, start)
+
+
+def _identifier_roles(alternative):
+    """Papel de cada 'id' da alternativa: prefixo de declaração, 'member' ou 'use'"""
+    roles = {}
+    for position, symbol in enumerate(alternative):
+        if symbol != IDENTIFIER:
+            continue
+        previous = alternative[position - 1] if position else None
+        if previous in DECLARING:
+            roles[position] = DECLARING[previous]
+        elif previous == MEMBER:
+            roles[position] = "member"
+        else:
+            roles[position] = "use"
+    return roles
+
+
+class ProgramGenerator:
+    """Derivações aleatórias de uma Grammar, emitidas token a token"""
+
+    def __init__(self, grammar=None, seed=None, max_depth=16, statements=None,
+                 max_tokens=None, max_bytes=None, expression_length=2.0,
+                 identifiers=1000, reuse=0.5, declare_before_use=True):
+        self.grammar = grammar or Grammar.load()
+        self.random = random.Random(seed)
+        self.max_depth = max_depth
+        self.statements = statements
+        self.max_tokens = max_tokens
+        self.max_bytes = max_bytes
+        self.continue_list = expression_length / (expression_length + 1)
+        self.identifiers = identifiers
+        self.reuse = reuse
+        self.declare_before_use = declare_before_use
+
+        rules = self.grammar.rules
+        self.alternatives = {
+            lhs: tuple(alternative for alternative in alternatives
+                       if not (declare_before_use and (lhs, alternative) in UNCHECKABLE))
+            for lhs, alternatives in rules.items()
+        }
+        # Regras de lista: exatamente 'A -> α A | β' (S e EXPR'); outras
+        # auto-referências no fim (CMD -> KEL id CMD) são aninhamento
+        self.lists = frozenset(
+            lhs for lhs, alternatives in self.alternatives.items()
+            if len(alternatives) == 2
+            and sum(1 for alternative in alternatives if alternative and alternative[-1] == lhs) == 1
+        )
+        self.roles = {(lhs, alternative): _identifier_roles(alternative)
+                      for lhs, alternatives in self.alternatives.items()
+                      for alternative in alternatives}
+        # Alturas mínimas sem nenhum nome declarado e com nomes disponíveis
+        self.heights = {False: self._heights(False), True: self._heights(True)}
+        needed = self.heights[not declare_before_use][self.grammar.start]
+        if needed > max_depth:
+            raise ValueError(f"max_depth deve ser >= {needed}")
+        self.expansions = {names: self._expansions(names) for names in (False, True)}
+
+        self.tokens_emitted = 0
+        self.bytes_emitted = 0
+        self.statements_emitted = 0
+        self.declared = 0             # Variáveis v0 .. v{declared-1} já utilizáveis
+        self.pending = 0              # Variáveis nomeadas, declaradas no fim do comando
+        self.modules = 0
+
+    # --- Alturas -------------------------------------------------------------
+
+    def _is_tail(self, lhs, alternative, position):
+        """Auto-referência no fim (regra de lista): repete na mesma altura"""
+        return (lhs in self.lists and position == len(alternative) - 1
+                and alternative[position] == lhs)
+
+    def _viable(self, lhs, alternative, names):
+        roles = self.roles[(lhs, alternative)]
+        return names or not self.declare_before_use or "use" not in roles.values()
+
+    def _alternative_height(self, heights, lhs, alternative):
+        height = 1
+        for position, symbol in enumerate(alternative):
+            if symbol in self.alternatives and not self._is_tail(lhs, alternative, position):
+                height = max(height, 1 + heights[symbol])
+        return height
+
+    def _heights(self, names):
+        """Menor altura de derivação de cada não-terminal (ponto fixo)"""
+        infinity = float("inf")
+        heights = dict.fromkeys(self.alternatives, infinity)
+        changed = True
+        while changed:
+            changed = False
+            for lhs, alternatives in self.alternatives.items():
+                best = min((self._alternative_height(heights, lhs, alternative)
+                            for alternative in alternatives
+                            if self._viable(lhs, alternative, names)), default=infinity)
+                if best < heights[lhs]:
+                    heights[lhs] = best
+                    changed = True
+        return heights
+
+    def _expansions(self, names):
+        """
+        lhs -> (é lista, opções por altura restante): para cada orçamento
+        0..max_depth, as alternativas viáveis que cabem, como (filhos,
+        declara), com os filhos já na ordem de empilhar (símbolo, níveis
+        consumidos, papel). Em regras de lista, a recursiva vem primeiro.
+        """
+        heights = self.heights[names]
+        table = {}
+        for lhs, alternatives in self.alternatives.items():
+            options = []
+            for alternative in alternatives:
+                if not self._viable(lhs, alternative, names):
+                    continue
+                roles = self.roles[(lhs, alternative)]
+                children = tuple(
+                    (alternative[position],
+                     0 if self._is_tail(lhs, alternative, position) else 1,
+                     roles.get(position))
+                    for position in range(len(alternative) - 1, -1, -1)
+                )
+                recursive = lhs in self.lists and bool(alternative) and alternative[-1] == lhs
+                options.append((not recursive, self._alternative_height(heights, lhs, alternative),
+                                children, "v" in roles.values()))
+            options.sort(key=lambda option: option[0])
+            by_budget = tuple(
+                tuple((children, declares) for _, height, children, declares in options
+                      if height <= budget)
+                for budget in range(self.max_depth + 1)
+            )
+            table[lhs] = (lhs in self.lists and len(options) == 2, by_budget)
+        return table
+
+    # --- Geração --------------------------------------------------------------
+
+    def _stopped(self):
+        return ((self.statements is not None and self.statements_emitted >= self.statements)
+                or (self.max_tokens is not None and self.tokens_emitted >= self.max_tokens)
+                or (self.max_bytes is not None and self.bytes_emitted >= self.max_bytes))
+
+    def _name(self, role):
+        """Lexema de um 'id' conforme o papel"""
+        if role == "v":
+            self.pending += 1
+            return f"v{self.declared + self.pending - 1}"
+        if role == "m":
+            self.modules += 1
+            return f"m{self.modules - 1}"
+        pool = self.declared if self.declare_before_use else max(self.declared, self.identifiers)
+        if pool == 0:
+            pool = self.identifiers   # Só membros (HIM . id) antes da 1ª declaração
+        draw = self.random.random
+        if draw() < self.reuse:
+            return f"v{pool - 1 - int(draw() * min(RECENT, pool))}"
+        return f"v{int(draw() * pool)}"
+
+    def tokens(self):
+        """Gera os lexemas do programa, um por vez"""
+        start = self.grammar.start
+        stack = [(start, self.max_depth, None)]
+        draw = self.random.random
+        continue_list = self.continue_list
+        table = self.expansions[self.declared > 0 or not self.declare_before_use]
+        emitted = size = 0
+
+        try:
+            while stack:
+                symbol, budget, role = stack.pop()
+                if symbol is _COMMIT:
+                    self.declared += self.pending
+                    self.pending = 0
+                    table = self.expansions[True]
+                    continue
+
+                expansion = table.get(symbol)
+                if expansion is not None:
+                    is_list, by_budget = expansion
+                    options = by_budget[budget]
+                    if is_list:
+                        # Regra de lista: S segue até o limite; as demais, com continue_list
+                        if symbol == start:
+                            self.statements_emitted += 1
+                            self.tokens_emitted, self.bytes_emitted = emitted, size
+                            keep = not self._stopped()
+                        else:
+                            keep = draw() < continue_list
+                        children, declares = options[0] if keep else options[-1]
+                    elif len(options) == 1:
+                        children, declares = options[0]
+                    else:
+                        children, declares = options[int(draw() * len(options))]
+                    if declares:
+                        stack.append((_COMMIT, 0, None))
+                    for child, depth, child_role in children:
+                        stack.append((child, budget - depth, child_role))
+                    continue
+
+                if symbol == IDENTIFIER:
+                    lexeme = self._name(role)
+                elif symbol == NUMBER:
+                    lexeme = str(int(draw() * 1000))
+                else:
+                    lexeme = symbol
+                emitted += 1
+                size += len(lexeme) + 1
+                yield lexeme
+        finally:
+            self.tokens_emitted, self.bytes_emitted = emitted, size
+
+    def write(self, out):
+        """Grava o programa em 'out' (arquivo texto) em blocos; devolve os bytes"""
+        chunk = []
+        size = 0
+        for lexeme in self.tokens():
+            chunk.append(lexeme)
+            chunk.append("\n" if lexeme == LINE_BREAK else " ")
+            size += len(lexeme) + 1
+            if size >= CHUNK:
+                out.write("".join(chunk))
+                chunk.clear()
+                size = 0
+        out.write("".join(chunk))
+        return self.bytes_emitted
+
+    def text(self):
+        """Programa inteiro como string (para tamanhos que cabem na memória)"""
+        parts = []
+        for lexeme in self.tokens():
+            parts.append(lexeme)
+            parts.append("\n" if lexeme == LINE_BREAK else " ")
+        return "".join(parts)
+
+
+def parse_size(text):
+    """'512K', '2G', '1000' -> bytes"""
+    units = {"K": 1 << 10, "M": 1 << 20, "G": 1 << 30, "T": 1 << 40}
+    text = text.strip().upper().rstrip("B")
+    if text and text[-1] in units:
+        return int(float(text[:-1]) * units[text[-1]])
+    return int(text)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Gera programas Fantasy aleatórios a partir da gramática")
+    parser.add_argument("-o", "--output", metavar="ARQUIVO", help="arquivo de saída (padrão: stdout)")
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--statements", type=int, help="comandos de nível superior")
+    parser.add_argument("--tokens", type=int, help="para depois de N tokens")
+    parser.add_argument("--size", type=parse_size, help="para depois de N bytes (ex.: 500M, 2G)")
+    parser.add_argument("--max-depth", type=int, default=16)
+    parser.add_argument("--expression-length", type=float, default=2.0)
+    parser.add_argument("--identifiers", type=int, default=1000)
+    parser.add_argument("--reuse", type=float, default=0.5)
+    parser.add_argument("--no-declare", action="store_true",
+                        help="usa nomes sem garantir declaração prévia (gera erros semânticos)")
+    parser.add_argument("--grammar", default=RULES, help="arquivo de regras (padrão: regrasSintáticas.txt)")
+    args = parser.parse_args(argv)
+
+    statements = args.statements
+    if statements is None and args.tokens is None and args.size is None:
+        statements = 100
+    try:
+        generator = ProgramGenerator(
+            Grammar.load(args.grammar), seed=args.seed, max_depth=args.max_depth,
+            statements=statements, max_tokens=args.tokens, max_bytes=args.size,
+            expression_length=args.expression_length, identifiers=args.identifiers,
+            reuse=args.reuse, declare_before_use=not args.no_declare,
+        )
+    except ValueError as e:
+        parser.error(str(e))
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            generator.write(file)
+        print(f"{generator.tokens_emitted} tokens, {generator.statements_emitted} comandos, "
+              f"{generator.bytes_emitted} bytes -> {args.output}", file=sys.stderr)
+    else:
+        generator.write(sys.stdout)
+        sys.stdout.write("\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,260 @@
+"""
+Resultado Estruturado da Compilação e Saídas (NDJSON e texto)
+
+CompileResult reúne o que uma compilação produz: sucesso, diagnósticos
+(erros e avisos), tabela de símbolos, AST, tokens (opcional) e o
+CompileStats da compilação (com stats=True). CompiladorCompleto.analyze()
+devolve um CompileResult; imprimir é trabalho de um renderizador opcional.
+
+Saídas:
+    NDJSONWriter   um objeto JSON por linha, escrito assim que cada
+                   resultado chega (lotes longos não esperam o fim; um
+                   consumidor lê linha a linha). Aceita CompileResult,
+                   BatchResult ou dicts.
+    TextRenderer   banners, tabela de tokens e relatório de erros, avisos
+                   e símbolos do main.py; CompiladorCompleto chama um
+                   método por fronteira de fase (start, tokens, parsing,
+                   report, ...). renderer=None não imprime nada.
+
+Uso:
+    compilador = CompiladorCompleto(renderer=None)
+    result = compilador.analyze(codigo, keep_tokens=True)
+    result.success, result.errors, result.symbols()
+
+    with NDJSONWriter(sys.stdout) as writer:
+        for path in caminhos:
+            writer.write(compilador.analyze(ler(path)), name=path)
+"""
+
+import json
+import sys
+
+FORMAT = 1
+_JSON_SCALARS = (str, int, float, bool, type(None))
+
+
+def collect_diagnostics(parser, lexical_errors=()):
+    """
+    (erros, avisos) de um parser que já recebeu o '$'
+
+    Na aceitação o parser já copia os erros/avisos da tabela de símbolos;
+    senão eles ainda estão só na tabela.
+    """
+    table = parser.symbol_table
+    errors = [str(error) for error in lexical_errors]
+    errors += map(str, parser.errors)
+    warnings = [str(warning) for warning in parser.warnings]
+    if not parser.accepted:
+        errors += map(str, table.errors)
+        warnings += map(str, table.warnings)
+    return errors, warnings
+
+
+def _json_value(value):
+    """Valor de um símbolo em JSON (nós da AST viram o texto da expressão)"""
+    return value if isinstance(value, _JSON_SCALARS) else str(value)
+
+
+class CompileResult:
+    """Resultado de uma compilação (sem nada impresso)"""
+    __slots__ = ("name", "success", "errors", "warnings", "symbol_table", "ast", "tokens",
+                 "stats", "cached", "lex_time", "parse_time", "total_time")
+
+    def __init__(self, success, errors, warnings, symbol_table=None, ast=None, tokens=None,
+                 stats=None, cached=False, lex_time=0.0, parse_time=0.0, total_time=0.0,
+                 name=None):
+        self.name = name              # Caminho ou nome dado ao código (opcional)
+        self.success = success
+        self.errors = errors          # Erros léxicos, sintáticos e semânticos (str)
+        self.warnings = warnings
+        self.symbol_table = symbol_table  # SymbolTable ao fim da análise
+        self.ast = ast                # Program (None se a análise não aceitou)
+        self.tokens = tokens          # Lista de Token (só com keep_tokens=True)
+        self.stats = stats            # CompileStats desta compilação (stats=True)
+        self.cached = cached          # Resultado restaurado do cache
+        self.lex_time = lex_time      # Segundos (None = fase não medida à parte)
+        self.parse_time = parse_time
+        self.total_time = total_time
+
+    @classmethod
+    def from_parser(cls, parser, success, lexical_errors=(), **fields):
+        """Resultado de um parser que já recebeu o '$'"""
+        errors, warnings = collect_diagnostics(parser, lexical_errors)
+        return cls(success, errors, warnings, parser.symbol_table, parser.ast, **fields)
+
+    def symbols(self):
+        """Símbolos declarados, escopo a escopo (pré-ordem), como dicts"""
+        if self.symbol_table is None:
+            return []
+        rows = []
+        scopes = [self.symbol_table.global_scope]
+        while scopes:
+            scope = scopes.pop()
+            for symbol in scope.symbols.values():
+                rows.append({"name": symbol.name, "type": symbol.symbol_type,
+                             "scope": scope.name, "line": symbol.line,
+                             "value": _json_value(symbol.value), "used": symbol.used})
+            scopes.extend(reversed(scope.children))
+        return rows
+
+    def timings(self):
+        """
+        Tempos em ms; com léxico e sintático intercalados (compile_incremental)
+        só total_ms, pois lex_ms/parse_ms não foram medidos à parte
+        """
+        timings = {}
+        if self.lex_time is not None:
+            timings["lex_ms"] = self.lex_time * 1000
+        if self.parse_time is not None:
+            timings["parse_ms"] = self.parse_time * 1000
+        timings["total_ms"] = self.total_time * 1000
+        return timings
+
+    def to_dict(self, tokens=True, symbols=True):
+        """Dict para JSON (tokens só se guardados; symbols=False omite a tabela)"""
+        data = {
+            "name": self.name,
+            "success": self.success,
+            "cached": self.cached,
+            "errors": self.errors,
+            "warnings": self.warnings,
+            "timings": self.timings(),
+        }
+        if symbols:
+            data["symbols"] = self.symbols()
+        if tokens and self.tokens is not None:
+            data["tokens"] = [[token.type, token.lexeme, token.line, token.column]
+                              for token in self.tokens]
+        if self.stats is not None:
+            data["stats"] = self.stats.to_dict()
+        return data
+
+    def __repr__(self):
+        status = "OK" if self.success else f"{len(self.errors)} erro(s)"
+        return f"CompileResult({self.name!r}, {status}, {self.total_time * 1000:.1f} ms)"
+
+
+class NDJSONWriter:
+    """Escreve um objeto JSON por linha (NDJSON), com flush a cada 'flush_every'"""
+    __slots__ = ("out", "flush_every", "written", "tokens", "symbols")
+
+    def __init__(self, out=None, flush_every=1, tokens=True, symbols=True):
+        self.out = out or sys.stdout
+        self.flush_every = flush_every    # 0 = só no close()
+        self.written = 0
+        self.tokens = tokens              # Repassados a CompileResult.to_dict
+        self.symbols = symbols
+
+    def write(self, record, **extra):
+        """Grava um resultado (CompileResult, BatchResult ou dict) e 'extra'"""
+        if isinstance(record, CompileResult):
+            data = record.to_dict(self.tokens, self.symbols)
+        elif isinstance(record, dict):
+            data = record
+        else:
+            data = record.to_dict()
+        if extra:
+            data = {**data, **extra}
+        self.out.write(json.dumps(data, ensure_ascii=False) + "\n")
+        self.written += 1
+        if self.flush_every and self.written % self.flush_every == 0:
+            self.out.flush()
+
+    def write_all(self, records):
+        for record in records:
+            self.write(record)
+        return self.written
+
+    def close(self):
+        self.out.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class TextRenderer:
+    """Saída legível do CompiladorCompleto (a do main.py)"""
+    __slots__ = ("out", "verbose")
+
+    def __init__(self, out=None, verbose=True):
+        self.out = out                # None = sys.stdout no momento da escrita
+        self.verbose = verbose        # Tabela de tokens gerados
+
+    def log(self, *args):
+        """Linha do modo detalhado do PDA (PDALexerAdapter.tokenize)"""
+        print(*args, file=self.out or sys.stdout)
+
+    def start(self, source_code):
+        out = self.out or sys.stdout
+        print("\n" + "="*80, file=out)
+        print("FASE 1: ANÁLISE LÉXICA (PDA)", file=out)
+        print("="*80, file=out)
+        print(f"Código fonte: {source_code}\n", file=out)
+
+    def cached(self):
+        print("[cache] Resultado reaproveitado (sem análise léxica e sintática)",
+              file=self.out or sys.stdout)
+
+    def tokens(self, tokens):
+        if not self.verbose:
+            return
+        out = self.out or sys.stdout
+        print("\n==================================================================", file=out)
+        print("=              TOKENS GERADOS PARA O PARSER                      =", file=out)
+        print("==================================================================", file=out)
+        for i, token in enumerate(tokens, 1):
+            print(f"{i:3}. {token}", file=out)
+        print("-" * 80, file=out)
+
+    def incremental(self, reparsed, reused):
+        """Comandos reanalisados/reaproveitados (compile_incremental)"""
+        print(f"\n[i] Comandos reanalisados: {reparsed}, reaproveitados: {reused}",
+              file=self.out or sys.stdout)
+
+    def lexical_error(self, error):
+        print(f"\n[X] ERRO LÉXICO: {error}", file=self.out or sys.stdout)
+
+    def parsing(self):
+        out = self.out or sys.stdout
+        print("\n" + "="*80, file=out)
+        print("FASE 2 & 3: ANÁLISE SINTÁTICA E SEMÂNTICA (SLR)", file=out)
+        print("="*80 + "\n", file=out)
+
+    def report(self, result):
+        """Relatório de erros, avisos e tabela de símbolos"""
+        out = self.out or sys.stdout
+        print("\n" + "="*70, file=out)
+        print("RELATORIO DE ANALISE", file=out)
+        print("="*70, file=out)
+
+        if result.errors:
+            print("\n[X] ERROS ENCONTRADOS:", file=out)
+            for error in result.errors:
+                print(f"  - {error}", file=out)
+        else:
+            print("\n[OK] Nenhum erro encontrado", file=out)
+
+        if result.warnings:
+            print("\n[!] AVISOS:", file=out)
+            for warning in result.warnings:
+                print(f"  - {warning}", file=out)
+
+        print("\n" + "="*70, file=out)
+        print("TABELA DE SIMBOLOS", file=out)
+        print("="*70, file=out)
+        if result.symbol_table is not None:
+            self.symbol_table(result.symbol_table.global_scope)
+        print("="*70 + "\n", file=out)
+
+    def symbol_table(self, scope, indent=0):
+        """Escopos e símbolos, como SymbolTable.print_table"""
+        out = self.out or sys.stdout
+        print("  " * indent + f"Escopo: {scope.name}", file=out)
+        for name, symbol in scope.symbols.items():
+            used_mark = "✓" if symbol.used else " "
+            print("  " * indent + f"  [{used_mark}] {name}: {symbol.symbol_type}", file=out)
+        for child in scope.children:
+            self.symbol_table(child, indent + 1)
@@ -0,0 +1,199 @@
+"""
+Instrumentação da Compilação: tempos por fase e contadores
+
+CompileStats mede tempo de relógio (perf_counter) e de CPU (process_time)
+das fases
+    lex        Lexer.tokenize / PDALexerAdapter.tokenize
+    parse      autômato SLR(1) (shift, reduce, goto, recuperação de erros)
+    semantic   handlers semânticos e verificação final da tabela de símbolos
+e conta tokens, shifts, reduções, reduções vazias (EXPR' -> ε), buscas na
+tabela de símbolos, declarações e escopos criados.
+
+Custo zero quando desligado: nada muda no laço do parser. Ligado, o parser
+usa uma cópia da tupla de handlers em que cada handler é envolvido por uma
+função que mede e conta, e a sua SymbolTable recebe versões contadas de
+lookup/declare/enter_scope (atributos da instância, não da classe).
+O tempo de 'parse' já exclui o tempo 'semantic' medido dentro dele.
+
+Agregação: merge() soma outro CompileStats (ex.: de cada arquivo de um lote,
+vindo dos workers no BatchResult); to_dict()/to_json() exportam e
+from_dict() reconstrói.
+
+Uso:
+    stats = CompileStats()
+    parser = GRAMMAR.parser(stats=stats)
+    tokens = stats.lex(Lexer(codigo).tokenize)
+    stats.parse(parser, tokens)
+    print(stats.to_json(indent=2))
+"""
+
+import json
+import time
+
+from parser_integrated import EMPTY_TAIL
+
+PHASES = ("lex", "parse", "semantic")
+COUNTERS = ("compilations", "cached", "tokens", "shifts", "reductions",
+            "epsilon_reductions", "lookups", "declarations", "scope_entries")
+
+
+class CompileStats:
+    """Tempos (relógio e CPU) por fase e contadores de uma ou mais compilações"""
+    __slots__ = ("wall", "cpu") + COUNTERS
+
+    def __init__(self):
+        self.wall = dict.fromkeys(PHASES, 0.0)   # Segundos de relógio por fase
+        self.cpu = dict.fromkeys(PHASES, 0.0)    # Segundos de CPU por fase
+        for counter in COUNTERS:
+            setattr(self, counter, 0)
+
+    # --- Medição ------------------------------------------------------------
+
+    def lex(self, tokenize, *args):
+        """Executa tokenize(*args) medindo a fase léxica; devolve os tokens"""
+        wall, cpu = time.perf_counter(), time.process_time()
+        tokens = tokenize(*args)
+        self.wall["lex"] += time.perf_counter() - wall
+        self.cpu["lex"] += time.process_time() - cpu
+        self.tokens += len(tokens)
+        return tokens
+
+    def parse(self, parser, tokens):
+        """
+        parser.parse(tokens) medindo sintático e semântico separadamente
+
+        O parser precisa ter sido criado com stats=self (handlers medidos).
+        """
+        semantic_wall, semantic_cpu = self.wall["semantic"], self.cpu["semantic"]
+        reductions = self.reductions + self.epsilon_reductions
+        step = parser.step
+        wall, cpu = time.perf_counter(), time.process_time()
+
+        result = parser.parse(tokens)
+
+        wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+        self.wall["parse"] += wall - (self.wall["semantic"] - semantic_wall)
+        self.cpu["parse"] += cpu - (self.cpu["semantic"] - semantic_cpu)
+        # step avança uma vez por shift, por redução vazia e por GOTO após
+        # uma redução: o que não é redução é shift
+        self.shifts += (parser.step - step) - (self.reductions + self.epsilon_reductions
+                                               - reductions)
+        self.compilations += 1
+        return result
+
+    def instrument(self, parser):
+        """Troca os handlers do parser (só desta instância) por versões medidas"""
+        parser.actions = tuple(
+            self._measured(handler, "epsilon_reductions" if number == EMPTY_TAIL
+                           else "reductions")
+            for number, handler in enumerate(parser.grammar.handlers)
+        )
+        self.instrument_table(parser.symbol_table)
+
+    def instrument_table(self, table):
+        """Conta lookup/declare/enter_scope e mede a verificação final da tabela"""
+        stats = self
+
+        def counted(method, counter):
+            def wrapper(*args, **kwargs):
+                setattr(stats, counter, getattr(stats, counter) + 1)
+                return method(*args, **kwargs)
+            return wrapper
+
+        table.lookup = counted(table.lookup, "lookups")
+        table.declare = counted(table.declare, "declarations")
+        table.enter_scope = counted(table.enter_scope, "scope_entries")
+        table.check_unused_symbols = self._measured(table.check_unused_symbols, None)
+
+    def _measured(self, function, counter):
+        """function medida como fase 'semantic' (e contada em 'counter')"""
+        stats = self
+        wall, cpu = self.wall, self.cpu
+        perf_counter, process_time = time.perf_counter, time.process_time
+
+        def measured(*args):
+            start, start_cpu = perf_counter(), process_time()
+            try:
+                return function(*args)
+            finally:
+                wall["semantic"] += perf_counter() - start
+                cpu["semantic"] += process_time() - start_cpu
+                if counter is not None:
+                    setattr(stats, counter, getattr(stats, counter) + 1)
+        return measured
+
+    # --- Agregação e exportação ---------------------------------------------
+
+    def merge(self, other):
+        """Soma os tempos e contadores de outro CompileStats neste"""
+        for phase in PHASES:
+            self.wall[phase] += other.wall[phase]
+            self.cpu[phase] += other.cpu[phase]
+        for counter in COUNTERS:
+            setattr(self, counter, getattr(self, counter) + getattr(other, counter))
+        return self
+
+    __iadd__ = merge
+
+    def since(self, earlier):
+        """O que foi medido depois de 'earlier' (uma cópia anterior deste)"""
+        delta = CompileStats()
+        for phase in PHASES:
+            delta.wall[phase] = self.wall[phase] - earlier.wall[phase]
+            delta.cpu[phase] = self.cpu[phase] - earlier.cpu[phase]
+        for counter in COUNTERS:
+            setattr(delta, counter, getattr(self, counter) - getattr(earlier, counter))
+        return delta
+
+    def copy(self):
+        return CompileStats().merge(self)
+
+    @classmethod
+    def aggregate(cls, items):
+        """Soma de vários CompileStats (None é ignorado)"""
+        total = cls()
+        for item in items:
+            if item is not None:
+                total.merge(item)
+        return total
+
+    def to_dict(self):
+        wall_total = sum(self.wall.values())
+        return {
+            "phases": {
+                phase: {"wall_s": self.wall[phase], "cpu_s": self.cpu[phase]}
+                for phase in PHASES
+            },
+            "total": {"wall_s": wall_total, "cpu_s": sum(self.cpu.values())},
+            "counters": {counter: getattr(self, counter) for counter in COUNTERS},
+            "tokens_per_s": self.tokens / wall_total if wall_total > 0 else 0.0,
+        }
+
+    def to_json(self, **kwargs):
+        return json.dumps(self.to_dict(), **kwargs)
+
+    @classmethod
+    def from_dict(cls, data):
+        stats = cls()
+        for phase, times in data["phases"].items():
+            stats.wall[phase] = times["wall_s"]
+            stats.cpu[phase] = times["cpu_s"]
+        for counter, value in data["counters"].items():
+            setattr(stats, counter, value)
+        return stats
+
+    def report(self):
+        """Texto com uma linha por fase e os contadores"""
+        total = sum(self.wall.values())
+        lines = []
+        for phase in PHASES:
+            share = self.wall[phase] / total * 100 if total > 0 else 0.0
+            lines.append(f"  {phase:<9} {self.wall[phase]:9.4f}s relógio "
+                         f"{self.cpu[phase]:9.4f}s CPU  {share:5.1f}%")
+        lines.append("  " + ", ".join(f"{counter}={getattr(self, counter)}"
+                                      for counter in COUNTERS))
+        return "\n".join(lines)
+
+    def __repr__(self):
+        return (f"CompileStats({self.compilations} compilação(ões), {self.tokens} tokens, "
+                f"{sum(self.wall.values()) * 1000:.1f} ms)")
@@ -3,6 +3,8 @@ Tabela de Símbolos para o Analisador Semântico
 Gerencia identificadores, escopos e declarações da linguagem fantasy
 """
 
+from diagnostics import MAX_DIAGNOSTICS, Diagnostic, limit_record
+
 class Symbol:
     """Representa um símbolo (identificador) na tabela"""
     def __init__(self, name, symbol_type, scope, line=None, value=None):
@@ -49,53 +51,200 @@ class Scope:
 class SymbolTable:
     """Tabela de Símbolos com suporte a escopos aninhados"""
     
-    def __init__(self):
+    def __init__(self, journal=False, max_diagnostics=MAX_DIAGNOSTICS, budget=None):
         self.global_scope = Scope("global")
         self.current_scope = self.global_scope
-        self.errors = []              # Lista de erros semânticos
-        self.warnings = []            # Lista de avisos
+        self.errors = []              # Erros semânticos (Diagnostic; str() dá a mensagem)
+        self.warnings = []            # Avisos (Diagnostic)
+        # Registros distintos por lista (None = sem limite); as ocorrências
+        # além do limite só são contadas num registro LIMIT ao fim da lista
+        self.max_diagnostics = max_diagnostics
+        self.occurrences = {}         # (código, nome) -> Diagnostic (agregação)
+        # Registro de operações para checkpoint/rollback (None = desligado)
+        self.journal = [] if journal else None
+        self.digest = 0               # Impressão digital dos símbolos declarados
+        self.budget = budget          # Budget (governor.py): limite de escopos
+        self.scope_count = 0          # Escopos abertos (sem contar o global)
     
     def enter_scope(self, scope_name):
         """Entra em um novo escopo (ex: ao entrar em KEL módulo)"""
+        if self.budget is not None:
+            self.scope_count += 1
+            self.budget.charge_scope(self.scope_count)
         new_scope = Scope(scope_name, parent=self.current_scope)
         self.current_scope.children.append(new_scope)
+        if self.journal is not None:
+            self.journal.append(("enter", self.current_scope, new_scope))
         self.current_scope = new_scope
         return new_scope
     
     def exit_scope(self):
         """Sai do escopo atual, voltando ao pai"""
         if self.current_scope.parent:
+            if self.journal is not None:
+                self.journal.append(("exit", self.current_scope, None))
             self.current_scope = self.current_scope.parent
         else:
-            self.warnings.append("Tentativa de sair do escopo global")
+            self._report(self.warnings, "GLOBAL_SCOPE_EXIT")
     
     def declare(self, name, symbol_type='variable', line=None, value=None):
         """Declara um novo símbolo no escopo atual"""
         symbol = Symbol(name, symbol_type, self.current_scope.name, line, value)
         
-        if not self.current_scope.define(symbol):
-            self.errors.append(
-                f"Erro semântico (linha {line}): '{name}' já foi declarado em '{self.current_scope.name}'"
-            )
+        if not self._define(symbol):
+            self._reference(name)
+            self._report(self.errors, "REDECLARED", name, line, scope=self.current_scope.name)
             return False
         
         return True
     
+    def _define(self, symbol):
+        """Define o símbolo no escopo atual, atualizando digest e journal"""
+        if not self.current_scope.define(symbol):
+            return False
+        self.digest ^= hash((symbol.scope, symbol.name, symbol.symbol_type))
+        if self.journal is not None:
+            self.journal.append(("define", self.current_scope, symbol))
+        return True
+    
+    def _reference(self, name):
+        """
+        Registra no journal um nome que gerou erro (uso sem declaração ou
+        redeclaração): o resultado depende dos símbolos já declarados, então
+        a compilação incremental precisa saber que o nome foi consultado
+        """
+        if self.journal is not None:
+            self.journal.append(("ref", self.current_scope, name))
+    
+    def _report(self, records, code, name=None, line=None, **args):
+        """
+        Registra um erro/aviso em 'records' (self.errors ou self.warnings)
+        
+        Sem journal, repetir (código, nome) só conta mais uma ocorrência no
+        registro existente. Com journal (análise incremental) cada ocorrência
+        é um registro e não há limite: rollback/replay recortam as listas
+        pelo tamanho, o que não desfaz contagens.
+        """
+        if self.journal is not None:
+            records.append(Diagnostic(code, name, line, **args))
+            return
+        
+        key = (code, name)
+        diagnostic = self.occurrences.get(key)
+        if diagnostic is not None:
+            diagnostic.occur(line)
+            return
+        
+        if self.max_diagnostics is not None and len(records) >= self.max_diagnostics:
+            last = records[-1] if records else None
+            if not (isinstance(last, Diagnostic) and last.code == "LIMIT"):
+                last = limit_record(self.max_diagnostics)
+                records.append(last)
+            last.occur(line)
+            return
+        
+        diagnostic = self.occurrences[key] = Diagnostic(code, name, line, **args)
+        records.append(diagnostic)
+    
+    def update_value(self, symbol, value):
+        """Atualiza o valor de um símbolo (atribuição), registrando no journal"""
+        if self.journal is not None:
+            self.journal.append(("value", symbol, (symbol.value, value)))
+        symbol.value = value
+    
     def lookup(self, name, line=None, mark_used=True):
         """Busca um símbolo na tabela (escopo atual e pais)"""
         symbol = self.current_scope.lookup(name)
         
         if symbol is None:
-            self.errors.append(
-                f"Erro semântico (linha {line}): '{name}' não foi declarado"
-            )
+            self._reference(name)
+            self._report(self.errors, "UNDECLARED", name, line)
             return None
         
         if mark_used:
+            # Todo uso vai para o journal (não só o primeiro): se uma edição
+            # remover o primeiro uso, os seguintes ainda marcam o símbolo
+            if self.journal is not None:
+                self.journal.append(("use", symbol, symbol.used))
             symbol.used = True
         
         return symbol
     
+    # ------------------------------------------------------------------------
+    # Checkpoints (análise incremental)
+    # ------------------------------------------------------------------------
+    
+    def checkpoint(self):
+        """Marca o estado atual da tabela (requer journal=True)"""
+        return (len(self.journal), len(self.errors), len(self.warnings))
+    
+    def rollback(self, marker):
+        """
+        Desfaz todas as operações feitas depois de 'marker'
+        
+        Returns:
+            Tupla (operações, erros, avisos) desfeitos, na ordem original,
+            que podem ser reaplicados com replay()
+        """
+        journal_len, errors_len, warnings_len = marker
+        undone = self.journal[journal_len:]
+        
+        for kind, target, data in reversed(undone):
+            if kind == "define":
+                del target.symbols[data.name]
+                self.digest ^= hash((data.scope, data.name, data.symbol_type))
+            elif kind == "use":
+                target.used = data
+            elif kind == "value":
+                target.value = data[0]
+            elif kind == "enter":
+                target.children.pop()
+                self.current_scope = target
+            elif kind == "exit":
+                self.current_scope = target
+        
+        del self.journal[journal_len:]
+        errors = self.errors[errors_len:]
+        warnings = self.warnings[warnings_len:]
+        del self.errors[errors_len:]
+        del self.warnings[warnings_len:]
+        return undone, errors, warnings
+    
+    def replay(self, undone, skip=(0, 0, 0)):
+        """
+        Reaplica operações devolvidas por rollback(), ignorando as primeiras
+        'skip' = (operações, erros, avisos)
+        
+        Símbolos usados/atualizados são resolvidos por nome no estado atual,
+        então o replay vale mesmo que declarações anteriores tenham sido refeitas.
+        """
+        operations, errors, warnings = undone
+        
+        for i in range(skip[0], len(operations)):
+            kind, target, data = operations[i]
+            if kind == "define":
+                self._define(data)
+            elif kind == "use":
+                symbol = self.current_scope.lookup(target.name)
+                if symbol is not None:
+                    self.journal.append(("use", symbol, symbol.used))
+                    symbol.used = True
+            elif kind == "value":
+                symbol = self.current_scope.lookup(target.name)
+                if symbol is not None:
+                    self.update_value(symbol, data[1])
+            elif kind == "ref":
+                self.journal.append(operations[i])
+            elif kind == "enter":
+                self.current_scope.children.append(data)
+                self.journal.append((kind, self.current_scope, data))
+                self.current_scope = data
+            elif kind == "exit":
+                self.exit_scope()
+        
+        self.errors.extend(errors[skip[1]:])
+        self.warnings.extend(warnings[skip[2]:])
+    
     def lookup_in_scope(self, name, scope_name):
         """Busca um símbolo em um escopo específico (para HIM . id)"""
         # Busca o escopo pelo nome
@@ -124,9 +273,7 @@ class SymbolTable:
         """Verifica recursivamente símbolos não usados"""
         for name, symbol in scope.symbols.items():
             if not symbol.used and symbol.symbol_type == 'variable':
-                self.warnings.append(
-                    f"Aviso (linha {symbol.line}): variável '{name}' declarada mas não usada"
-                )
+                self._report(self.warnings, "UNUSED", name, symbol.line)
         
         for child in scope.children:
             self._check_unused_in_scope(child)
@@ -0,0 +1,88 @@
+"""
+Validação Sintática Rápida da Linguagem Fantasy
+Responde apenas "o arquivo é sintaticamente válido?" (ex.: gate de CI)
+
+Diferente do pipeline completo, não cria objetos Token, não mantém pilha de
+atributos, não executa ações semânticas e não preenche a tabela de símbolos:
+  Lexer.scan_types()  -> pares (tipo, match), um por vez
+  validate()          -> só a pilha de estados do SLR(1)
+
+Apenas o primeiro erro (léxico ou sintático) é relatado, com linha e coluna.
+
+Uso:
+    python syntax_check.py arquivo1.fan arquivo2.fan ...
+"""
+
+import sys
+
+from lexer import Lexer
+from parser_integrated import GRAMMAR
+
+
+class SyntaxIssue:
+    """Primeiro erro encontrado na validação"""
+    __slots__ = ("line", "column", "message")
+
+    def __init__(self, line, column, message):
+        self.line = line
+        self.column = column
+        self.message = message
+
+    def __str__(self):
+        return self.message
+
+    def __repr__(self):
+        return f"SyntaxIssue(L{self.line}, C{self.column}, {self.message!r})"
+
+
+def check_syntax(source_code):
+    """
+    Valida apenas léxico e sintaxe de um código fonte
+
+    Args:
+        source_code: String com o código fonte
+
+    Returns:
+        None se válido, senão o SyntaxIssue do primeiro erro
+    """
+    # GRAMMAR é imutável e validate() só usa uma pilha local: pode ser
+    # chamado de várias threads ao mesmo tempo
+    lexer = Lexer(source_code)
+    failure = GRAMMAR.validate(lexer.scan_types())
+
+    # Um erro léxico interrompe scan_types antes do '$'
+    if lexer.errors:
+        error = lexer.errors[0]
+        return SyntaxIssue(error.line, error.column, str(error))
+    if failure is None:
+        return None
+
+    token_type, match = failure
+    line, column = lexer.locate(match.start(1))
+    lexeme = match[1] or "$"
+    message = (f"ERRO SINTATICO (Linha {line}, Coluna {column}): "
+               f"Token inesperado '{lexeme}' (tipo: {token_type})")
+    return SyntaxIssue(line, column, message)
+
+
+def check_file(path):
+    """Valida um arquivo (UTF-8); retorna None ou SyntaxIssue"""
+    with open(path, encoding="utf-8") as f:
+        return check_syntax(f.read())
+
+
+def main(paths):
+    """Valida os arquivos e imprime só os inválidos; código de saída 1 se houver"""
+    invalid = 0
+    for path in paths:
+        issue = check_file(path)
+        if issue is not None:
+            invalid += 1
+            print(f"{path}: {issue}")
+
+    print(f"{len(paths) - invalid}/{len(paths)} arquivo(s) válido(s)")
+    return 1 if invalid else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,11 @@
+"""
+Configuração dos testes: os módulos do analisador ficam no diretório pai
+(módulos soltos, sem pacote), então ele entra no sys.path.
+
+    cd "Analisador Sintatico" && python -m pytest -q
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
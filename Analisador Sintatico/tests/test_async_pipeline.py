@@ -0,0 +1,36 @@
+"""Pipeline asyncio: mesmos resultados da compilação direta, erros de leitura"""
+
+import asyncio
+
+from async_pipeline import compile_async
+from batch import compile_source
+
+
+def collect(items, **limits):
+    async def run():
+        return [result async for result in compile_async(items, **limits)]
+    return asyncio.run(run())
+
+
+def test_results_match_direct_compile(tmp_path):
+    sources = {f"p{i}.fan": f"FUS v{i} := {i} ; print v{i}" for i in range(20)}
+    sources["erro.fan"] = "print nada ; FUS := 2"
+    for name, source in sources.items():
+        (tmp_path / name).write_text(source, encoding="utf-8")
+    paths = [str(tmp_path / name) for name in sources] + [str(tmp_path / "falta.fan")]
+
+    results = {result.name: result for result in collect(paths, readers=3, lexers=2, parsers=2)}
+    assert set(results) == set(paths)
+    for index, (name, source) in enumerate(sources.items()):
+        expected = compile_source(index, name, source)
+        result = results[str(tmp_path / name)]
+        assert (result.success, result.errors) == (expected.success, expected.errors)
+    missing = results[str(tmp_path / "falta.fan")]
+    assert not missing.success and missing.errors[0].startswith("ERRO DE LEITURA")
+
+
+def test_consumer_can_stop_early():
+    async def first():
+        async for result in compile_async([(f"n{i}", "FUS a := 1") for i in range(50)]):
+            return result
+    assert asyncio.run(first()).success
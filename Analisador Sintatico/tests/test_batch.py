@@ -0,0 +1,32 @@
+"""Compilação em lote (pool de processos e pipeline lexer/parser)"""
+
+import main
+from batch import compile_source
+from main import CompiladorCompleto
+
+ITEMS = [("a", "FUS a := 1 ; print a"), ("b", "print b"), ("c", "FUS := 1")]
+
+
+def test_compile_many_matches_single_compiles():
+    compiler = CompiladorCompleto(verbose=False, renderer=None)
+    try:
+        results = {result.name: result for result in compiler.compile_many(ITEMS, workers=2)}
+    finally:
+        compiler.close()
+    for index, (name, source) in enumerate(ITEMS):
+        expected = compile_source(index, name, source)
+        assert (results[name].success, results[name].errors) == (expected.success, expected.errors)
+
+
+def test_pipeline_pairs_from_workers(monkeypatch):
+    requested = []
+
+    def fake_pipeline(items, pairs=None):
+        requested.append(pairs)
+        return iter(())
+
+    monkeypatch.setattr(main, "compile_pipeline", fake_pipeline)
+    compiler = CompiladorCompleto(verbose=False, renderer=None)
+    for workers in (None, 1, 2, 5):
+        list(compiler.compile_many(ITEMS, workers=workers, pipeline=True))
+    assert requested == [None, 1, 1, 2]
@@ -0,0 +1,30 @@
+"""Histórico de benchmarks: gravação, seleção e comparação estatística"""
+
+from benchmark_history import (FASTER, SAME, SLOWER, HistoryStore, _describe, compare_runs,
+                               select)
+
+
+def run(commit, times, machine="m1"):
+    return {"environment": {"commit": commit, "machine": machine, "python": "3.11"},
+            "cases": [{"target": "parser", "shape": "flat", "size": 1000, "runs": times}]}
+
+
+def test_describe_pluralizes_runs():
+    assert _describe([run("abc", [1.0])]) == "abc (1 execução, m1, Python 3.11)"
+    assert _describe([run("abc", [1.0])] * 2) == "abc (2 execuções, m1, Python 3.11)"
+
+
+def test_store_appends_runs_with_ids(tmp_path):
+    store = HistoryStore(str(tmp_path / "history.jsonl"))
+    assert store.record(run("aaa", [1.0])) == 1
+    assert store.record(run("bbb", [1.0])) == 2
+    assert [entry["id"] for entry in store.runs()] == [1, 2]
+    assert [entry["environment"]["commit"] for entry in select(store.runs(), "bbb")] == ["bbb"]
+
+
+def test_compare_detects_changes():
+    base = [run("aaa", [1.00, 1.01, 0.99, 1.00])]
+    status = lambda new: compare_runs(base, [run("bbb", new)])[0][-1]
+    assert status([0.50, 0.51, 0.49, 0.50]) == FASTER
+    assert status([2.00, 2.02, 1.98, 2.00]) == SLOWER
+    assert status([1.00, 1.01, 0.99, 1.00]) == SAME
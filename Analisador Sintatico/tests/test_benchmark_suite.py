@@ -0,0 +1,34 @@
+"""Suíte de benchmarks: formatos de programa e um caso pequeno por alvo"""
+
+import pytest
+
+from benchmark_suite import SHAPES, TARGETS, bench_case, generate
+from lexer import Lexer
+from parser_integrated import GRAMMAR
+
+
+@pytest.mark.parametrize("shape", SHAPES)
+def test_generated_shapes_parse(shape):
+    tokens = Lexer(generate(shape, 300)).tokenize()
+    assert 250 <= len(tokens) <= 400
+    parser = GRAMMAR.parser()
+    parser.parse(tokens)
+    assert parser.accepted and parser.syntax_errors == 0
+
+
+@pytest.mark.parametrize("target", TARGETS)
+def test_bench_case(target):
+    case = bench_case(target, "statements", 100, repeat=2, budget=10, memory=False)
+    assert (case["target"], case["shape"], case["size"]) == (target, "statements", 100)
+    assert len(case["runs"]) == 2 and case["median_s"] > 0 and case["throughput"] > 0
+    assert case["p50_ms"] <= case["p95_ms"] <= case["p99_ms"]
+    assert "peak_bytes" not in case
+    if target == "symbol_table":
+        assert case["unit"] == "ops/s"
+    else:
+        assert case["unit"] == "tokens/s" and case["tokens"] > 0
+
+
+def test_unknown_target():
+    with pytest.raises(ValueError):
+        bench_case("optimizer", "statements", 100, repeat=1, budget=0, memory=False)
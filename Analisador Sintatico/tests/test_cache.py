@@ -0,0 +1,96 @@
+"""Cache de compilação: reaproveitamento, invalidação pela versão e LRU"""
+
+import os
+import shutil
+
+import pytest
+
+import cache
+from cache import BACKEND_SOURCES, CompileCache, grammar_version
+from lexer import Lexer
+from main import CompiladorCompleto
+from parser_integrated import GRAMMAR
+
+SOURCE = "FUS x := 1 ; print y ; FUS w := 2"
+
+
+def put(store, source):
+    """Compila 'source' e guarda o resultado; devolve a chave"""
+    lexer = Lexer(source)
+    tokens = lexer.tokenize()
+    parser = GRAMMAR.parser()
+    parser.parse(tokens)
+    key = store.key(source)
+    assert store.put(key, tokens, lexer.errors, parser)
+    return key
+
+
+def test_cached_result_matches_compiled(tmp_path):
+    compiler = CompiladorCompleto(verbose=False, renderer=None, cache=tmp_path)
+    first = compiler.analyze(SOURCE)
+    second = compiler.analyze(SOURCE)
+    assert not first.cached and second.cached
+    assert (second.success, second.errors, second.warnings) == \
+           (first.success, first.errors, first.warnings)
+    assert str(second.ast) == str(first.ast)
+    assert second.symbols() == first.symbols()
+
+
+@pytest.fixture
+def sources(tmp_path, monkeypatch):
+    """Cópia dos módulos que entram na versão, num diretório próprio"""
+    directory = tmp_path / "src"
+    directory.mkdir()
+    for name in cache._SEMANTIC_SOURCES + BACKEND_SOURCES["fantasy"]:
+        shutil.copy(os.path.join(cache._DIRECTORY, name), directory / name)
+    monkeypatch.setattr(cache, "_DIRECTORY", str(directory))
+    grammar_version.cache_clear()
+    yield directory
+    grammar_version.cache_clear()
+
+
+@pytest.mark.parametrize("name", ["diagnostics.py", "governor.py", "symbol_table.py",
+                                  "parser_integrated.py", "lexer.py"])
+def test_key_changes_with_hashed_source(sources, tmp_path, name):
+    store = CompileCache(tmp_path / "cache")
+    key = put(store, SOURCE)
+    assert store.get(key) is not None
+
+    with open(sources / name, "a", encoding="utf-8") as f:
+        f.write("\n# alterado\n")
+    grammar_version.cache_clear()
+    new_key = store.key(SOURCE)
+    assert new_key != key
+    assert store.get(new_key) is None
+
+
+def test_lru_evicts_least_recently_used(tmp_path):
+    store = CompileCache(tmp_path)
+    keys = [put(store, f"FUS v{i} := {i} ; print v{i}") for i in range(3)]
+    paths = [store._path(key) for key in keys]
+    for age, path in enumerate(paths):
+        os.utime(path, (1000 + age, 1000 + age))
+    assert store.get(keys[0]) is not None            # O mais antigo passa a recente
+
+    sizes = [os.path.getsize(path) for path in paths]
+    store.evict(target=sum(sizes) - 1)               # Basta remover uma entrada
+    assert [os.path.exists(path) for path in paths] == [True, False, True]
+
+
+def test_put_over_limit_evicts_older_entries(tmp_path):
+    store = CompileCache(tmp_path)
+    old = put(store, SOURCE)
+    store.max_bytes = os.path.getsize(store._path(old)) + 1
+    new = put(store, "FUS a := 1 ; print a")
+    assert store.get(old) is None
+    assert store.get(new) is not None
+
+
+def test_corrupt_entry_is_a_miss(tmp_path):
+    store = CompileCache(tmp_path)
+    key = put(store, SOURCE)
+    with open(store._path(key), "r+b") as f:
+        f.seek(20)
+        f.write(b"\xff\xff\xff\xff")
+    assert store.get(key) is None
+    assert not os.path.exists(store._path(key))
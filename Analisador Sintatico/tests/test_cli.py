@@ -0,0 +1,62 @@
+"""Linha de comando: entradas, formatos, --stats e códigos de saída"""
+
+import io
+import json
+
+import pytest
+
+from cli import EXIT_FAILED, EXIT_OK, main
+
+
+@pytest.fixture
+def files(tmp_path):
+    (tmp_path / "ok.fan").write_text("FUS a := 1 ; print a", encoding="utf-8")
+    (tmp_path / "erro.fan").write_text("print b", encoding="utf-8")
+    return tmp_path
+
+
+def run(*argv, stdin=None):
+    out = io.StringIO()
+    code = main(list(argv), stdin=stdin, stdout=out)
+    return code, out.getvalue()
+
+
+def test_all_compile(files):
+    code, text = run(str(files / "ok.fan"))
+    assert code == EXIT_OK
+    assert "1/1 arquivo(s) compilado(s)" in text
+
+
+def test_failure_exit_code_and_diagnostics(files):
+    code, text = run(str(files / "*.fan"))
+    assert code == EXIT_FAILED
+    assert "'b' não foi declarado" in text and "1/2 arquivo(s)" in text
+
+
+def test_json_lines_with_stats(files):
+    code, text = run(str(files / "*.fan"), "--format", "json", "--stats")
+    records = [json.loads(line) for line in text.splitlines()]
+    assert code == EXIT_FAILED
+    assert sorted(record["success"] for record in records[:-1]) == [False, True]
+    stats = records[-1]["stats"]
+    assert stats["files"] == 2 and stats["failed"] == 1
+    assert stats["lex_s"] > 0 and stats["parse_s"] > 0
+
+
+def test_stdin_and_quiet():
+    code, text = run("-", "--quiet", stdin=io.StringIO("FUS a := 1 ; print a"))
+    assert (code, text) == (EXIT_OK, "")
+
+
+@pytest.mark.parametrize("backend", ["pda", "pipeline", "async"])
+def test_backends_agree(files, backend):
+    code, text = run(str(files / "*.fan"), "--format", "json", "--backend", backend, "--jobs", "2")
+    results = {json.loads(line)["name"]: json.loads(line)["success"] for line in text.splitlines()}
+    assert code == EXIT_FAILED
+    assert results == {str(files / "ok.fan"): True, str(files / "erro.fan"): False}
+
+
+def test_no_match_is_usage_error(files):
+    with pytest.raises(SystemExit) as raised:
+        run(str(files / "*.txt"))
+    assert raised.value.code == 2
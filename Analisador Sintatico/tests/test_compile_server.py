@@ -0,0 +1,71 @@
+"""Servidor de compilação: ida e volta pelo socket, inclusive requisições ruins"""
+
+import os
+import signal
+import time
+from multiprocessing import get_context
+
+import pytest
+
+from compile_server import CompileClient, CompileServer, CompileWorker
+from governor import Budget
+
+
+@pytest.fixture
+def server(tmp_path):
+    """Servidor com um worker (as conexões de um teste caem no mesmo processo)"""
+    path = str(tmp_path / "fantasy.sock")
+    context = get_context("fork")
+    budget = Budget(max_tokens=200)
+    process = context.Process(target=CompileServer(path, workers=1, budget=budget).serve_forever)
+    process.start()
+    deadline = time.monotonic() + 30
+    while not os.path.exists(path):
+        assert time.monotonic() < deadline and process.is_alive(), "servidor não subiu"
+        time.sleep(0.05)
+    yield path
+    os.kill(process.pid, signal.SIGTERM)
+    process.join(10)
+
+
+def test_round_trip(server):
+    with CompileClient(server) as client:
+        response = client.compile("FUS x := 1 ; print y", name="a.fan")
+    assert response["name"] == "a.fan"
+    assert not response["success"]
+    assert response["errors"] == ["Erro semântico (linha 1): 'y' não foi declarado"]
+    assert set(response["timings"]) == {"lex_ms", "parse_ms", "total_ms"}
+
+
+def test_bad_requests_keep_worker_alive(server):
+    with CompileClient(server) as client:
+        assert "error" in client.request(id=1, source=123)
+        assert "error" in client.request(id=2, path=["a"])
+        assert "error" in client.request(id=3, source="print x", lexer="outro")
+        client.sock.sendall(b"{nao e json\n")
+        assert client.reader.readline().startswith(b'{"id": null, "error": "JSON')
+        # Mesma conexão, mesmo worker: continua compilando
+        response = client.compile("FUS x := 1 ; print x")
+        assert response["success"] and response["id"] == 4
+
+
+def test_budget_limit_reported(server):
+    source = " ;\n".join(f"FUS v{i} := {i}" for i in range(100))
+    with CompileClient(server) as client:
+        response = client.compile(source)
+        assert not response["success"]
+        assert response["limit"] == "tokens"
+        assert response["errors"][-1].startswith("LIMITE DE RECURSOS")
+        # O orçamento recomeça na próxima requisição
+        assert client.compile("FUS x := 1 ; print x")["success"]
+
+
+def test_unexpected_error_becomes_error_response(monkeypatch):
+    worker = CompileWorker()
+
+    def broken(request):
+        raise TypeError("falha")
+
+    monkeypatch.setattr(worker, "handle", broken)
+    reply = worker.respond(b'{"id": 9, "source": "print x"}')
+    assert reply == b'{"id": 9, "error": "ERRO INTERNO: TypeError: falha"}\n'
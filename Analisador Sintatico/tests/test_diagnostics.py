@@ -0,0 +1,55 @@
+"""Diagnósticos agregados por (código, nome) e limitados por lista"""
+
+from diagnostics import Diagnostic, aggregate
+from lexer import Lexer
+from parser_integrated import GRAMMAR
+
+
+def semantic_errors(source, **options):
+    lexer = Lexer(source)
+    parser = GRAMMAR.parser(**options)
+    parser.parse(lexer.tokenize())
+    return parser.symbol_table.errors
+
+
+def test_repeated_error_aggregated():
+    errors = semantic_errors("print q ;\nprint q ;\nprint q")
+    assert [error.message for error in errors] == [
+        "Erro semântico (linha 1): 'q' não foi declarado (3 ocorrências; última: linha 3)"]
+
+
+def test_limit_record_counts_omitted():
+    source = " ; ".join(f"print v{i}" for i in range(10))
+    errors = semantic_errors(source, max_diagnostics=3)
+    assert len(errors) == 4
+    assert [error.name for error in errors[:3]] == ["v0", "v1", "v2"]
+    assert errors[3].code == "LIMIT"
+    assert errors[3].message == "Limite de 3 diagnósticos atingido: 7 omitido(s)"
+
+
+def test_aggregate_matches_symbol_table():
+    records = [Diagnostic("UNDECLARED", name, line=line)
+               for line, name in enumerate("abacbda", 1)]
+    merged = aggregate(records, limit=3)
+    assert [(record.code, record.name, record.count) for record in merged] == [
+        ("UNDECLARED", "a", 3), ("UNDECLARED", "b", 2), ("UNDECLARED", "c", 1), ("LIMIT", None, 1)]
+    assert merged[0].last_line == 7
+    assert records[0].count == 1                       # Entrada não é alterada
+
+
+def test_lexical_errors_aggregated_and_limited():
+    lexer = Lexer("FUS a := 1 @ 2 @ 3\nprint @ ~ ;")
+    lexer.tokenize()
+    assert [str(error) for error in lexer.errors] == [
+        "ERRO LÉXICO (Linha 1, Coluna 12): Caractere inválido '@' "
+        "(3 ocorrências; última: linha 2, coluna 7)",
+        "ERRO LÉXICO (Linha 2, Coluna 9): Caractere inválido '~'",
+    ]
+
+    raw = Lexer("@ @ ~ ? ` ~", aggregate=False)
+    raw.tokenize()
+    assert len(raw.errors) == 6
+    limited = Lexer.aggregate_errors(raw.errors, max_errors=2)
+    assert len(limited) == 3
+    assert limited[0].count == 2
+    assert "2 omitido(s)" in str(limited[2])
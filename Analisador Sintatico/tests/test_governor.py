@@ -0,0 +1,101 @@
+"""Orçamento por compilação: cada limite vira diagnóstico e o parser não trava"""
+
+import pytest
+
+import governor
+from governor import Budget, BudgetExceeded
+from lexer import Lexer
+from parser_integrated import GRAMMAR
+from symbol_table import SymbolTable
+
+PROGRAM = " ;\n".join(f"FUS v{i} := {i} + 1" for i in range(200))
+NESTED = "LOS x " * 200 + "print x"
+
+
+def compile_with(budget, source, from_lexer=True):
+    """Compila com o orçamento no parser (e no Lexer, se from_lexer)"""
+    parser = GRAMMAR.parser(budget=budget)
+    lexer = Lexer(source, budget=budget if from_lexer else None)
+    parser.parse(lexer.iter_tokens())
+    return parser
+
+
+def assert_limited(parser, budget, resource):
+    assert parser.finished and not parser.accepted
+    assert not parser.result().success
+    assert budget.exceeded is not None and budget.exceeded.resource == resource
+    message = str(parser.errors[-1])
+    assert message.startswith("LIMITE DE RECURSOS (Linha ")
+    assert message.endswith("; análise interrompida")
+    return message
+
+
+def assert_reusable(parser, budget):
+    """Mesmo parser, orçamento reiniciado: a próxima compilação é normal"""
+    budget.start()
+    assert parser.parse(Lexer("FUS a := 1 ; print a").tokenize())
+    assert parser.errors == []
+
+
+@pytest.mark.parametrize("from_lexer", [True, False])
+def test_tokens(from_lexer):
+    budget = Budget(max_tokens=50)
+    parser = compile_with(budget, PROGRAM, from_lexer)
+    assert "mais de 50 tokens" in assert_limited(parser, budget, "tokens")
+    assert_reusable(parser, budget)
+
+
+def test_depth():
+    budget = Budget(max_depth=40, check_every=1)
+    parser = compile_with(budget, NESTED, from_lexer=False)
+    assert "mais de 40 níveis" in assert_limited(parser, budget, "depth")
+    assert_reusable(parser, budget)
+
+
+def test_timeout():
+    budget = Budget(timeout=0.0, check_every=1)
+    parser = compile_with(budget, PROGRAM)
+    assert "tempo limite" in assert_limited(parser, budget, "timeout")
+
+
+def test_cancelled():
+    budget = Budget(check_every=1)
+    budget.cancel()
+    parser = compile_with(budget, PROGRAM, from_lexer=False)
+    assert "cancelada" in assert_limited(parser, budget, "cancelled")
+    assert_reusable(parser, budget)
+
+
+def test_memory(monkeypatch):
+    usage = iter(range(0, 10 ** 12, 2 ** 20))           # +1 MiB a cada consulta
+    monkeypatch.setattr(governor, "resident_memory", lambda: next(usage))
+    budget = Budget(max_memory=4 * 2 ** 20, check_every=1)
+    parser = compile_with(budget, PROGRAM, from_lexer=False)
+    assert "memória cresceu" in assert_limited(parser, budget, "memory")
+
+
+def test_scopes():
+    budget = Budget(max_scopes=3)
+    table = SymbolTable(budget=budget)
+    for depth in range(3):
+        table.enter_scope(f"m{depth}")
+    with pytest.raises(BudgetExceeded) as raised:
+        table.enter_scope("m3")
+    assert raised.value.resource == "scopes"
+    assert str(raised.value) == "LIMITE DE RECURSOS: mais de 3 escopos; análise interrompida"
+
+
+def test_abort_records_lexer_exception():
+    budget = Budget(max_tokens=10)
+    parser = GRAMMAR.parser(budget=budget)
+    with pytest.raises(BudgetExceeded) as raised:
+        Lexer(PROGRAM, budget=budget).tokenize()
+    parser.abort(raised.value)
+    assert_limited(parser, budget, "tokens")
+    assert parser.finish() is False                    # Não tenta mais tokens
+
+
+def test_unlimited_budget_changes_nothing():
+    budget = Budget()
+    parser = compile_with(budget, PROGRAM)
+    assert parser.result().success and budget.exceeded is None
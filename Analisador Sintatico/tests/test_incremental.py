@@ -0,0 +1,96 @@
+"""Compilação incremental: o resultado deve ser o de uma compilação do zero"""
+
+import random
+
+from ast_nodes import render
+from incremental import IncrementalCompiler
+from lexer import Lexer
+from parser_integrated import GRAMMAR
+
+
+def fresh(source):
+    """Compilação completa com um parser novo"""
+    lexer = Lexer(source)
+    parser = GRAMMAR.parser()
+    parser.parse(lexer.tokenize())
+    result = parser.result(lexer.errors)
+    return result.success, result.errors, result.warnings, render(parser.ast) if parser.ast else None
+
+
+def outcome(compiler):
+    ast = render(compiler.ast) if compiler.ast else None
+    return compiler.success, compiler.errors, compiler.warnings, ast
+
+
+def test_undeclared_after_trailing_semicolon_reported_once():
+    compiler = IncrementalCompiler()
+    source = "FUS a := 1 ; HON zz ; print a ;"
+    compiler.compile(source)
+    assert sum("'zz' não foi declarado" in error for error in compiler.errors) == 1
+    assert outcome(compiler) == fresh(source)
+
+
+def test_no_stale_warnings_after_edit():
+    compiler = IncrementalCompiler()
+    compiler.compile("FUS a := 1 ; FUS v1 := 2 ; print a ;")
+    source = "FUS a := 1 ; print a ;"
+    compiler.compile(source)
+    assert not any("v1" in warning for warning in compiler.warnings)
+    assert outcome(compiler) == fresh(source)
+
+
+SOURCES = [
+    "",
+    "FUS a := 1 ;;",
+    "FOD print a",
+    "print q ; print q ; @ @ ?",
+    "FUS a := 1 ; FUS v1 := 2 ; print a ; FUS b := ",
+    "FUS a := 1 ; assign := 3 ;",
+]
+
+
+def test_single_compiles_match_fresh():
+    for source in SOURCES:
+        compiler = IncrementalCompiler()
+        compiler.compile(source)
+        assert outcome(compiler) == fresh(source), source
+
+
+PIECES = ["FUS v{k} := {n}", "assign v{k} := v{j} + {n}", "print v{j}", "HON zz",
+          "FOD print v{j} FAH v{k}", "LOS v{j} print v{k}", "FUS v{k} :=",
+          "assign := 3", "@", "KEL m{k} print v{j}", ""]
+
+
+def test_edit_sequences_match_fresh():
+    # Inclui ';' final e erros no '$': recuperação seguida de aceitação adiada
+    rng = random.Random(7)
+
+    def piece():
+        return rng.choice(PIECES).format(k=rng.randrange(6), j=rng.randrange(6), n=rng.randrange(9))
+
+    for _ in range(40):
+        lines = [piece() for _ in range(rng.randrange(1, 8))]
+        compiler = IncrementalCompiler()
+        for _ in range(6):
+            source = " ;\n".join(lines) + (" ;" if rng.random() < 0.5 else "")
+            compiler.compile(source)
+            assert outcome(compiler) == fresh(source), source
+            k = rng.randrange(len(lines) + 1)
+            choice = rng.random()
+            if choice < 0.4:
+                lines[min(k, len(lines) - 1)] = piece()
+            elif choice < 0.7:
+                lines.insert(k, piece())
+            elif len(lines) > 1:
+                del lines[min(k, len(lines) - 1)]
+
+
+def test_edit_reuses_statements():
+    compiler = IncrementalCompiler()
+    lines = [f"FUS v{i} := {i} + 1 ;" for i in range(50)] + ["print v3"]
+    compiler.compile("\n".join(lines))
+    lines[25] = "FUS v25 := 7 + 1 ;"
+    source = "\n".join(lines)
+    compiler.compile(source)
+    assert compiler.reused_statements > compiler.reparsed_statements
+    assert outcome(compiler) == fresh(source)
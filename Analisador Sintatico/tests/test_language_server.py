@@ -0,0 +1,83 @@
+"""Servidor de linguagem: diagnósticos, definição e mensagens com problema"""
+
+import io
+import os
+
+from language_server import (INTERNAL_ERROR, METHOD_NOT_FOUND, Document, LanguageServer,
+                             read_message, write_message)
+
+URI = "file:///programa.fan"
+
+
+def run(messages):
+    """Atende 'messages' (até o fim da entrada) e devolve as mensagens escritas"""
+    read_end, write_end = os.pipe()
+    with os.fdopen(write_end, "wb") as stream:
+        for message in messages:
+            write_message(stream, message)
+    out = io.BytesIO()
+    with os.fdopen(read_end, "rb") as stream:
+        LanguageServer(stream, out, debounce=0).serve()
+    out.seek(0)
+    replies = []
+    while (message := read_message(out)) is not None:
+        replies.append(message)
+    return replies
+
+
+def request(request_id, method, params=None):
+    return {"jsonrpc": "2.0", "id": request_id, "method": method, "params": params or {}}
+
+
+def notification(method, params):
+    return {"jsonrpc": "2.0", "method": method, "params": params}
+
+
+def published(replies):
+    return [m["params"] for m in replies if m.get("method") == "textDocument/publishDiagnostics"]
+
+
+def test_document_without_version_is_compiled():
+    document = Document(URI, "print zz", None)
+    document.compile()
+    assert document.compiler.errors == ["Erro semântico (linha 1): 'zz' não foi declarado"]
+    document.apply_change({"text": "FUS zz := 1 ; print zz"})
+    document.compile()
+    assert document.compiler.errors == []
+
+
+def test_diagnostics_follow_edits():
+    replies = run([
+        request(1, "initialize"),
+        notification("textDocument/didOpen", {"textDocument": {"uri": URI, "text": "print zz"}}),
+        notification("textDocument/didChange", {
+            "textDocument": {"uri": URI},
+            "contentChanges": [{"range": {"start": {"line": 0, "character": 0},
+                                          "end": {"line": 0, "character": 0}},
+                                "text": "FUS zz := 1 ;\n"}],
+        }),
+        request(2, "textDocument/definition",
+                {"textDocument": {"uri": URI}, "position": {"line": 1, "character": 7}}),
+    ])
+    diagnostics = published(replies)
+    assert [d["message"] for d in diagnostics[0]["diagnostics"]] == \
+        ["Erro semântico (linha 1): 'zz' não foi declarado"]
+    assert diagnostics[-1]["diagnostics"] == []
+    (definition,) = [m for m in replies if m.get("id") == 2]
+    assert definition["result"]["range"]["start"] == {"line": 0, "character": 4}
+
+
+def test_handler_errors_do_not_stop_server():
+    replies = run([
+        # Notificação malformada: registrada e ignorada
+        notification("textDocument/didOpen", {"textDocument": {"uri": URI}}),
+        notification("textDocument/didOpen", {"textDocument": {"uri": URI, "text": "print q"}}),
+        # Requisição malformada (sem 'position'): InternalError
+        request(1, "textDocument/definition", {"textDocument": {"uri": URI}}),
+        request(2, "desconhecido"),
+        request(3, "shutdown"),
+    ])
+    errors = {m["id"]: m["error"]["code"] for m in replies if "error" in m}
+    assert errors == {1: INTERNAL_ERROR, 2: METHOD_NOT_FOUND}
+    assert published(replies)[0]["diagnostics"][0]["message"].endswith("'q' não foi declarado")
+    assert {"jsonrpc": "2.0", "id": 3, "result": None} in replies
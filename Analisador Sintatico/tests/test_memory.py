@@ -0,0 +1,66 @@
+"""MemoryProfile: pico por fase, categorias e snapshots"""
+
+import tracemalloc
+
+import pytest
+
+import memory
+from lexer import Lexer
+from main import CompiladorCompleto
+from memory import CATEGORIES, PHASES, MemoryProfile
+from parser_integrated import GRAMMAR
+from program_generator import ProgramGenerator
+
+SOURCE = ProgramGenerator(seed=3, statements=60).text()
+
+
+@pytest.fixture(autouse=True)
+def stop_tracing():
+    yield
+    tracemalloc.stop()
+
+
+def profiled(source=SOURCE):
+    profile = MemoryProfile()
+    profile.begin()
+    parser = GRAMMAR.parser(memory=profile)
+    tokens = profile.lex(Lexer(source).tokenize)
+    profile.parse(parser, tokens)
+    profile.end()
+    return profile, tokens, parser
+
+
+def test_phases_and_categories():
+    profile, tokens, parser = profiled()
+    data = profile.to_dict()
+    assert data["compilations"] == 1
+    assert set(data["phases"]) == set(PHASES)
+    assert set(data["categories"]) == set(CATEGORIES)
+    assert all(data["phases"][phase]["peak_bytes"] > 0 for phase in PHASES)
+    assert data["categories"]["tokens"] > 0           # 'tokens' ainda vivo
+    assert data["categories"]["symbols"] > 0          # Tabela do parser ainda viva
+
+
+def test_compiler_accumulates_and_resets():
+    compiler = CompiladorCompleto(verbose=False, renderer=None, memory=True)
+    compiler.analyze(SOURCE)
+    compiler.analyze(SOURCE)
+    assert compiler.memory.compilations == 2
+    compiler.reset()
+    assert compiler.memory.compilations == 0
+    assert compiler.parser.memory is compiler.memory
+
+
+def test_dump_load_diff(tmp_path):
+    small, *_ = profiled(ProgramGenerator(seed=3, statements=20).text())
+    small.dump(tmp_path / "small.snap")
+    large, *_ = profiled()
+    large.dump(tmp_path / "large.snap")
+
+    data = memory.load(tmp_path / "large.snap")
+    assert data["profile"] == large.to_dict()
+    text = memory.diff(tmp_path / "small.snap", tmp_path / "large.snap", top=3)
+    assert "parse pico" in text and "Linhas que mais mudaram (top 3):" in text
+
+    with pytest.raises(ValueError):
+        MemoryProfile().dump(tmp_path / "empty.snap")
@@ -0,0 +1,47 @@
+"""Perfil por produção e por operação da tabela de símbolos"""
+
+from lexer import Lexer
+from parser_integrated import GRAMMAR
+from profiler import ProductionProfiler
+
+SOURCE = "FUS a := 1 + 2 ; print a ; print q ; assign a := a"
+
+
+def profiled(repeat=1):
+    profile = ProductionProfiler()
+    for _ in range(repeat):
+        parser = GRAMMAR.parser(profiler=profile)
+        profile.parse(parser, Lexer(SOURCE).tokenize())
+    return profile
+
+
+def test_reductions_counted_per_production():
+    rows = {name: count for name, count, *_ in profiled(repeat=2).production_rows()}
+    assert rows["CMD -> IO id"] == 4
+    assert rows["CMD -> FUS id := EXPR"] == 2
+    assert rows["CMD -> LHS := EXPR"] == 2
+
+
+def test_symbol_table_operations():
+    operations = {name: calls for name, calls, _ in profiled().operation_rows()}
+    assert operations["declare"] == 1
+    assert operations["lookup"] == 4
+    assert operations["check_unused_symbols"] == 1
+
+
+def test_collapsed_stacks(tmp_path):
+    profile = profiled()
+    lines = profile.collapsed()
+    assert any(line.startswith("parse;CMD -> IO id;SymbolTable.lookup ") for line in lines)
+    assert all(line.rsplit(" ", 1)[1].isdigit() for line in lines)
+    assert all(line.count(";") <= 2 for line in lines)     # ';' da gramática vira '；'
+    path = tmp_path / "fantasy.folded"
+    profile.write_collapsed(str(path))
+    assert path.read_text(encoding="utf-8").splitlines() == lines
+
+
+def test_report_and_merge():
+    profile = profiled()
+    profile.merge(profiled())
+    assert profile.parses == 2
+    assert "CMD -> FUS id := EXPR" in profile.report(top=5)
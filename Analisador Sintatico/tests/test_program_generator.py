@@ -0,0 +1,56 @@
+"""Gerador de programas: válido por construção, determinístico e limitado"""
+
+import io
+
+import pytest
+
+from lexer import Lexer
+from parser_integrated import GRAMMAR
+from program_generator import ProgramGenerator, parse_size
+
+
+def compile_text(text):
+    lexer = Lexer(text)
+    parser = GRAMMAR.parser()
+    parser.parse(lexer.tokenize())
+    return lexer, parser
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_programs_compile_without_errors(seed):
+    lexer, parser = compile_text(ProgramGenerator(seed=seed, statements=40).text())
+    assert lexer.errors == []
+    assert parser.result().errors == []
+
+
+def test_unchecked_programs_are_syntactically_valid():
+    text = ProgramGenerator(seed=9, statements=40, declare_before_use=False).text()
+    _, parser = compile_text(text)
+    assert parser.accepted and parser.syntax_errors == 0
+
+
+def test_same_seed_same_program():
+    assert ProgramGenerator(seed=4, statements=20).text() == \
+           ProgramGenerator(seed=4, statements=20).text()
+
+
+def test_token_and_byte_limits():
+    generator = ProgramGenerator(seed=2, max_tokens=500)
+    text = generator.text()
+    assert 500 <= generator.tokens_emitted < 700
+    assert len(Lexer(text).tokenize()) - 1 == generator.tokens_emitted
+
+    out = io.StringIO()
+    ProgramGenerator(seed=2, max_bytes=2000).write(out)
+    assert 2000 <= len(out.getvalue().encode()) < 3000
+
+
+def test_max_depth_validated():
+    with pytest.raises(ValueError):
+        ProgramGenerator(max_depth=1)
+
+
+def test_parse_size():
+    assert parse_size("2G") == 2 * 1024 ** 3
+    assert parse_size("512k") == 512 * 1024
+    assert parse_size("100") == 100
@@ -0,0 +1,73 @@
+"""API push (feed/finish) e reutilização do mesmo parser/compilador"""
+
+import pytest
+
+from lexer import Lexer
+from main import CompiladorCompleto
+from parser_integrated import GRAMMAR
+
+SOURCE = "FUS x := 1 ; FUS y := x + 2 ; print y"
+
+
+def test_feed_matches_parse():
+    pushed = GRAMMAR.parser()
+    statements = []
+    for token in Lexer(SOURCE).iter_tokens():
+        completed, _ = pushed.feed(token)
+        statements.extend(completed)
+        if pushed.finished:
+            break
+    assert pushed.finish()
+
+    parsed = GRAMMAR.parser()
+    assert parsed.parse(Lexer(SOURCE).tokenize())
+    assert str(pushed.ast) == str(parsed.ast)
+    assert [str(statement) for statement in statements] == ["FUS x := 1", "FUS y := (x + 2)", "print y"]
+
+
+def test_feed_returns_new_diagnostics():
+    parser = GRAMMAR.parser()
+    diagnostics = []
+    for token in Lexer("print q ; FUS a := 1").iter_tokens():
+        diagnostics += parser.feed(token)[1]
+    assert [str(d) for d in diagnostics][:1] == ["Erro semântico (linha 1): 'q' não foi declarado"]
+
+
+def test_finish_without_eof():
+    parser = GRAMMAR.parser()
+    for token in Lexer("FUS a := 1 ; print a").iter_tokens():
+        if token.type == "$":
+            break
+        parser.feed(token)
+    assert parser.finish()
+    assert parser.accepted
+
+
+def test_feed_after_finish_raises():
+    parser = GRAMMAR.parser()
+    tokens = Lexer("FUS a := 1 ; print a").tokenize()
+    parser.parse(tokens)
+    with pytest.raises(RuntimeError):
+        parser.feed(tokens[0])
+    parser.reset()
+    parser.feed(tokens[0])
+    assert not parser.finished
+
+
+def test_parser_reused_across_parses():
+    parser = GRAMMAR.parser()
+    assert parser.parse(Lexer("FUS x := 1 ; print x").tokenize())
+    assert not parser.parse(Lexer("assign zz := 2").tokenize())
+    assert [str(e) for e in parser.errors] == ["Erro semântico (linha 1): 'zz' não foi declarado"]
+    assert parser.parse(Lexer("FUS w := 3 ; print w").tokenize())
+    assert parser.errors == []
+
+
+def test_compiler_reused_without_cache():
+    compiler = CompiladorCompleto(verbose=False, renderer=None)
+    assert compiler.analyze("FUS x := 1").success
+    result = compiler.analyze("assign zz := 2")
+    assert not result.success
+    assert result.errors == ["Erro semântico (linha 1): 'zz' não foi declarado"]
+    result = compiler.analyze("FUS x := 1 ; print x")
+    assert result.success and result.errors == []
@@ -0,0 +1,49 @@
+"""Recuperação de erros em modo pânico e mensagens de tokens esperados"""
+
+from lexer import Lexer
+from parser_integrated import GRAMMAR
+
+
+def parse(source, **options):
+    parser = GRAMMAR.parser(**options)
+    parser.parse(Lexer(source).tokenize())
+    return parser
+
+
+def syntax_errors(parser):
+    return [str(error) for error in parser.errors if "SINTATICO" in str(error)]
+
+
+def test_expected_tokens_listed_without_epsilon():
+    parser = parse("FUS x := 1 2")
+    assert syntax_errors(parser) == [
+        "ERRO SINTATICO (Linha 1): Token inesperado '2' (tipo: num); "
+        "esperado: '$', '+', '-', ';', 'AAN', 'ANRK', 'KO'"
+    ]
+
+
+def test_no_expected_list_contains_epsilon():
+    for state, symbols in GRAMMAR.expected.items():
+        assert "ε" not in symbols and "epsilon" not in symbols, state
+
+
+def test_all_errors_reported_in_one_compile():
+    parser = parse("FUS := 1 ; print y ; assign := 2 ; print 3")
+    assert parser.syntax_errors == 3
+    assert len(syntax_errors(parser)) == 3
+    assert any("'y' não foi declarado" in str(error) for error in parser.errors)
+    assert not parser.result().success
+
+
+def test_missing_semicolon_inserted_keeps_both_commands():
+    parser = parse("FUS x := 1 print x")
+    assert syntax_errors(parser) == [
+        "ERRO SINTATICO (Linha 1): Token inesperado 'print' (tipo: print); esperado: '$', ';'"
+    ]
+    assert str(parser.ast) == "FUS x := 1 ; print x"
+
+
+def test_max_errors_stops_analysis():
+    parser = parse("print ) ; print ) ; print ) ; print )", max_errors=2)
+    assert parser.syntax_errors == 2
+    assert parser.errors[-1] == "ERRO SINTATICO: limite de 2 erros atingido, análise interrompida"
@@ -0,0 +1,61 @@
+"""CompileResult, NDJSONWriter e TextRenderer (nada impresso sem renderizador)"""
+
+import io
+import json
+
+from main import CompiladorCompleto
+from result import NDJSONWriter, TextRenderer
+
+
+def quiet():
+    return CompiladorCompleto(verbose=False, renderer=None)
+
+
+def test_analyze_returns_structured_result(capsys):
+    result = quiet().analyze("FUS x := 1 ; print y", keep_tokens=True)
+    assert capsys.readouterr().out == ""
+    assert not result.success
+    assert result.errors == ["Erro semântico (linha 1): 'y' não foi declarado"]
+    assert [row["name"] for row in result.symbols()] == ["x"]
+    assert [token.type for token in result.tokens][:2] == ["FUS", "id"]
+    assert str(result.ast) == "FUS x := 1 ; print y"
+
+
+def test_ndjson_one_object_per_line():
+    compiler = quiet()
+    out = io.StringIO()
+    with NDJSONWriter(out, symbols=False) as writer:
+        writer.write(compiler.analyze("FUS x := 1 ; print x"), name="a.fan")
+        writer.write(compiler.analyze("print y"), name="b.fan")
+    lines = out.getvalue().splitlines()
+    assert len(lines) == 2
+    first, second = map(json.loads, lines)
+    assert first["name"] == "a.fan" and first["success"] and "symbols" not in first
+    assert second["errors"] == ["Erro semântico (linha 1): 'y' não foi declarado"]
+    assert set(first["timings"]) == {"lex_ms", "parse_ms", "total_ms"}
+
+
+def test_text_renderer_report():
+    out = io.StringIO()
+    compiler = CompiladorCompleto(verbose=False, renderer=TextRenderer(out, verbose=False))
+    assert not compiler.compile("print y")
+    text = out.getvalue()
+    assert "[X] ERROS ENCONTRADOS:" in text
+    assert "'y' não foi declarado" in text
+
+
+def test_compile_incremental_returns_result_and_uses_renderer(capsys):
+    result = quiet().compile_incremental("FUS a := 1 ; HON zz")
+    assert capsys.readouterr().out == ""
+    assert not result.success
+    assert result.errors == ["Erro semântico (linha 1): 'zz' não foi declarado"]
+    # Léxico e sintático intercalados: só o tempo total
+    assert set(result.to_dict()["timings"]) == {"total_ms"}
+
+    out = io.StringIO()
+    compiler = CompiladorCompleto(verbose=False, renderer=TextRenderer(out))
+    compiler.compile_incremental("FUS a := 1 ; print a")
+    result = compiler.compile_incremental("FUS a := 1 ; print a ; print a")
+    assert result.success
+    assert "[i] Comandos reanalisados: 2, reaproveitados: 1" in out.getvalue()
+    assert "[OK] Nenhum erro encontrado" in out.getvalue()
@@ -0,0 +1,50 @@
+"""CompileStats: tempos por fase, contadores e agregação"""
+
+import json
+
+from lexer import Lexer
+from main import CompiladorCompleto
+from parser_integrated import GRAMMAR
+from stats import CompileStats
+
+SOURCE = "FUS a := 1 + 2 ; assign a := a ; print a ; print q"
+
+
+def measured(source=SOURCE):
+    stats = CompileStats()
+    parser = GRAMMAR.parser(stats=stats)
+    stats.parse(parser, stats.lex(Lexer(source).tokenize))
+    return stats
+
+
+def test_counters():
+    stats = measured()
+    assert stats.compilations == 1
+    assert stats.tokens == len(Lexer(SOURCE).tokenize())
+    assert stats.declarations == 1
+    assert stats.lookups == 4                         # print a, print q, assign a := a
+    assert stats.shifts > 0 and stats.reductions > 0 and stats.epsilon_reductions > 0
+    assert all(stats.wall[phase] >= 0 for phase in ("lex", "parse", "semantic"))
+
+
+def test_uninstrumented_parser_untouched():
+    parser = GRAMMAR.parser()
+    assert parser.actions is GRAMMAR.handlers
+    assert "lookup" not in vars(parser.symbol_table)
+
+
+def test_merge_and_round_trip():
+    total = CompileStats.aggregate([measured(), measured()])
+    assert total.compilations == 2
+    assert total.tokens == 2 * measured().tokens
+    copy = CompileStats.from_dict(json.loads(total.to_json()))
+    assert copy.to_dict() == total.to_dict()
+
+
+def test_compiler_stats_per_result():
+    compiler = CompiladorCompleto(verbose=False, renderer=None, stats=True)
+    first = compiler.analyze(SOURCE)
+    second = compiler.analyze("FUS b := 2 ; print b")
+    assert first.stats.compilations == second.stats.compilations == 1
+    assert second.stats.declarations == 1
+    assert compiler.stats.compilations == 2
@@ -0,0 +1,40 @@
+"""Validação só sintática: mesmo veredito do parser completo, só o 1º erro"""
+
+from lexer import Lexer
+from parser_integrated import GRAMMAR
+from program_generator import ProgramGenerator
+from syntax_check import check_syntax
+
+
+def test_valid_program():
+    assert check_syntax("FUS x := 1 ; LOS x print x ; FOD print x FAH x") is None
+
+
+def test_semantic_errors_are_ignored():
+    assert check_syntax("print nada") is None
+
+
+def test_first_syntax_error_with_position():
+    issue = check_syntax("FUS x := 1 ;\nprint 3 ; print )")
+    assert (issue.line, issue.column) == (2, 7)
+    assert str(issue) == "ERRO SINTATICO (Linha 2, Coluna 7): Token inesperado '3' (tipo: num)"
+
+
+def test_lexical_error():
+    issue = check_syntax("FUS x := 1 @")
+    assert issue.line == 1 and "'@'" in str(issue)
+
+
+def test_unexpected_end():
+    assert "'$'" in str(check_syntax("FUS x :="))
+
+
+def test_agrees_with_full_parser():
+    generator = ProgramGenerator(seed=3, statements=30, declare_before_use=False)
+    sources = [generator.text() for _ in range(5)]
+    sources += [source.replace(";", "", 1) for source in sources]
+    for source in sources:
+        parser = GRAMMAR.parser()
+        parser.parse(Lexer(source).tokenize())
+        syntax_ok = parser.syntax_errors == 0 and parser.accepted
+        assert (check_syntax(source) is None) == syntax_ok, source
@@ -0,0 +1,32 @@
+"""CompiledGrammar compartilhado: compilações simultâneas não interferem"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from benchmark_threads import generate_program
+from lexer import Lexer
+from parser_integrated import GRAMMAR
+
+
+def summary(source):
+    parser = GRAMMAR.parser()
+    parser.parse(Lexer(source).tokenize())
+    result = parser.result()
+    return result.success, result.errors, result.warnings, str(parser.ast)
+
+
+def test_grammar_is_immutable():
+    with pytest.raises(AttributeError):
+        GRAMMAR.action_table = {}
+    with pytest.raises(TypeError):
+        GRAMMAR.action_table[0]["x"] = 1
+
+
+def test_parallel_compiles_match_serial():
+    programs = [generate_program(seed, 60) for seed in range(24)]
+    programs += ["print nada", "FUS := 1"]
+    serial = [summary(program) for program in programs]
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        parallel = list(pool.map(summary, programs))
+    assert parallel == serial
@@ -0,0 +1,54 @@
+"""Transporte de tokens por memória compartilhada (compile_pipeline)"""
+
+from batch import compile_source
+from lexer import Lexer
+from token_ring import EOF, TokenRing, compile_pipeline, encode_tokens
+
+SOURCES = [
+    ("ok", "FUS a := 1 ; print a"),
+    ("semantico", "print x ; print x"),
+    ("lexico", "FUS a := 1 @ ; print a ? @"),
+    ("sintatico", "FUS := 1 ; print a ;"),
+    ("comentario", "FUS a := 1 /* sem fim"),
+    ("grande", " ;\n".join(f"FUS v{i} := {i} + 1" for i in range(3000))),
+]
+
+
+def test_pipeline_matches_in_process_compile():
+    results = {result.name: result for result in compile_pipeline(SOURCES, pairs=2, capacity=1024)}
+    assert set(results) == {name for name, _ in SOURCES}
+    for index, (name, source) in enumerate(SOURCES):
+        expected = compile_source(index, name, source)
+        assert (results[name].success, results[name].errors, results[name].warnings) == \
+               (expected.success, expected.errors, expected.warnings), name
+
+
+def test_pipeline_reports_lexer_time():
+    (result,) = compile_pipeline([SOURCES[-1]], pairs=1)
+    assert result.lex_time > 0
+    assert result.to_dict()["timings"]["lex_ms"] > 0
+    assert 0 < result.parse_time <= result.total_time
+
+
+def test_eof_record_carries_lexing_time():
+    # Sem consumidor: o ring precisa caber a entrada inteira, senão
+    # encode_tokens espera espaço para sempre
+    source = SOURCES[-1][1]
+    ring = TokenRing(capacity=len(Lexer(source).tokenize()) + 1)
+    try:
+        encode_tokens(Lexer(source), ring)
+        ring.flush()
+        records = ring.records()
+        for kind, start, *_ in records:
+            if kind == EOF:
+                break
+        records.close()
+        assert start > 0              # Microssegundos no lexer
+    finally:
+        ring.unlink()
+
+
+def test_missing_file_is_a_read_error(tmp_path):
+    (result,) = compile_pipeline([str(tmp_path / "nada.fan")], pairs=1)
+    assert not result.success
+    assert result.errors[0].startswith("ERRO DE LEITURA")
@@ -0,0 +1,37 @@
+"""Tracer do parser: passos e mensagens semânticas fora do laço sem tracer"""
+
+import io
+
+from lexer import Lexer
+from parser_integrated import GRAMMAR
+from tracer import ACCEPT, PrintTracer, RingTracer
+
+SOURCE = "FUS x := 1 + 2 ; assign x := x ; print x"
+
+
+def test_no_tracer_prints_nothing(capsys):
+    assert GRAMMAR.parser().parse(Lexer(SOURCE).tokenize())
+    assert capsys.readouterr().out == ""
+
+
+def test_print_tracer_shows_steps_and_semantic_messages():
+    out = io.StringIO()
+    GRAMMAR.parser(tracer=PrintTracer(out)).parse(Lexer(SOURCE).tokenize())
+    text = out.getvalue()
+    assert "[Semântico] Declarando 'x' = (1 + 2) (linha 1)" in text
+    assert "[Semântico] Atribuindo 'x' = x (linha 1)" in text
+    assert "[Semântico] I/O com 'x' (linha 1)" in text
+    assert "Passo 1: Estado=0" in text
+    assert "[OK] ANALISE SINTATICA ACEITA!" in text
+
+
+def test_ring_tracer_keeps_last_steps():
+    tracer = RingTracer(8)
+    parser = GRAMMAR.parser(tracer=tracer)
+    parser.parse(Lexer(SOURCE).tokenize())
+    records = tracer.records()
+    assert len(records) == 8 and tracer.count > 8
+    assert records[-1][2] == ACCEPT
+    out = io.StringIO()
+    tracer.replay(out, last=3)
+    assert out.getvalue().splitlines()[0].startswith("... ")
@@ -0,0 +1,346 @@
+"""
+Transporte de Tokens por Memória Compartilhada (lexer e parser em processos)
+
+No modo pipeline cada par de processos (lexer -> parser) compartilha um
+TokenRing: um buffer circular em multiprocessing.shared_memory com registros
+de tamanho fixo, em vez de listas de Token serializadas com pickle:
+
+    tipo (1 byte) | início | fim | linha | coluna   (4 x uint32)
+
+O parser lê os registros no próprio buffer (struct.iter_unpack sobre um
+memoryview, sem cópia) e recria cada Token com o lexema fatiado do código,
+que ele também conhece. Só id e num precisam de fatia; os demais tipos têm o
+lexema igual ao tipo.
+
+Os contadores de escrita/leitura ficam no cabeçalho do buffer e só são
+alterados sob um multiprocessing.Condition, em blocos de RING_BATCH
+registros. Com o buffer cheio o lexer espera o parser (backpressure).
+
+Registros de controle (tipos acima dos tipos de token):
+    BEGIN          início de um item; 'início' = índice do item na entrada
+    CHAR_ERROR     caractere inválido; 'início' = ord(caractere)
+    COMMENT_ERROR  comentário de bloco não fechado
+    STOP           fim do trabalho do lexer
+Cada item termina com o registro do token '$', cujo 'início' é o tempo do
+lexer no item em microssegundos (sem a espera por espaço no buffer).
+
+Uso:
+    for result in compile_pipeline(caminhos, pairs=4):
+        print(result.name, result.success)
+"""
+
+import multiprocessing
+import os
+import queue
+import struct
+import time
+from multiprocessing.shared_memory import SharedMemory
+
+from batch import build_result, iter_jobs, read_error, read_source
+from lexer import Lexer, LexicalError, TokenType
+from parser_integrated import GRAMMAR, Token
+
+# Tipos de token transportados (o índice é o código gravado no registro)
+KINDS = tuple(t.value for t in TokenType if t is not TokenType.ERROR)
+KIND_CODES = {kind: code for code, kind in enumerate(KINDS)}
+EOF = KIND_CODES["$"]
+NUM = KIND_CODES["num"]
+ID = KIND_CODES["id"]
+
+# Registros de controle
+BEGIN = len(KINDS)
+CHAR_ERROR = BEGIN + 1
+COMMENT_ERROR = BEGIN + 2
+STOP = BEGIN + 3
+
+RECORD = struct.Struct("<BxxxIIII")
+HEADER = struct.Struct("<QQ")         # escritos, lidos (contadores absolutos)
+
+RING_CAPACITY = 1 << 16               # Registros por buffer
+RING_BATCH = 512                      # Registros publicados/liberados por vez
+
+
+class TokenRing:
+    """
+    Buffer circular de registros de token (um produtor, um consumidor)
+
+    Criado no processo principal e herdado pelos dois processos do par.
+    Cada lado mantém sua posição local e só toca o cabeçalho sob o lock.
+    """
+
+    def __init__(self, capacity=RING_CAPACITY, context=None):
+        context = context or multiprocessing.get_context()
+        self.capacity = capacity
+        self.memory = SharedMemory(create=True, size=HEADER.size + capacity * RECORD.size)
+        self.condition = context.Condition()
+        HEADER.pack_into(self.memory.buf, 0, 0, 0)
+
+        self.written = 0              # Produtor: registros escritos
+        self.published = 0            # Produtor: registros visíveis ao consumidor
+        self.free = capacity          # Produtor: espaço livre conhecido
+        self.blocked_time = 0.0       # Produtor: tempo esperando espaço livre
+        self.consumed = 0             # Consumidor: registros lidos
+        self.wait_time = 0.0          # Consumidor: tempo esperando o produtor
+
+    # --- Produtor -----------------------------------------------------------
+
+    def write(self, kind, start=0, end=0, line=0, column=0):
+        """Grava um registro (espera se o buffer estiver cheio)"""
+        if not self.free:
+            self._reserve()
+        slot = self.written % self.capacity
+        RECORD.pack_into(self.memory.buf, HEADER.size + slot * RECORD.size,
+                         kind, start, end, line, column)
+        self.written += 1
+        self.free -= 1
+        if self.written - self.published >= RING_BATCH:
+            self.flush()
+
+    def flush(self):
+        """Torna visíveis ao consumidor os registros já escritos"""
+        if self.written == self.published:
+            return
+        with self.condition:
+            consumed = HEADER.unpack_from(self.memory.buf)[1]
+            HEADER.pack_into(self.memory.buf, 0, self.written, consumed)
+            self.condition.notify_all()
+        self.published = self.written
+
+    def _reserve(self):
+        """Publica o que foi escrito e espera o consumidor liberar espaço"""
+        self.flush()
+        waited = time.perf_counter()
+        with self.condition:
+            while True:
+                consumed = HEADER.unpack_from(self.memory.buf)[1]
+                self.free = self.capacity - (self.written - consumed)
+                if self.free:
+                    break
+                self.condition.wait()
+        self.blocked_time += time.perf_counter() - waited
+
+    # --- Consumidor ---------------------------------------------------------
+
+    def records(self):
+        """
+        Gera os registros (tipo, início, fim, linha, coluna) na ordem gravada
+
+        Cada bloco é lido direto da memória compartilhada; o espaço é
+        devolvido ao produtor depois que o bloco inteiro foi consumido.
+        """
+        buf = self.memory.buf
+        capacity = self.capacity
+        while True:
+            with self.condition:
+                written = HEADER.unpack_from(buf)[0]
+                if written == self.consumed:
+                    waited = time.perf_counter()
+                    while written == self.consumed:
+                        self.condition.wait()
+                        written = HEADER.unpack_from(buf)[0]
+                    self.wait_time += time.perf_counter() - waited
+
+            while self.consumed < written:
+                slot = self.consumed % capacity
+                count = min(written - self.consumed, capacity - slot, RING_BATCH)
+                offset = HEADER.size + slot * RECORD.size
+                with buf[offset:offset + count * RECORD.size] as block:
+                    yield from RECORD.iter_unpack(block)
+                self.consumed += count
+                with self.condition:
+                    HEADER.pack_into(buf, 0, HEADER.unpack_from(buf)[0], self.consumed)
+                    self.condition.notify_all()
+
+    def close(self):
+        self.memory.close()
+
+    def unlink(self):
+        self.memory.close()
+        self.memory.unlink()
+
+
+def encode_tokens(lexer, ring):
+    """
+    Grava no ring os tokens (e erros léxicos) de um Lexer, até o '$'
+
+    Cada erro vai para o ring quando aparece em lexer.errors: com
+    Lexer(..., aggregate=False) são todas as ocorrências, e o processo do
+    parser as agrega por caractere. O registro do '$' leva o tempo do
+    lexer em microssegundos.
+    """
+    write = ring.write
+    reported = 0
+    codes = KIND_CODES
+    began = time.perf_counter()
+    blocked = ring.blocked_time
+
+    for token in lexer.iter_tokens():
+        # iter_tokens cria uma lista nova em lexer.errors ao começar
+        errors = lexer.errors
+        while reported < len(errors):
+            error = errors[reported]
+            if error.char == "/*":
+                write(COMMENT_ERROR, 0, 0, error.line, error.column)
+            else:
+                write(CHAR_ERROR, ord(error.char), 0, error.line, error.column)
+            reported += 1
+
+        end = lexer.position
+        kind = codes[token.type]
+        if kind == EOF:
+            elapsed = time.perf_counter() - began - (ring.blocked_time - blocked)
+            start = min(int(elapsed * 1e6), 0xFFFFFFFF)
+        else:
+            start = end - len(token.lexeme)
+        write(kind, start, end, token.line, token.column)
+
+
+def _load(job):
+    """(nome, código) de um item de iter_jobs; levanta erro de leitura"""
+    if len(job) == 2:
+        return job[1], read_source(job[1])
+    return job[1], job[2]
+
+
+def _lexer_process(ring, jobs, counter):
+    """Lexer: pega o próximo item livre e grava seus tokens no ring"""
+    try:
+        while True:
+            with counter.get_lock():
+                index = counter.value
+                counter.value += 1
+            if index >= len(jobs):
+                break
+
+            ring.write(BEGIN, index)
+            try:
+                _, source_code = _load(jobs[index])
+            except (OSError, UnicodeDecodeError):
+                ring.write(EOF)       # O parser relata o erro de leitura
+                continue
+            encode_tokens(Lexer(source_code, aggregate=False), ring)
+            ring.flush()
+    finally:
+        ring.write(STOP)
+        ring.flush()
+        ring.close()
+
+
+def _parser_process(ring, jobs, results):
+    """Parser: recria os tokens a partir dos registros e compila cada item"""
+    kinds = KINDS
+    parser = source_code = None
+    records = ring.records()
+
+    for kind, start, end, line, column in records:
+        if kind < BEGIN:
+            if parser is None:
+                if kind == EOF:
+                    results.put(failure)
+                continue
+
+            if kind == ID:
+                lexeme = source_code[start:end]
+                token = Token("id", lexeme, line, column, lexeme)
+            elif kind == NUM:
+                lexeme = source_code[start:end]
+                token = Token("num", lexeme, line, column, int(lexeme))
+            else:
+                lexeme = kinds[kind]
+                token = Token(lexeme, lexeme, line, column, lexeme)
+            if not parser.finished:
+                # Após um erro fatal ou o limite de erros, só falta o EOF
+                parser.feed(token)
+
+            if kind == EOF:
+                total = time.perf_counter() - began
+                # Léxico medido no processo do lexer; o parser desconta o
+                # tempo em que esperou registros
+                lex_time = start / 1e6
+                parse_time = total - (ring.wait_time - waited)
+                results.put(build_result(index, name, lexical_errors, parser,
+                                         lex_time, parse_time, total))
+                parser = None
+
+        elif kind == BEGIN:
+            index = start
+            began = time.perf_counter()
+            waited = ring.wait_time
+            try:
+                name, source_code = _load(jobs[index])
+            except (OSError, UnicodeDecodeError) as e:
+                failure = read_error(index, jobs[index][1], e)
+                continue
+            parser = GRAMMAR.parser()
+            lexical_errors = []
+            seen = {}                 # Caractere -> LexicalError (agregação)
+
+        elif kind == CHAR_ERROR:
+            char = chr(start)
+            if char in seen:
+                seen[char].occur(line, column)
+            else:
+                seen[char] = LexicalError(None, line, column, char)
+                lexical_errors.append(seen[char])
+        elif kind == COMMENT_ERROR:
+            lexical_errors.append(LexicalError("Comentário de bloco não fechado", line, column, "/*"))
+        else:
+            break
+
+    records.close()                   # Libera o memoryview do bloco atual
+    ring.close()
+
+
+def _next_result(results, processes):
+    """Próximo resultado; erro se algum processo terminou com falha"""
+    while True:
+        try:
+            return results.get(timeout=1)
+        except queue.Empty:
+            failed = [p for p in processes if p.exitcode not in (None, 0)]
+            if failed:
+                raise RuntimeError(f"Processo {failed[0].name} terminou com código "
+                                   f"{failed[0].exitcode}")
+
+
+def compile_pipeline(items, pairs=None, capacity=RING_CAPACITY):
+    """
+    Compila em lote com lexer e parser em processos separados
+
+    Args:
+        items: Caminhos (str/PathLike) ou pares (nome, código), como em
+               BatchCompiler.compile_many
+        pairs: Número de pares lexer/parser (padrão: metade das CPUs)
+        capacity: Registros por TokenRing
+
+    Yields:
+        BatchResult na ordem de conclusão; lex_time é medido no processo
+        do lexer e parse_time no do parser (sem a espera pelos registros)
+    """
+    jobs = list(iter_jobs(items))
+    pairs = pairs or max(1, (os.cpu_count() or 1) // 2)
+    context = multiprocessing.get_context()
+    counter = context.Value("q", 0)
+    results = context.Queue()
+
+    rings = [TokenRing(capacity, context) for _ in range(pairs)]
+    processes = []
+    for ring in rings:
+        processes.append(context.Process(target=_lexer_process, args=(ring, jobs, counter)))
+        processes.append(context.Process(target=_parser_process, args=(ring, jobs, results)))
+
+    received = 0
+    try:
+        for process in processes:
+            process.start()
+        for received in range(1, len(jobs) + 1):
+            yield _next_result(results, processes)
+    finally:
+        # Interrompido antes do fim: nada mais será lido dos rings
+        if received < len(jobs):
+            for process in processes:
+                process.terminate()
+        for process in processes:
+            process.join()
+        for ring in rings:
+            ring.unlink()
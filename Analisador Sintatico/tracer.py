@@ -0,0 +1,231 @@
+"""
+Rastreamento do Parser em Buffer Circular
+
+Substitui os prints do modo verbose: o parser chama tracer.record a cada
+passo com (passo, estado, ação, token) e o tracer decide o que fazer. As
+ações semânticas chamam tracer.semantic(modelo, *args) (ex.: "Declarando
+'{}' = {} (linha {})"); o texto só é montado por quem o imprime.
+
+    RingTracer    guarda os últimos 'capacity' registros (step, state,
+                  action, token_index) em tuplas; memória limitada, para
+                  ficar ligado em entradas reais e inspecionar depois de
+                  uma falha (replay, dump/load)
+    PrintTracer   imprime cada passo na hora (SLRParserWithSemantics com
+                  verbose=True)
+
+Desligado (tracer=None, o padrão) o laço do parser só testa uma variável
+local por passo e cada handler semântico um atributo; não há formatação,
+lista de pilha nem chamada alguma.
+
+Ações (mesma codificação da tabela de validação do parser):
+    n >= 0             SHIFT, empilha o estado n
+    ~p (-1 .. -P)      REDUCE pela produção p (producoes.py); o estado do
+                       registro seguinte é o GOTO
+    ACCEPT             '$' aceito
+    ERROR              erro sintático registrado
+    RECOVER_INSERT     ';' virtual inserido antes do token
+    RECOVER_UNWIND     pilha reduzida até um estado que aceita CMD
+    RECOVER_DISCARD    token descartado (modo pânico)
+
+O índice do token conta os tokens vistos pelo parser, a partir de 0
+(inclui os ';' virtuais da recuperação de erros).
+
+Uso:
+    tracer = RingTracer(4096)
+    parser = GRAMMAR.parser(tracer=tracer)
+    if not parser.parse(tokens):
+        tracer.replay(last=50)          # últimos 50 passos antes da falha
+        tracer.dump("trace.json")       # RingTracer.load("trace.json").replay()
+
+    python tracer.py programa.fan --last 50
+"""
+
+import argparse
+import json
+import sys
+
+from producoes import productions
+
+ACCEPT = -1 - len(productions)
+ERROR = ACCEPT - 1
+RECOVER_INSERT = ACCEPT - 2
+RECOVER_UNWIND = ACCEPT - 3
+RECOVER_DISCARD = ACCEPT - 4
+
+CAPACITY = 4096
+
+_EVENTS = {
+    ACCEPT: "ACEITA",
+    ERROR: "ERRO SINTATICO",
+    RECOVER_INSERT: "RECUPERACAO: ';' inserido",
+    RECOVER_UNWIND: "RECUPERACAO: pilha reduzida",
+    RECOVER_DISCARD: "RECUPERACAO: token descartado",
+}
+
+
+def describe(action):
+    """Ação codificada -> texto ('SHIFT -> 10', 'REDUCE CMD -> ...')"""
+    if action >= 0:
+        return f"SHIFT -> {action}"
+    if action in _EVENTS:
+        return _EVENTS[action]
+    lhs, rhs = productions[~action]
+    return f"REDUCE {lhs} -> {' '.join(rhs) or 'ε'}"
+
+
+class RingTracer:
+    """Últimos 'capacity' passos do parser em um buffer circular"""
+    __slots__ = ("capacity", "buffer", "tokens", "count", "position", "current")
+
+    def __init__(self, capacity=CAPACITY):
+        if capacity < 1:
+            raise ValueError("capacity deve ser >= 1")
+        self.capacity = capacity
+        self.buffer = [None] * capacity   # Registros (step, state, action, token_index)
+        self.tokens = [None] * capacity   # Tokens recentes, por token_index % capacity
+        self.count = 0                    # Registros gravados desde o início
+        self.position = -1                # Índice do token atual
+        self.current = None               # Token atual (compara identidade)
+
+    def record(self, step, state, action, token):
+        """Grava um passo; chamado pelo parser (sobrescreve o mais antigo)"""
+        if token is not self.current:
+            self.current = token
+            self.position += 1
+            self.tokens[self.position % self.capacity] = token
+        self.buffer[self.count % self.capacity] = (step, state, action, self.position)
+        self.count += 1
+
+    def semantic(self, template, *args):
+        """Mensagem de uma ação semântica: não entra no buffer (só passos)"""
+
+    def clear(self):
+        self.buffer = [None] * self.capacity
+        self.tokens = [None] * self.capacity
+        self.count = 0
+        self.position = -1
+        self.current = None
+
+    def __len__(self):
+        return min(self.count, self.capacity)
+
+    def records(self, last=None):
+        """Registros retidos, do mais antigo ao mais recente (ou só os 'last' últimos)"""
+        size = len(self)
+        if last is not None:
+            size = min(size, last)
+        start = self.count - size
+        return [self.buffer[i % self.capacity] for i in range(start, self.count)]
+
+    def token(self, index):
+        """Token de um registro, se ainda estiver no buffer (senão None)"""
+        if index < 0 or index > self.position or self.position - index >= self.capacity:
+            return None
+        return self.tokens[index % self.capacity]
+
+    def replay(self, out=None, last=None):
+        """Imprime os registros retidos no formato do modo verbose"""
+        out = out or sys.stdout
+        records = self.records(last)
+        if self.count > len(records):
+            print(f"... {self.count - len(records)} passo(s) anterior(es) omitido(s)", file=out)
+        for step, state, action, index in records:
+            token = self.token(index)
+            shown = token if token is not None else f"#{index}"
+            print(f"Passo {step}: Estado={state}, Token[{index}]={shown}  {describe(action)}",
+                  file=out)
+
+    # --- Exportação ---------------------------------------------------------
+
+    def to_dict(self):
+        """Registros e tokens retidos (para JSON)"""
+        records = self.records()
+        indices = sorted({record[3] for record in records})
+        tokens = {}
+        for index in indices:
+            token = self.token(index)
+            if token is not None:
+                tokens[str(index)] = [token.type, token.lexeme, token.line]
+        return {"capacity": self.capacity, "count": self.count,
+                "records": records, "tokens": tokens}
+
+    def dump(self, path):
+        """Grava o buffer em JSON (ver load)"""
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(self.to_dict(), file, ensure_ascii=False)
+
+    @classmethod
+    def load(cls, path):
+        """Reconstrói um RingTracer gravado por dump, para replay"""
+        from parser_integrated import Token
+
+        with open(path, encoding="utf-8") as file:
+            data = json.load(file)
+        tracer = cls(data["capacity"])
+        records = [tuple(record) for record in data["records"]]
+        tracer.count = data["count"]
+        for offset, record in enumerate(records):
+            tracer.buffer[(tracer.count - len(records) + offset) % tracer.capacity] = record
+        for index, (kind, lexeme, line) in data["tokens"].items():
+            tracer.tokens[int(index) % tracer.capacity] = Token(kind, lexeme, line)
+        tracer.position = records[-1][3] if records else -1
+        return tracer
+
+    def __repr__(self):
+        return f"RingTracer({len(self)}/{self.capacity} passos, {self.count} gravados)"
+
+
+class PrintTracer:
+    """Imprime cada passo na hora (saída do modo verbose)"""
+    __slots__ = ("out",)
+
+    def __init__(self, out=None):
+        self.out = out
+
+    def record(self, step, state, action, token):
+        out = self.out or sys.stdout
+        if action == ACCEPT:
+            print("\n[OK] ANALISE SINTATICA ACEITA!\n", file=out)
+        elif action == RECOVER_INSERT:
+            print(f"  RECUPERACAO: ';' inserido antes de '{token.lexeme}'\n", file=out)
+        elif action == RECOVER_UNWIND:
+            print(f"  RECUPERACAO: pilha reduzida, GOTO(.., CMD) = {state}\n", file=out)
+        elif action == RECOVER_DISCARD:
+            print(f"  RECUPERACAO: token '{token.lexeme}' descartado\n", file=out)
+        elif action != ERROR:
+            print(f"Passo {step}: Estado={state}, Token={token}", file=out)
+            print(f"  {describe(action)}\n", file=out)
+
+    def semantic(self, template, *args):
+        print("[Semântico] " + template.format(*args), file=self.out or sys.stdout)
+
+
+def main(argv=None):
+    from lexer import Lexer
+    from parser_integrated import GRAMMAR
+
+    parser = argparse.ArgumentParser(description="Compila um arquivo e mostra os últimos passos do parser")
+    parser.add_argument("arquivo")
+    parser.add_argument("--capacity", type=int, default=CAPACITY)
+    parser.add_argument("--last", type=int, default=40, help="passos mostrados (padrão: 40)")
+    parser.add_argument("--always", action="store_true", help="mostra mesmo se compilar")
+    parser.add_argument("--dump", metavar="JSON", help="grava o buffer em JSON")
+    args = parser.parse_args(argv)
+
+    with open(args.arquivo, encoding="utf-8") as file:
+        lexer = Lexer(file.read())
+    tracer = RingTracer(args.capacity)
+    analysis = GRAMMAR.parser(tracer=tracer)
+    success = analysis.parse(lexer.tokenize()) and not lexer.errors
+
+    for error in lexer.errors + analysis.errors:
+        print(error)
+    if args.always or not success:
+        tracer.replay(last=args.last)
+    if args.dump:
+        tracer.dump(args.dump)
+    return 0 if success else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())